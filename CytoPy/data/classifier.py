@@ -0,0 +1,148 @@
+from .fcs_experiments import FCSExperiment
+from bson.binary import Binary
+import mongoengine
+import datetime
+import pickle
+
+
+class ClassifierModel(mongoengine.Document):
+    """
+    Persisted, versioned representation of a trained supervised classifier (see flow.supervised.cell_classifier).
+    Everything required to classify new samples is stored, such that a classifier can be restored without
+    reference to the training data.
+
+    Parameters
+    ----------
+    model_name: str, required
+        name of the model; many versions can exist for a single name
+    version: int, required
+        version of the model, incremented each time a model of the same name is registered
+    experiment: RefField
+        reference to the FCSExperiment the model was trained for
+    classifier_class: str, required
+        name of the CellClassifier class that generated the model e.g. XGBoostClassifier
+    reference_sample: str, optional
+        sample ID of the sample used for training
+    features: list, required
+        list of channels/markers the model was trained on (in order)
+    transform_method: str, optional, (default:"logicle")
+        transformation applied to data prior to classification
+    root_population: str, required, (default:"root")
+        population classified
+    multi_label: bool, required
+        whether the model was trained for multi-label classification
+    threshold: float, optional
+        minimum probability threshold to class as positive
+    population_labels: list, required
+        list of populations predicted by the model
+    mappings: list, required
+        label mappings as a list of tuples; first element is the label, second element the list of populations
+    prefix: str, required
+        prefix given to the name of predicted populations
+    parameters: list, optional
+        additional attributes of the CellClassifier class (list of tuples)
+    training_hash: str, required
+        SHA-256 hash of the training data and labels
+    model: FileField
+        serialised classifier and preprocessor
+    creation_date: DateTime
+        date of creation
+    notes: str, optional
+        free text comments
+    """
+    model_name = mongoengine.StringField(required=True, unique_with='version')
+    version = mongoengine.IntField(required=True)
+    experiment = mongoengine.ReferenceField(FCSExperiment)
+    classifier_class = mongoengine.StringField(required=True)
+    reference_sample = mongoengine.StringField(required=False)
+    features = mongoengine.ListField(required=True)
+    transform_method = mongoengine.StringField(required=False, default='logicle')
+    root_population = mongoengine.StringField(required=True, default='root')
+    multi_label = mongoengine.BooleanField(required=True)
+    threshold = mongoengine.FloatField(required=False)
+    population_labels = mongoengine.ListField(required=True)
+    mappings = mongoengine.ListField(required=True)
+    prefix = mongoengine.StringField(required=True)
+    parameters = mongoengine.ListField(required=False)
+    training_hash = mongoengine.StringField(required=True)
+    model = mongoengine.FileField(db_alias='core', collection_name='classifier_models')
+    creation_date = mongoengine.DateTimeField(default=datetime.datetime.now)
+    notes = mongoengine.StringField(required=False)
+
+    meta = {
+        'db_alias': 'core',
+        'collection': 'classifier_models'
+    }
+
+    @staticmethod
+    def next_version(model_name: str) -> int:
+        """
+        Return the version number that the next model registered under the given name should take
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model
+
+        Returns
+        -------
+        int
+        """
+        latest = ClassifierModel.objects(model_name=model_name).order_by('-version').only('version').first()
+        if latest is None:
+            return 1
+        return latest.version + 1
+
+    @staticmethod
+    def fetch(model_name: str,
+              version: int or None = None):
+        """
+        Fetch a registered model, by default the latest version
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model
+        version: int, optional
+            Version to fetch; if None, the latest version is returned
+
+        Returns
+        -------
+        ClassifierModel
+        """
+        if version is None:
+            model = ClassifierModel.objects(model_name=model_name).order_by('-version').first()
+        else:
+            model = ClassifierModel.objects(model_name=model_name, version=version).first()
+        assert model is not None, f'No registered model {model_name} (version={version})'
+        return model
+
+    def save_model(self, model: dict) -> None:
+        """
+        Save the serialised classifier and preprocessor
+
+        Parameters
+        ----------
+        model: dict
+            Dictionary containing the serialised classifier ('classifier') and the preprocessor ('preprocessor')
+
+        Returns
+        -------
+        None
+        """
+        if self.model:
+            self.model.replace(Binary(pickle.dumps(model, protocol=2)))
+        else:
+            self.model.new_file()
+            self.model.write(Binary(pickle.dumps(model, protocol=2)))
+            self.model.close()
+
+    def load_model(self) -> dict:
+        """
+        Load the serialised classifier and preprocessor
+
+        Returns
+        -------
+        dict
+        """
+        return pickle.loads(bytes(self.model.read()))
@@ -1,8 +1,9 @@
-from ..feedback import progress_bar
 from .consensus import ConsensusCluster
 from sklearn.preprocessing import MinMaxScaler
+from scipy.spatial.distance import cdist
 from minisom import MiniSom
 import pandas as pd
+import numpy as np
 
 
 class FlowSOM:
@@ -147,6 +148,26 @@ class FlowSOM:
         self.meta_flatten = cluster_.predict_data(self.flatten_weights)
         self.meta_class = self.meta_flatten.reshape(self.xn, self.yn)
 
+    def winners(self, chunk_size: int = 100000) -> np.array:
+        """
+        Find the best matching unit (the position of the closest node in flatten_weights) for each cell in the
+        associated dataset. Distances are computed for chunks of cells at a time.
+        (Requires that train has been called previously)
+
+        Parameters
+        ----------
+        chunk_size : int, (default=100000)
+            number of cells to compute distances for at once
+
+        Returns
+        -------
+        Numpy.array
+            Index of best matching unit for each cell
+        """
+        assert self.map is not None, 'SOM must be trained prior to finding best matching units; call train first'
+        return np.concatenate([np.argmin(cdist(self.data[i:i + chunk_size], self.flatten_weights), axis=1)
+                               for i in range(0, len(self.data), chunk_size)])
+
     def predict(self):
         """
         Predict the cluster allocation for each cell in the associated dataset.
@@ -164,15 +185,7 @@ class FlowSOM:
                   'by meta_cluster'
         assert self.map is not None, err_msg
         assert self.meta_class is not None, err_msg
-        labels = []
         print('---------- Predicting Labels ----------')
-        for i in progress_bar(range(len(self.data))):
-            xx = self.data[i, :]  # fetch the sample data
-            winner = self.map.winner(xx)  # make prediction, prediction = the closest entry location in the SOM
-            c = self.meta_class[winner]  # from the location info get cluster info
-            labels.append(c)
+        labels = self.meta_flatten[self.winners()]
         print('---------------------------------------')
         return labels
-
-
-
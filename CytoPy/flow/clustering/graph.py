@@ -0,0 +1,289 @@
+from phenograph.core import graph2binary, runlouvain
+from sklearn.neighbors import NearestNeighbors
+from scipy import sparse
+import numpy as np
+import uuid
+import os
+
+
+def _drop_self(idx: np.array,
+               k: int) -> np.array:
+    """
+    Given an array of k+1 nearest neighbours for each event (as returned from a kNN query of the data against
+    itself), remove each event from its own neighbours. If an event is absent from its own neighbours (which
+    can happen with duplicate events or approximate methods) the furthest neighbour is removed instead.
+
+    Parameters
+    ----------
+    idx : Numpy.array
+        (n, k+1) array of neighbour indices
+    k : int
+        number of neighbours to return
+
+    Returns
+    -------
+    Numpy.array
+        (n, k) array of neighbour indices
+    """
+    n = idx.shape[0]
+    is_self = idx == np.arange(n)[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    return idx[~is_self].reshape(n, k)
+
+
+def nearest_neighbours(data: np.array,
+                       k: int = 30,
+                       method: str = 'exact',
+                       metric: str = 'euclidean',
+                       n_jobs: int = -1,
+                       **kwargs) -> np.array:
+    """
+    Find the k nearest neighbours of each event. Valid methods are:
+    * 'exact', 'kdtree' or 'brute' - exact search using Scikit-Learn's NearestNeighbors
+    * 'nndescent' - approximate search using NN-descent; requires the optional dependency pynndescent
+    * 'hnsw' - approximate search using a Hierarchical Navigable Small World index; requires the optional dependency
+    hnswlib
+
+    Parameters
+    ----------
+    data : Numpy.array
+        (n, d) array of single cell data
+    k : int, (default=30)
+        number of neighbours
+    method : str, (default='exact')
+        method used for neighbour search
+    metric : str, (default='euclidean')
+        distance metric
+    n_jobs : int, (default=-1)
+        number of threads to use
+    kwargs :
+        additional keyword arguments passed to the neighbour search (e.g. ef_construction and M for 'hnsw')
+
+    Returns
+    -------
+    Numpy.array
+        (n, k) array of neighbour indices, ordered by distance (the event itself is excluded)
+    """
+    n = data.shape[0]
+    assert k < n, 'k must be less than the number of events'
+    if method in ['exact', 'kdtree', 'brute']:
+        algorithm = {'exact': 'auto', 'kdtree': 'kd_tree', 'brute': 'brute'}.get(method)
+        nn = NearestNeighbors(n_neighbors=k + 1, metric=metric, algorithm=algorithm, n_jobs=n_jobs, **kwargs)
+        idx = nn.fit(data).kneighbors(data, return_distance=False)
+    elif method == 'nndescent':
+        try:
+            from pynndescent import NNDescent
+        except ImportError:
+            raise ImportError('Approximate nearest neighbours with NN-descent requires pynndescent to be installed')
+        idx, _ = NNDescent(data, n_neighbors=k + 1, metric=metric, **kwargs).neighbor_graph
+    elif method == 'hnsw':
+        try:
+            import hnswlib
+        except ImportError:
+            raise ImportError('Approximate nearest neighbours with HNSW requires hnswlib to be installed')
+        assert metric in ['euclidean', 'cosine'], 'HNSW supports either euclidean or cosine metric'
+        index = hnswlib.Index(space='l2' if metric == 'euclidean' else 'cosine', dim=data.shape[1])
+        index.init_index(max_elements=n,
+                         ef_construction=kwargs.get('ef_construction', 200),
+                         M=kwargs.get('M', 16))
+        index.set_num_threads(n_jobs if n_jobs > 0 else os.cpu_count())
+        index.add_items(data)
+        index.set_ef(max(kwargs.get('ef', 100), k + 1))
+        idx, _ = index.knn_query(data, k=k + 1)
+    else:
+        raise ValueError('Invalid method for nearest neighbour search, must be one of: '
+                         '"exact", "kdtree", "brute", "nndescent", or "hnsw"')
+    return _drop_self(np.asarray(idx, dtype=np.int64), k)
+
+
+def jaccard_graph(idx: np.array,
+                  chunk_size: int = 10000) -> sparse.csr_matrix:
+    """
+    Generate a weighted graph from a kNN graph, where the weight of each edge (i, j) is the Jaccard similarity of the
+    neighbourhoods of i and j, as in PhenoGraph. The number of shared neighbours is computed with sparse matrix
+    products over chunks of rows, bounding memory to approximately chunk_size * k^2 entries.
+
+    Parameters
+    ----------
+    idx : Numpy.array
+        (n, k) array of neighbour indices
+    chunk_size : int, (default=10000)
+        number of events processed at once
+
+    Returns
+    -------
+    Scipy.sparse.csr_matrix
+        (n, n) directed graph of Jaccard coefficients
+    """
+    n, k = idx.shape
+    rows = np.repeat(np.arange(n), k)
+    adj = sparse.csr_matrix((np.ones(n * k, dtype=np.float32), (rows, idx.ravel())), shape=(n, n))
+    adj_t = adj.T.tocsr()
+    shared = list()
+    for start in range(0, n, chunk_size):
+        chunk = adj[start:start + chunk_size]
+        shared.append(sparse.csr_matrix((chunk @ adj_t).multiply(chunk)))
+    graph = sparse.vstack(shared).tocsr()
+    graph.data = graph.data / (2 * k - graph.data)
+    return graph
+
+
+def symmetrise(graph: sparse.csr_matrix,
+               prune: bool = False) -> sparse.csr_matrix:
+    """
+    Symmetrise a directed graph by taking either the average (prune=False) or the product (prune=True)
+    of the graph and its transpose.
+
+    Parameters
+    ----------
+    graph : Scipy.sparse.csr_matrix
+    prune : bool, (default=False)
+
+    Returns
+    -------
+    Scipy.sparse.csr_matrix
+    """
+    if prune:
+        return sparse.csr_matrix(graph.multiply(graph.transpose()))
+    return sparse.csr_matrix((graph + graph.transpose()).multiply(0.5))
+
+
+def sort_by_size(communities: np.array,
+                 min_size: int = 10) -> np.array:
+    """
+    Relabel communities so that they are numbered in order of decreasing size. Communities with fewer than
+    min_size events are given a label of -1.
+
+    Parameters
+    ----------
+    communities : Numpy.array
+        community assignments
+    min_size : int, (default=10)
+
+    Returns
+    -------
+    Numpy.array
+    """
+    labels, inverse, counts = np.unique(communities, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    keep = counts[order] >= min_size
+    new_labels = np.full(labels.shape[0], -1)
+    new_labels[order[keep]] = np.arange(keep.sum())
+    return new_labels[inverse.ravel()]
+
+
+def louvain(graph: sparse.spmatrix,
+            q_tol: float = 1e-3,
+            louvain_time_limit: int = 2000) -> (np.array, float):
+    """
+    Louvain community detection, using the implementation distributed with PhenoGraph
+
+    Parameters
+    ----------
+    graph : Scipy.sparse.spmatrix
+        weighted graph
+    q_tol : float, (default=1e-3)
+        tolerance for modularity increase
+    louvain_time_limit : int, (default=2000)
+        maximum number of seconds to run Louvain
+
+    Returns
+    -------
+    Numpy.array, float
+        community assignments, modularity
+    """
+    uid = uuid.uuid1().hex
+    try:
+        graph2binary(uid, sparse.coo_matrix(graph))
+        communities, q = runlouvain(uid, tol=q_tol, time_limit=louvain_time_limit)
+    finally:
+        for f in os.listdir('.'):
+            if f.startswith(uid):
+                os.remove(f)
+    return np.asarray(communities), q
+
+
+def leiden(graph: sparse.spmatrix,
+           resolution: float = 1.0,
+           seed: int = 42) -> (np.array, float):
+    """
+    Leiden community detection; requires the optional dependencies leidenalg and python-igraph
+
+    Parameters
+    ----------
+    graph : Scipy.sparse.spmatrix
+        symmetric weighted graph
+    resolution : float, (default=1.0)
+        resolution parameter (higher values result in more communities)
+    seed : int, (default=42)
+        random seed
+
+    Returns
+    -------
+    Numpy.array, float
+        community assignments, modularity
+    """
+    try:
+        import igraph
+        import leidenalg
+    except ImportError:
+        raise ImportError('Leiden community detection requires leidenalg and python-igraph to be installed')
+    upper = sparse.triu(graph, k=0).tocoo()
+    g = igraph.Graph(n=graph.shape[0], edges=list(zip(upper.row.tolist(), upper.col.tolist())), directed=False)
+    g.es['weight'] = upper.data.tolist()
+    partition = leidenalg.find_partition(g, leidenalg.RBConfigurationVertexPartition, weights='weight',
+                                         resolution_parameter=resolution, seed=seed)
+    return np.array(partition.membership), g.modularity(partition.membership, weights='weight')
+
+
+def phenograph(idx: np.array,
+               directed: bool = False,
+               prune: bool = False,
+               min_cluster_size: int = 10,
+               community_detection: str = 'louvain',
+               resolution: float = 1.0,
+               q_tol: float = 1e-3,
+               louvain_time_limit: int = 2000,
+               seed: int = 42) -> (np.array, sparse.csr_matrix, float):
+    """
+    PhenoGraph clustering from a precomputed kNN graph (see nearest_neighbours): events are connected by edges
+    weighted by the Jaccard similarity of their neighbourhoods and communities are found using either Louvain or
+    Leiden community detection. Separating the neighbour search from the remaining steps means the kNN graph can
+    be reused when exploring parameters.
+
+    Parameters
+    ----------
+    idx : Numpy.array
+        (n, k) array of neighbour indices
+    directed : bool, (default=False)
+        if True, the graph is not symmetrised (ignored if prune is True or community detection is Leiden)
+    prune : bool, (default=False)
+        if True, graph is symmetrised by the product, rather than the average, of the graph and its transpose
+    min_cluster_size : int, (default=10)
+        clusters with fewer events are assigned a label of -1
+    community_detection : str, (default='louvain')
+        either 'louvain' or 'leiden'
+    resolution : float, (default=1.0)
+        resolution parameter for Leiden community detection
+    q_tol : float, (default=1e-3)
+        tolerance for modularity increase (Louvain only)
+    louvain_time_limit : int, (default=2000)
+        maximum number of seconds to run Louvain
+    seed : int, (default=42)
+        random seed for Leiden community detection
+
+    Returns
+    -------
+    Numpy.array, Scipy.sparse.csr_matrix, float
+        community assignments, graph, modularity
+    """
+    graph = jaccard_graph(idx)
+    if prune or not directed or community_detection == 'leiden':
+        graph = symmetrise(graph, prune=prune)
+    if community_detection == 'louvain':
+        communities, q = louvain(graph, q_tol=q_tol, louvain_time_limit=louvain_time_limit)
+    elif community_detection == 'leiden':
+        communities, q = leiden(graph, resolution=resolution, seed=seed)
+    else:
+        raise ValueError('Invalid community detection method, must be either "louvain" or "leiden"')
+    return sort_by_size(communities, min_cluster_size), graph, q
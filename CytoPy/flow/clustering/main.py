@@ -1,22 +1,28 @@
 from mongoengine.base.datastructures import EmbeddedDocumentList
 from ...data.fcs_experiments import FCSExperiment
 from ...data.subject import Subject, MetaDataDictionary, gram_status, bugs, hmbpp_ribo, biology
-from ...data.fcs import Cluster, Population, ClusteringDefinition
+from ...data.fcs import FileGroup, Cluster, Population, ClusteringDefinition
 from ..transforms import scaler
 from ..gating.actions import Gating
+from ..gating.utilities import population_labels
 from ..feedback import progress_bar
 from ..dim_reduction import dimensionality_reduction
 from .flowsom import FlowSOM
 from .consensus import ConsensusCluster
+from .graph import nearest_neighbours, phenograph
+from itertools import combinations
 from anytree import Node
+from multiprocessing import Pool, cpu_count
+from functools import partial
 from matplotlib.colors import LogNorm
 from sklearn import preprocessing
 from sklearn.cluster import AgglomerativeClustering, KMeans
+from sklearn.metrics import adjusted_rand_score
+from sklearn.model_selection import ParameterGrid
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-import phenograph
 import scprep
 np.random.seed(42)
 
@@ -88,11 +94,204 @@ def _fetch_clustering_class(params: dict) -> (callable, dict):
         raise ValueError(e)
     elif params['cluster_class'] == 'kmeans':
         clustering = KMeans
-        params.pop('cluster_class')
     params.pop('cluster_class')
     return clustering, params
 
 
+_SWEEP_KNN = dict()
+
+FLOWSOM_TRAIN_PARAMS = ['neighborhood_function', 'normalisation', 'som_dim', 'sigma', 'learning_rate', 'batch_size',
+                        'seed', 'weight_init']
+FLOWSOM_META_PARAMS = ['cluster_class', 'min_n', 'max_n', 'iter_n', 'resample_proportion']
+
+
+def _init_sweep_worker(knn: dict) -> None:
+    """
+    Initialiser for parameter sweep worker processes; shares the cached kNN graphs with each worker once, rather
+    than once per task.
+
+    Parameters
+    ----------
+    knn : dict
+        kNN graphs, keyed as in Clustering.knn_cache
+
+    Returns
+    -------
+    None
+    """
+    global _SWEEP_KNN
+    _SWEEP_KNN = knn
+
+
+def _phenograph_trial(trial: tuple) -> (np.array, float):
+    """
+    Run a single PhenoGraph trial of a parameter sweep. Called in a worker process initialised with
+    _init_sweep_worker.
+
+    Parameters
+    ----------
+    trial : tuple
+        (kNN cache key, k, parameters passed to flow.clustering.graph.phenograph)
+
+    Returns
+    -------
+    Numpy.array, float
+        community assignments, modularity
+    """
+    key, k, params = trial
+    communities, _, q = phenograph(_SWEEP_KNN[key][:, :k], **params)
+    return communities, q
+
+
+def _flowsom_trial(trial: tuple) -> np.array:
+    """
+    Run the meta-clustering step of a single FlowSOM trial of a parameter sweep, using a previously trained SOM.
+
+    Parameters
+    ----------
+    trial : tuple
+        (flattened SOM weights, best matching unit of each event, meta-clustering parameters, random seed)
+
+    Returns
+    -------
+    Numpy.array
+        cluster assignments
+    """
+    weights, winners, params, seed = trial
+    np.random.seed(seed)
+    clustering, params = _fetch_clustering_class(params.copy())
+    consensus_clust = ConsensusCluster(cluster=clustering,
+                                       smallest_cluster_n=params.get('min_n'),
+                                       largest_cluster_n=params.get('max_n'),
+                                       n_resamples=params.get('iter_n'),
+                                       resample_proportion=params.get('resample_proportion', 0.5))
+    consensus_clust.fit(weights)
+    return np.asarray(consensus_clust.predict_data(weights))[winners]
+
+
+def stability(labels: list) -> float:
+    """
+    Stability of repeated clustering runs, given as the mean adjusted Rand index over all pairs of runs
+
+    Parameters
+    ----------
+    labels : list
+        list of cluster assignments, one array per run
+
+    Returns
+    -------
+    float
+        mean pairwise adjusted Rand index (NaN if fewer than two runs)
+    """
+    scores = [adjusted_rand_score(x, y) for x, y in combinations(labels, 2)]
+    if not scores:
+        return np.nan
+    return float(np.mean(scores))
+
+
+def summarise_clusters(data: pd.DataFrame,
+                       labels: np.array,
+                       cluster_ids: list or np.array,
+                       summary_method: str = 'median') -> pd.DataFrame:
+    """
+    Summarise the clusters of a single sample in one grouped reduction. Each event in data is assigned an integer
+    label, corresponding to the position of its cluster in cluster_ids (events not belonging to any cluster should
+    have a label of -1). Returns a DataFrame where each row is the centroid of a cluster (median or mean of each
+    numerical column), along with the cluster size (relative to all events in data), number of events, and the
+    modal population label (if data contains the column 'population_label').
+
+    Parameters
+    ----------
+    data : Pandas.DataFrame
+        single cell data for a single sample
+    labels : Numpy.array
+        integer array of length equal to the number of rows in data, specifying the cluster of each event
+    cluster_ids : list or Numpy.array
+        name of each cluster; the position in this array corresponds to the integer label
+    summary_method : str, (default='median')
+        how to calculate the centroid, either 'median' or 'mean'
+
+    Returns
+    -------
+    Pandas.DataFrame
+
+    """
+    assert summary_method in ['median', 'mean'], 'summary_method should be either "median" or "mean"'
+    assert len(labels) == data.shape[0], 'labels must be of equal length to data'
+    cluster_ids = np.array(cluster_ids)
+    labels = np.asarray(labels)
+    mask = labels >= 0
+    labels = labels[mask]
+    clustered = data.loc[mask]
+    grouped = clustered.select_dtypes(include=[np.number]).groupby(labels)
+    centroids = grouped.median() if summary_method == 'median' else grouped.mean()
+    if 'population_label' in clustered.columns:
+        modal_label = pd.crosstab(labels, clustered['population_label'].values).idxmax(axis=1)
+        centroids['population_label'] = modal_label
+    n = np.bincount(labels, minlength=len(cluster_ids))[centroids.index.values]
+    centroids['cluster_id'] = cluster_ids[centroids.index.values]
+    centroids['cluster_size'] = n / data.shape[0]
+    centroids['cluster_n'] = n
+    return centroids.reset_index(drop=True)
+
+
+def _sample_cluster_centroids(sample_id: str,
+                              experiment: FCSExperiment,
+                              clustering_definition: ClusteringDefinition,
+                              scale: str or None = None,
+                              summary_method: str = 'median') -> pd.DataFrame or None:
+    """
+    Load the clusters of a single sample (for the given clustering definition) and return a DataFrame of cluster
+    centroids (see summarise_clusters). Used by MetaClustering for multi-process loading.
+
+    Parameters
+    ----------
+    sample_id : str
+        sample identifier
+    experiment : FCSExperiment
+        experiment the sample belongs to
+    clustering_definition : ClusteringDefinition
+        clustering definition of the clusters to load
+    scale : str, optional
+        scaling function to apply to features prior to summarising
+    summary_method : str, (default='median')
+        how to calculate the centroid, either 'median' or 'mean'
+
+    Returns
+    -------
+    Pandas.DataFrame or None
+        None if the sample could not be loaded or has no clusters
+
+    """
+    ce = clustering_definition
+    try:
+        fg = experiment.pull_sample(sample_id)
+        root_p = fg.get_population(ce.root_population)
+        if ce.clustering_uid not in root_p.list_clustering_experiments():
+            print(f'No clusters found for clustering UID {ce.clustering_uid} and sample {sample_id}')
+            return None
+        clusters = root_p.get_many_clusters(ce.clustering_uid)
+        sample = Gating(experiment, sample_id, include_controls=False)
+        data = sample.get_population_df(ce.root_population,
+                                        transform=bool(ce.transform_method),
+                                        transform_method=ce.transform_method)
+    except (KeyError, AssertionError) as e:
+        print(f'failed to load data for {sample_id}: {e}')
+        return None
+    if scale is not None:
+        data[ce.features] = scaler(data[ce.features], scale_method=scale)[0]
+    data = Clustering(clustering_definition=ce)._population_labels(data, sample.populations[ce.root_population])
+    labels = np.full(data.shape[0], -1, dtype=np.int32)
+    for i, c in enumerate(clusters):
+        idx = data.index.get_indexer(c.load_index())
+        labels[idx[idx >= 0]] = i
+    centroids = summarise_clusters(data, labels, [c.cluster_id for c in clusters], summary_method)
+    pt = Subject.objects(files__contains=sample.mongo_id)
+    centroids['pt_id'] = pt[0].subject_id if pt else None
+    centroids['sample_id'] = sample_id
+    return centroids
+
+
 class Explorer:
     """
     The Explorer class is used to visualise the results of a clustering analysis and explore the results in
@@ -620,6 +819,12 @@ class Clustering:
     data: Pandas.DataFrame
         a Pandas DataFrame that is populated with clustering information can be passed onto the
         Explorer class for visualisation
+    knn_cache: dict
+        nearest neighbours of each event in data, cached for reuse when PhenoGraph is run repeatedly
+        (e.g. for different values of k or resolution). Keyed by (features, nn_method, metric).
+    som_cache: dict
+        weights of trained self-organising maps and the best matching unit of each event, cached for reuse
+        in parameter sweeps of FlowSOM meta-clustering
 
     """
     def __init__(self, clustering_definition: ClusteringDefinition):
@@ -627,6 +832,8 @@ class Clustering:
         self.data = pd.DataFrame()
         self.graph = None
         self.q = None
+        self.knn_cache = dict()
+        self.som_cache = dict()
 
     def _has_data(self):
         """Internal method. Check that self.data has been populated. If not raise an Assertion Error."""
@@ -670,21 +877,230 @@ class Clustering:
             Pandas DataFrame with 'population_label' column
 
         """
-
-        def recursive_label(d, n):
-            mask = d.index.isin(n.index)
-            d.loc[mask, 'population_label'] = n.name
-            if len(n.children) == 0:
-                return d
-            for c in n.children:
-                recursive_label(d, c)
-            return d
-
         data = data.copy()
-        data['population_label'] = self.ce.root_population
-        data = recursive_label(data, root_node)
+        data['population_label'] = population_labels(data.index, root_node, default=self.ce.root_population)
         return data
 
+    def knn(self,
+            features: list,
+            k: int = 30,
+            nn_method: str = 'exact',
+            primary_metric: str = 'euclidean',
+            n_jobs: int = -1,
+            **kwargs) -> np.array:
+        """
+        Return the k nearest neighbours of each event in data (see flow.clustering.graph.nearest_neighbours).
+        Results are cached, so that subsequent calls with the same features, method and metric, and a value of k no
+        greater than that previously computed, do not repeat the neighbour search.
+
+        Parameters
+        ----------
+        features : list
+            features to use for neighbour search
+        k : int, (default=30)
+            number of neighbours
+        nn_method : str, (default='exact')
+            method for neighbour search; either exact ('exact', 'kdtree', 'brute') or approximate ('nndescent', 'hnsw')
+        primary_metric : str, (default='euclidean')
+            distance metric
+        n_jobs : int, (default=-1)
+            number of threads to use
+        kwargs :
+            additional keyword arguments passed to neighbour search
+
+        Returns
+        -------
+        Numpy.array
+            (n, k) array of neighbour indices
+        """
+        self._has_data()
+        key = (tuple(features), nn_method, primary_metric)
+        idx = self.knn_cache.get(key)
+        if idx is None or idx.shape[1] < k:
+            idx = nearest_neighbours(self.data[features].values, k=k, method=nn_method, metric=primary_metric,
+                                     n_jobs=n_jobs, **kwargs)
+            self.knn_cache[key] = idx
+        return idx[:, :k]
+
+    @staticmethod
+    def _split_phenograph_params(params: dict) -> (dict, dict):
+        """
+        Internal method. Split PhenoGraph parameters into those for neighbour search (see knn) and those for graph
+        construction and community detection (see flow.clustering.graph.phenograph).
+
+        Parameters
+        ----------
+        params : dict
+            clustering parameters
+
+        Returns
+        -------
+        dict, dict
+            kNN parameters, graph parameters
+        """
+        params = params.copy()
+        if not params.pop('jaccard', True):
+            raise ValueError('PhenoGraph clustering only supports Jaccard weighting')
+        knn_params = filter_dict(params, ['k', 'nn_method', 'primary_metric', 'n_jobs'])
+        graph_params = filter_dict(params, ['directed', 'prune', 'min_cluster_size', 'community_detection',
+                                            'resolution', 'q_tol', 'louvain_time_limit', 'seed'])
+        invalid = [k for k in params.keys() if k not in list(knn_params.keys()) + list(graph_params.keys())]
+        assert not invalid, f'Invalid parameters for PhenoGraph: {invalid}'
+        return knn_params, graph_params
+
+    def _phenograph(self, features: list, params: dict) -> np.array:
+        """
+        Internal method. PhenoGraph clustering of data using the given parameters; the kNN graph is fetched from
+        the cache where possible (see knn). Valid parameters are: k, nn_method, primary_metric, n_jobs, directed,
+        prune, min_cluster_size, community_detection ('louvain' or 'leiden'), resolution, q_tol, louvain_time_limit
+        and seed.
+
+        Parameters
+        ----------
+        features : list
+            features to cluster on
+        params : dict
+            clustering parameters
+
+        Returns
+        -------
+        Numpy.array
+            Numpy array of clustering assignments
+        """
+        knn_params, graph_params = self._split_phenograph_params(params)
+        idx = self.knn(features, **knn_params)
+        communities, graph, q = phenograph(idx, **graph_params)
+        self.graph = graph
+        self.q = q
+        return communities
+
+    def _sweep_phenograph(self, features: list, settings: list, n_repeats: int) -> list:
+        """
+        Internal method. Run PhenoGraph for each parameter setting. Neighbour search is performed once for each
+        combination of nn_method and primary_metric (for the largest k requested) and shared with worker processes,
+        which run graph construction and community detection in parallel.
+
+        Parameters
+        ----------
+        features : list
+            features to cluster on
+        settings : list
+            list of parameter dictionaries
+        n_repeats : int
+            number of runs per setting
+
+        Returns
+        -------
+        list
+            list of dictionaries of metrics (n_clusters, modularity, stability), one per setting
+        """
+        settings = [self._split_phenograph_params(params) for params in settings]
+        max_k = dict()
+        for knn_params, _ in settings:
+            key = (knn_params.get('nn_method', 'exact'), knn_params.get('primary_metric', 'euclidean'))
+            max_k[key] = max(max_k.get(key, 0), knn_params.get('k', 30))
+        for (nn_method, metric), k in max_k.items():
+            self.knn(features, k=k, nn_method=nn_method, primary_metric=metric)
+        trials = list()
+        for knn_params, graph_params in settings:
+            key = (tuple(features), knn_params.get('nn_method', 'exact'), knn_params.get('primary_metric', 'euclidean'))
+            seed = graph_params.get('seed', 42)
+            for i in range(n_repeats):
+                trials.append((key, knn_params.get('k', 30), {**graph_params, 'seed': seed + i}))
+        knn = {key: self.knn_cache[key] for key in set([t[0] for t in trials])}
+        pool = Pool(cpu_count(), initializer=_init_sweep_worker, initargs=(knn,))
+        output = pool.map(_phenograph_trial, trials)
+        pool.close()
+        pool.join()
+        metrics = list()
+        for i in range(0, len(output), n_repeats):
+            labels = [communities for communities, _ in output[i:i + n_repeats]]
+            metrics.append(dict(n_clusters=np.mean([len(np.unique(x[x != -1])) for x in labels]),
+                                modularity=np.mean([q for _, q in output[i:i + n_repeats]]),
+                                stability=stability(labels)))
+        return metrics
+
+    def _sweep_flowsom(self, features: list, settings: list, n_repeats: int) -> list:
+        """
+        Internal method. Run FlowSOM for each parameter setting. A self-organising map is trained once for each
+        unique combination of training parameters (and cached, see som_cache); meta-clustering is then performed
+        in parallel worker processes.
+
+        Parameters
+        ----------
+        features : list
+            features to cluster on
+        settings : list
+            list of parameter dictionaries
+        n_repeats : int
+            number of runs per setting
+
+        Returns
+        -------
+        list
+            list of dictionaries of metrics (n_clusters, stability), one per setting
+        """
+        trials = list()
+        for params in settings:
+            train_params = filter_dict(params, FLOWSOM_TRAIN_PARAMS)
+            key = (tuple(features), repr(sorted(train_params.items())))
+            if key not in self.som_cache.keys():
+                som = FlowSOM(data=self.data, features=features,
+                              **filter_dict(train_params, ['neighborhood_function', 'normalisation']))
+                som.train(**filter_dict(train_params, ['som_dim', 'sigma', 'learning_rate', 'batch_size',
+                                                       'seed', 'weight_init']))
+                self.som_cache[key] = (som.flatten_weights, som.winners())
+            weights, winners = self.som_cache[key]
+            meta_params = filter_dict(params, FLOWSOM_META_PARAMS)
+            for i in range(n_repeats):
+                trials.append((weights, winners, meta_params, train_params.get('seed', 42) + i))
+        pool = Pool(cpu_count())
+        output = pool.map(_flowsom_trial, trials)
+        pool.close()
+        pool.join()
+        metrics = list()
+        for i in range(0, len(output), n_repeats):
+            labels = output[i:i + n_repeats]
+            metrics.append(dict(n_clusters=np.mean([len(np.unique(x)) for x in labels]),
+                                stability=stability(labels)))
+        return metrics
+
+    def sweep(self, param_grid: dict, n_repeats: int = 3) -> pd.DataFrame:
+        """
+        Evaluate a grid of parameters for the clustering method in the ClusteringDefinition, using the data
+        currently loaded. Parameters in the grid override those of the ClusteringDefinition. Intermediate results are
+        cached and shared between settings (the kNN graph for PhenoGraph, the trained SOM for FlowSOM) and settings are
+        evaluated in parallel. Each setting is run n_repeats times (with a different random seed) and the following
+        is reported:
+        * n_clusters - average number of clusters found
+        * modularity - average modularity of the community assignment (PhenoGraph only)
+        * stability - average adjusted Rand index between each pair of runs
+
+        Parameters
+        ----------
+        param_grid : dict
+            dictionary of parameter names and a list of values to evaluate for each e.g. {'k': [15, 30, 45]}
+        n_repeats : int, (default=3)
+            number of runs for each setting
+
+        Returns
+        -------
+        Pandas.DataFrame
+            One row per setting, with a column for each parameter in param_grid and each metric
+        """
+        self._has_data()
+        features = self._check_null()
+        base = {k: v for k, v in self.ce.parameters}
+        grid = list(ParameterGrid(param_grid))
+        settings = [{**base, **params} for params in grid]
+        if self.ce.method == 'PhenoGraph':
+            metrics = self._sweep_phenograph(features, settings, n_repeats)
+        elif self.ce.method == 'FlowSOM':
+            metrics = self._sweep_flowsom(features, settings, n_repeats)
+        else:
+            raise ValueError('Parameter sweeps are supported for PhenoGraph and FlowSOM')
+        return pd.DataFrame([{**params, **m} for params, m in zip(grid, metrics)])
+
     def cluster(self) -> np.array:
         """
         Perform clustering analysis as specified by the ClusteringDefinition. Valid methods currently include PhenoGraph
@@ -700,11 +1116,9 @@ class Clustering:
         if self.ce.method == 'PhenoGraph':
             params = {k: v for k, v in self.ce.parameters}
             features = self._check_null()
-            communities, graph, q = phenograph.cluster(self.data[features], **params)
+            communities = self._phenograph(features, params)
             if self.ce.cluster_prefix is not None:
                 communities = np.array(list(map(lambda x: f'{self.ce.cluster_prefix}_{x}', communities)))
-            self.graph = graph
-            self.q = q
             return communities
         elif self.ce.method == 'FlowSOM':
             params = {k: v for k, v in self.ce.parameters}
@@ -784,6 +1198,8 @@ class SingleClustering(Clustering):
         """
         self.experiment = experiment
         self.sample_id = sample_id
+        self.knn_cache = dict()
+        self.som_cache = dict()
         fg = experiment.pull_sample(sample_id)
         root_p = fg.get_population(self.ce.root_population)
         if self.ce.clustering_uid in root_p.list_clustering_experiments():
@@ -966,6 +1382,8 @@ class GlobalClustering(Clustering):
 
         """
         print(f'------------ Loading flow data: {experiment.experiment_id} ------------')
+        self.knn_cache = dict()
+        self.som_cache = dict()
         for sid in progress_bar(samples):
             # Pull root population from file and transform
             g = Gating(experiment, sid, include_controls=False)
@@ -1022,8 +1440,8 @@ class MetaClustering(Clustering):
     (cluster of the clusters) that describe the commonality between individual clustering.
     Performing clustering on individual samples has the benefit in that clustering will not be disrupted by batch effect
     (technical variation between patients) but we must find a way of contrasting the clustering between patients. This
-    is what this class is for. The approach taken is that each clusters centroid is calculated (the median of each
-    feature) and these centroids form a new multi-dimensional data point which are then subsequently clustered.
+    is what this class is for. The approach taken is that each clusters centroid is calculated (the median, or mean, of
+    each feature) and these centroids form a new multi-dimensional data point which are then subsequently clustered.
     Clustering is performed either by a single run of PhenoGraph clustering, or by Consensus Clustering.
     For stable clusters it is recommended to use Consensus Clustering.
 
@@ -1038,16 +1456,20 @@ class MetaClustering(Clustering):
     load_existing_meta: bool, (default=False)
         If True, existing meta-clusters (with the meta-clustering UID in the clustering definition) will be loaded
         into the object
+    summary_method: str, (default='median')
+        How the centroid of each cluster is calculated, either 'median' or 'mean'
 
     """
     def __init__(self, experiment: FCSExperiment,
                  samples: str or list = 'all',
                  scale: str or None = 'norm',
                  load_existing_meta: bool = False,
+                 summary_method: str = 'median',
                  **kwargs):
         super().__init__(**kwargs)
         self.experiment = experiment
         self.scale = scale
+        self.summary_method = summary_method
         if type(samples) == str:
             assert samples == 'all', 'Invalid input, samples must be a list of existing samples or a value of "all" for ' \
                                      'all samples'
@@ -1062,22 +1484,41 @@ class MetaClustering(Clustering):
     def load_existing_clusters(self):
         """
         Load existing meta-cluster ID for each cluster (note: a cluster can only ever have one meta-cluster ID).
-        Meta-clusters are saved to DataFrame in column 'meta_cluster_id'.
-        """
-        def load(sample_id, cluster_id):
-            fg = self.experiment.pull_sample(sample_id)
-            root = fg.get_population(self.ce.root_population)
-            clusters = root.get_many_clusters(self.ce.meta_clustering_uid_target)
-            cluster = [c for c in clusters if c.cluster_id == cluster_id][0]
-            assert cluster.meta_cluster_id, f'Meta cluster missing from {sample_id}, repeat clustering'
-            return cluster.meta_cluster_id
-        self.data['meta_cluster_id'] = self.data.apply(lambda row: load(row['sample_id'], row['cluster_id']), axis=1)
+        Meta-clusters are saved to DataFrame in column 'meta_cluster_id'. A single projection query is made for
+        each sample, returning only the cluster and meta-cluster IDs, and the result is merged with the DataFrame.
+        """
+        target = ClusteringDefinition.objects(clustering_uid=self.ce.meta_clustering_uid_target)
+        assert target, f'No such clustering definition {self.ce.meta_clustering_uid_target} to target'
+        target_id = target[0].id
+        # Map sample IDs to FileGroup IDs from the raw references, without dereferencing each FileGroup
+        refs = FCSExperiment.objects(id=self.experiment.id).only('fcs_files').as_pymongo().get().get('fcs_files', [])
+        mongo_ids = FileGroup.objects(id__in=[getattr(r, 'id', r) for r in refs]).only('id', 'primary_id')
+        mongo_ids = {f.get('primary_id'): f.get('_id') for f in mongo_ids.as_pymongo()}
+        existing = list()
+        for sample_id in progress_bar(self.data.sample_id.unique()):
+            fg = FileGroup.objects(id=mongo_ids[sample_id]).only('populations.population_name',
+                                                                 'populations.clustering.cluster_id',
+                                                                 'populations.clustering.meta_cluster_id',
+                                                                 'populations.clustering.cluster_experiment')
+            fg = fg.as_pymongo().get()
+            for pop in fg.get('populations', []):
+                if pop.get('population_name') != self.ce.root_population:
+                    continue
+                existing = existing + [(sample_id, c.get('cluster_id'), c.get('meta_cluster_id'))
+                                       for c in pop.get('clustering', [])
+                                       if c.get('cluster_experiment') == target_id]
+        existing = pd.DataFrame(existing, columns=['sample_id', 'cluster_id', 'meta_cluster_id'])
+        data = self.data.drop('meta_cluster_id', axis=1, errors='ignore')
+        data = data.merge(existing, on=['sample_id', 'cluster_id'], how='left')
+        missing = data[data.meta_cluster_id.isnull()].sample_id.unique()
+        assert len(missing) == 0, f'Meta cluster missing from {missing}, repeat clustering'
+        self.data = data
 
     def load_clusters(self, samples: list) -> pd.DataFrame:
         """
         Load the clusters from each sample and populate a new dataframe. Each row of the dataframe corresponds to
-        a unique cluster from an individual patient sample, with the values of each feature being the median (centroid
-        of this cluster).
+        a unique cluster from an individual patient sample, with the values of each feature being the median or mean
+        (centroid of this cluster). Samples are summarised in parallel, see summarise_clusters.
 
         Parameters
         ----------
@@ -1091,36 +1532,23 @@ class MetaClustering(Clustering):
         """
         print('--------- Meta Clustering: Loading data ---------')
         print('Each sample will be fetched from the database and a summary matrix created. Each row of this summary '
-              'matrix will be a vector describing the centroid (the median of each channel/marker) of each cluster. ')
+              f'matrix will be a vector describing the centroid (the {self.summary_method} of each channel/marker) '
+              'of each cluster. ')
         columns = self.ce.features + ['sample_id', 'cluster_id']
-        clusters = pd.DataFrame(columns=columns)
         target_clustering_def = ClusteringDefinition.objects(clustering_uid=self.ce.meta_clustering_uid_target)
         assert target_clustering_def, f'No such clustering definition {self.ce.meta_clustering_uid_target} to target'
-        for s in progress_bar(samples):
-            clustering = SingleClustering(clustering_definition=target_clustering_def[0])
-            try:
-                clustering.load_data(experiment=self.experiment,
-                                     sample_id=s,
-                                     scale=self.scale,
-                                     include_population_label=True)
-            except KeyError as e:
-                print(f'failed to load data for {s}: {e}')
-                continue
-            pt_id = clustering.data['pt_id'].values[0]
-            if len(clustering.clusters.keys()) == 0:
-                print(f'No clusters found for clustering UID '
-                      f'{target_clustering_def[0].clustering_uid} and sample {s}')
-            for c_name in clustering.clusters.keys():
-                c_data = clustering.get_cluster_dataframe(c_name)
-                n = c_data.shape[0]
-                relative_n = n/clustering.data.shape[0]
-                pop_label = c_data['population_label'].mode()[0]
-                c_data = c_data.median()
-                c_data['population_label'] = pop_label
-                c_data['cluster_id'], c_data['cluster_size'], c_data['cluster_n'], \
-                    c_data['pt_id'], c_data['sample_id'] = c_name, relative_n, n, pt_id, s
-                clusters = clusters.append(c_data, ignore_index=True)
-        return clusters
+        f = partial(_sample_cluster_centroids,
+                    experiment=self.experiment,
+                    clustering_definition=target_clustering_def[0],
+                    scale=self.scale,
+                    summary_method=self.summary_method)
+        pool = Pool(cpu_count())
+        clusters = [c for c in pool.map(f, samples) if c is not None]
+        pool.close()
+        pool.join()
+        if not clusters:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(clusters, ignore_index=True, sort=False)
 
     def cluster(self):
         """
@@ -1168,19 +1596,19 @@ class MetaClustering(Clustering):
 
     def save(self):
         """
-        Save results of meta-clustering to underlying database
+        Save results of meta-clustering to underlying database. Clusters are grouped by sample so that each
+        FileGroup is fetched and saved only once.
 
         """
-        def _save(x):
-            fg = self.experiment.pull_sample(x.sample_id)
-            pop = fg.get_population(self.ce.root_population)
-            cluster = [c for c in pop.clustering if c.cluster_id == x.cluster_id][0]
-            cluster.meta_cluster_id = x.meta_cluster_id
-            pop.update_cluster(x.cluster_id, cluster)
-            fg.update_population(pop.population_name, pop)
-
         assert 'meta_cluster_id' in self.data.columns, 'Must run meta-clustering prior to calling save'
-        self.data.apply(_save, axis=1)
+        for sample_id, sample_clusters in progress_bar(self.data.groupby('sample_id')):
+            meta_ids = dict(zip(sample_clusters.cluster_id.values, sample_clusters.meta_cluster_id.values))
+            fg = self.experiment.pull_sample(sample_id)
+            pop = fg.get_population(self.ce.root_population)
+            for cluster in pop.get_many_clusters(self.ce.meta_clustering_uid_target):
+                if cluster.cluster_id in meta_ids.keys():
+                    cluster.meta_cluster_id = meta_ids[cluster.cluster_id]
+            fg.save()
         self.experiment.meta_cluster_ids = list(self.data.meta_cluster_id.values)
         self.experiment.save()
 
@@ -8,6 +8,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.svm import LinearSVC
 from .feedback import progress_bar
 from functools import reduce
+from multiprocessing import Pool, cpu_count
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
@@ -92,14 +93,20 @@ class ControlComparisons:
                   'must provide details of the "x" and "y" dimensions for model fitting for each gate')
             print('\n')
 
-        for s in progress_bar(not_gated):
-            for ctrl in samples[s]['all']:
-                if ctrl in samples[s]['gated']:
-                    continue
+        # Each sample is loaded (and saved) once and its controls gated in parallel; the pool is created prior to
+        # loading any data and is reused for all samples
+        pool = Pool(cpu_count())
+        try:
+            for s in progress_bar(not_gated):
+                ctrls = [c for c in samples[s]['all'] if c not in samples[s]['gated']]
                 g = Gating(self.experiment, s, include_controls=True)
-                g.control_gating(ctrl, tree_map=tree_map, model=gating_model, verbose=False, **model_kwargs)
+                g.batch_control_gating(ctrls, tree_map=tree_map, model=gating_model, verbose=False, pool=pool,
+                                       **model_kwargs)
                 g.save(feedback=False)
-                samples[s]['gated'].append(ctrl)
+                samples[s]['gated'] = samples[s]['gated'] + ctrls
+        finally:
+            pool.close()
+            pool.join()
         return {s: ctrls['gated'] for s, ctrls in samples.items()}
 
     def _check_samples(self,
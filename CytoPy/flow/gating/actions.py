@@ -13,10 +13,10 @@ from .quantile import Quantile
 from .mixturemodel import MixtureModel
 from .defaults import ChildPopulationCollection
 from .plotting import Plot
-from .utilities import get_params, inside_ellipse, inside_polygon
+from .utilities import get_params, population_labels
+from .geometry import geom_masks, valid_geom
 from ..feedback import progress_bar
 # Housekeeping and other tools
-from mongoengine.base import BaseList
 from anytree.exporter import DotExporter
 from anytree import Node, RenderTree
 from anytree.search import findall
@@ -29,10 +29,56 @@ import copy
 # Scipy
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.svm import SVC
+from sklearn.linear_model import LogisticRegression
+from sklearn.base import clone
+from multiprocessing import Pool, cpu_count
 import pandas as pd
 import numpy as np
 
 
+def _gate_control(task: tuple) -> (str, dict):
+    """
+    Internal function. Predict the populations of a single control (see Gating.batch_control_gating).
+    Predictors are applied in order, parents before children, each to the events of the parent population
+    in the control. A predictor is either:
+    * ('geom', parent, {population name: geom}) - the geoms of populations sharing a parent are applied
+    directly to the control data (see flow.gating.geometry.geom_masks)
+    * ('model', parent, population name, x, y, fitted model) - a classifier trained on the primary data
+
+    Parameters
+    ----------
+    task: tuple
+        (control ID, control data, list of predictors, dict of existing control index for each population
+        {population name: index}; must include the root population)
+
+    Returns
+    -------
+    str, dict
+        control ID, control index of each population
+    """
+    ctrl_id, ctrl_data, predictors, cache = task
+    for kind, parent, *rule in predictors:
+        parent_idx = cache[parent]
+        if kind == 'geom':
+            populations = [p for p in rule[0].keys() if p not in cache.keys()]
+            if parent_idx.shape[0] == 0:
+                cache.update({p: parent_idx for p in populations})
+            elif populations:
+                parent_data = ctrl_data.iloc[ctrl_data.index.get_indexer(parent_idx)]
+                masks = geom_masks({p: rule[0][p] for p in populations}, parent_data)
+                cache.update({p: parent_idx[mask] for p, mask in masks.items()})
+            continue
+        population, x, y, model = rule
+        if population in cache.keys():
+            continue
+        if parent_idx.shape[0] == 0:
+            cache[population] = parent_idx
+            continue
+        xy = ctrl_data[[x, y]].values[ctrl_data.index.get_indexer(parent_idx)]
+        cache[population] = parent_idx[model.predict(xy) == 1]
+    return ctrl_id, cache
+
+
 class Gating:
     """Central class for performing semi-automated gating and storing gating information on an FCS FileGroup of a single sample.
     
@@ -188,6 +234,63 @@ class Gating:
                                                       f'{self.populations.keys()}'
         return len(self.populations[population].index)
 
+    def _positions(self,
+                   idx: np.array) -> np.array:
+        """
+        Internal function. Convert index values of the primary data (as stored for each population) to positions
+        in the primary data, such that events can be selected without a hash look-up when the index is a
+        default (range) index.
+
+        Parameters
+        ----------
+        idx: Numpy.array
+            index values
+
+        Returns
+        -------
+        Numpy.array
+            positional index
+        """
+        index = self.data.index
+        if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+            return np.asarray(idx, dtype=np.int64)
+        return index.get_indexer(idx)
+
+    def population_mask(self,
+                        population: str) -> np.array:
+        """
+        Boolean mask over the events of the primary data, True for events that belong to the given population
+
+        Parameters
+        ----------
+        population : str
+            population name
+
+        Returns
+        -------
+        Numpy.array
+        """
+        assert population in self.populations.keys(), f'Population invalid, valid population names: ' \
+                                                      f'{self.populations.keys()}'
+        mask = np.zeros(self.data.shape[0], dtype=bool)
+        mask[self._positions(self.populations[population].index)] = True
+        return mask
+
+    def _mask_to_index(self,
+                       mask: np.array) -> np.array:
+        """
+        Internal function. Convert a boolean mask over the primary data to population index values
+
+        Parameters
+        ----------
+        mask: Numpy.array
+
+        Returns
+        -------
+        Numpy.array
+        """
+        return self.data.index.values[mask]
+
     def _deserialise_gate(self,
                           gate: DataGate):
         """
@@ -279,19 +382,14 @@ class Gating:
             return None
         if ctrl_id is None:
             idx = self.populations[population_name].index
-            data = self.data.loc[idx]
+            data = self.data.iloc[self._positions(idx)]
         else:
             idx = self.populations[population_name].control_idx.get(ctrl_id)
             assert idx is not None, f'No cached index for {ctrl_id} associated to population {population_name}, ' \
                                     f'have you called "control_gating" previously?'
             data = self.ctrl[ctrl_id].loc[idx]
         if label:
-            data['label'] = None
-            dependencies = self.find_dependencies(population_name)
-            dependencies = [p for p in dependencies if p != population_name]
-            for pop in dependencies:
-                idx = self.populations[pop].index
-                data.loc[idx, 'label'] = pop
+            data['label'] = population_labels(data.index, self.populations[population_name])
         if transform_method is None:
             transform = False
         if transform:
@@ -356,13 +454,111 @@ class Gating:
             return self.ctrl[ctrl_id].loc[idx]
         return self.populations[target_population].control_idx.get(ctrl_id)
 
+    @staticmethod
+    def _ctrl_model(model: str,
+                    **model_kwargs) -> SVC or KNeighborsClassifier or LogisticRegression:
+        """
+        Internal method. Generate an (unfitted) classifier for predicting populations in control data
+
+        Parameters
+        ----------
+        model : str
+            Either 'knn' (K-Nearest Neighbours), 'svm' (Support Vector Machine) or 'linear' (logistic regression)
+        model_kwargs :
+            Additional keyword arguments to pass to instance of Scikit-Learn classifier
+
+        Returns
+        -------
+        Object
+            Instance of Scikit-Learn classifier
+        """
+        if model == 'knn':
+            return KNeighborsClassifier(**model_kwargs)
+        if model == 'svm':
+            return SVC(**model_kwargs)
+        if model == 'linear':
+            return LogisticRegression(**model_kwargs)
+        raise ValueError('Currently only KNearestNeighbours (knn), Support Vector Machines (svm) or logistic '
+                         'regression (linear) are supported')
+
+    def _fit_ctrl_model(self,
+                        target_population: str,
+                        model: SVC or KNeighborsClassifier,
+                        mappings: dict or None = None) -> (str, str, SVC or KNeighborsClassifier):
+        """
+        Internal method. Fit a classifier to predict a target population from its parent, using (up to 10000
+        events of) the primary data as training data.
+
+        Parameters
+        ----------
+        target_population : str
+            Name of population to predict
+        model : Object
+            Instance of Scikit-Learn classifier; a fitted copy is returned
+        mappings : dict, optional
+            Dictionary of axis mappings for classification (necessary if training data is generated from a supervised
+            learning method)
+
+        Returns
+        -------
+        str, str, Object
+            x-axis, y-axis, fitted classifier
+        """
+        target_node = self.populations.get(target_population)
+        x, y = target_node.geom.get('x'), target_node.geom.get('y') or 'FSC-A'
+        if x is None or y is None:
+            assert mappings, f'{target_population} has no specified x and y, please provide mappings'
+            x = x or mappings.get('x')
+            y = y or mappings.get('y')
+        # Prepare training data
+        parent_idx = target_node.parent.index
+        if parent_idx.shape[0] > 10000:
+            parent_idx = np.random.choice(parent_idx, 10000, replace=False)
+        train = self.data[[x, y]].values[self._positions(parent_idx)]
+        y_ = np.isin(parent_idx, target_node.index).astype(int)
+        return x, y, clone(model).fit(train, y_)
+
+    def _ctrl_predictor(self,
+                        target_population: str,
+                        model: SVC or KNeighborsClassifier or LogisticRegression,
+                        mappings: dict or None = None,
+                        use_geom: bool = True) -> tuple:
+        """
+        Internal method. Generate the predictor of a target population in control data (see _gate_control).
+        If use_geom is True and the population has a geom that fully describes its gate, the geom is applied
+        directly to the control data, otherwise a classifier is trained on the primary data.
+
+        Parameters
+        ----------
+        target_population : str
+            Name of population to predict
+        model : Object
+            Instance of Scikit-Learn classifier
+        mappings : dict, optional
+            Dictionary of axis mappings for classification (necessary if training data is generated from a supervised
+            learning method)
+        use_geom : bool, (default=True)
+            If True, apply the geom of the population where possible
+
+        Returns
+        -------
+        tuple
+        """
+        target_node = self.populations.get(target_population)
+        if use_geom and valid_geom(target_node.geom):
+            return 'geom', target_node.parent.name, {target_population: target_node.geom}
+        x, y, fitted = self._fit_ctrl_model(target_population, model, mappings)
+        return 'model', target_node.parent.name, target_population, x, y, fitted
+
     def _predict_ctrl_population(self,
                                  target_population: str,
                                  ctrl_id: str,
-                                 model: SVC or KNeighborsClassifier,
-                                 mappings: dict or None = None):
-        """Internal method. Predict a target population for a given control using the primary data as
-        training data. Results are assigned to population node.
+                                 model: SVC or KNeighborsClassifier or LogisticRegression,
+                                 mappings: dict or None = None,
+                                 use_geom: bool = True):
+        """Internal method. Predict a target population for a given control, either by applying the geom of the
+        population or using the primary data as training data (see _ctrl_predictor). Results are assigned to
+        population node.
 
         Parameters
         ----------
@@ -375,6 +571,8 @@ class Gating:
         mappings : dict, optional
             Dictionary of axis mappings for classification (necessary if training data is generated from a supervised
             learning method)
+        use_geom : bool, (default=True)
+            If True, apply the geom of the population where possible
 
         Returns
         -------
@@ -384,26 +582,12 @@ class Gating:
         target_node = self.populations.get(target_population)
         cache_idx = self.search_ctrl_cache(target_node.parent.name, ctrl_id)
         if cache_idx is None:
-            self._predict_ctrl_population(target_node.parent.name, ctrl_id, model, mappings)
+            self._predict_ctrl_population(target_node.parent.name, ctrl_id, model, mappings, use_geom)
             cache_idx = self.search_ctrl_cache(target_node.parent.name, ctrl_id)
-
-        x, y = target_node.geom.get('x'), target_node.geom.get('y') or 'FSC-A'
-        if x is None or y is None:
-            assert mappings, f'{target_population} has no specified x and y, please provide mappings'
-            x = x or mappings.get('x')
-            y = y or mappings.get('y')
-        # Prepare training data
-        train = self.get_population_df(target_node.parent.name)[[x, y]].copy()
-        if train.shape[0] > 10000:
-            train = train.sample(10000)
-        train['pos'] = 0
-        train.pos = train.pos.mask(train.index.isin(target_node.index), 1)
-        y_ = train.pos.values
-        # Fit model and predict values for fmo
-        model.fit(train[[x, y]], y_)
-        ctrl_data = self.ctrl.get(ctrl_id).loc[cache_idx]
-        ctrl_data['pos'] = model.predict(ctrl_data[[x, y]])
-        self.populations[target_population].control_idx[ctrl_id] = ctrl_data[ctrl_data['pos'] == 1].index.values
+        predictor = self._ctrl_predictor(target_population, model, mappings, use_geom)
+        _, cache = _gate_control((ctrl_id, self.ctrl.get(ctrl_id), [predictor],
+                                  {target_node.parent.name: cache_idx}))
+        self.populations[target_population].control_idx[ctrl_id] = cache[target_population]
 
     def clear_control_cache(self, ctrl_id: str) -> None:
         """
@@ -429,10 +613,14 @@ class Gating:
                        overwrite_existing: bool = False,
                        verbose: bool = True,
                        model: str = 'knn',
+                       use_geom: bool = True,
                        **model_kwargs) -> None:
         """
-        Using the primary data as a training set, transverse over the population tree and predict the same
-        populations for some given control. Results of classification are saved to the population nodes.
+        Transverse over the population tree and predict the same populations for some given control. Where a
+        population has a geom that fully describes its gate (threshold, 2d_threshold, rect, ellipse or poly) the
+        geom is applied to the control data directly; otherwise (e.g. populations generated by a supervised
+        method) a classifier is trained using the primary data as a training set. Results of classification are
+        saved to the population nodes.
 
         Parameters
         ----------
@@ -446,8 +634,11 @@ class Gating:
         verbose : bool, (default=True)
             If True, a progress bar is provided as well as text output
         model : str, (default='knn')
-            Type of model to use for per-population classification. Currently supports K-Nearest Neighbours (knn) and
-            Support Vector Machines (svm)
+            Type of model to use for per-population classification. Currently supports K-Nearest Neighbours (knn),
+            Support Vector Machines (svm) and logistic regression (linear)
+        use_geom : bool, (default=True)
+            If True, populations are predicted by applying their geom where possible. If False, a classifier is
+            trained for every population
         model_kwargs :
             Additional keyword arguments to pass to instance of Scikit-Learn classifier (see sklearn documentation)
 
@@ -462,24 +653,128 @@ class Gating:
         assert self.ctrl, 'No control data present for current gating instance, was "include_controls" set to False?'
         assert ctrl_id in self.ctrl.keys(), f'No control data found for {ctrl_id}'
         assert all([all([i in x.keys() for i in ['x', 'y']]) for x in tree_map.values()]), 'Invalid tree_map'
-        if model == 'knn':
-            model = KNeighborsClassifier(**model_kwargs)
-        elif model == 'svm':
-            model = SVC(**model_kwargs)
-        else:
-            raise ValueError('Currently only KNearestNeighbours (knn) or Support Vector Machines (svm) are supported')
+        model = self._ctrl_model(model, **model_kwargs)
 
         if overwrite_existing:
             self.clear_control_cache(ctrl_id)
+        self._check_sml_tree_map(tree_map)
+        vprint(f'------ Gating control {ctrl_id} ------')
+        for pop_name in progress_bar(self.populations.keys(), verbose):
+            if self.search_ctrl_cache(pop_name, ctrl_id) is None:
+                self._predict_ctrl_population(pop_name, ctrl_id, model, mappings=tree_map.get(pop_name),
+                                              use_geom=use_geom)
+
+    def _check_sml_tree_map(self,
+                            tree_map: dict) -> None:
+        """
+        Internal method. Check that a tree map has been provided if any population was generated by a
+        supervised machine learning method.
+
+        Parameters
+        ----------
+        tree_map : dict
+
+        Returns
+        -------
+        None
+        """
         sml_populations = any([p.geom.get('shape') == 'sml' for p in self.populations.values()])
         if sml_populations:
             assert tree_map, 'One or more gates detected that have been generated by a supervised machine learning ' \
                              'method. Please provide a mapping of the Gating tree to proceed (see documentation for ' \
                              'help)'
-        vprint(f'------ Gating control {ctrl_id} ------')
-        for pop_name in progress_bar(self.populations.keys(), verbose):
-            if self.search_ctrl_cache(pop_name, ctrl_id) is None:
-                self._predict_ctrl_population(pop_name, ctrl_id, model, mappings=tree_map.get(pop_name))
+
+    def batch_control_gating(self,
+                             ctrl_ids: list or None = None,
+                             tree_map: dict or None = None,
+                             overwrite_existing: bool = False,
+                             verbose: bool = True,
+                             model: str = 'knn',
+                             use_geom: bool = True,
+                             pool: Pool or None = None,
+                             **model_kwargs) -> None:
+        """
+        Equivalent to calling control_gating for many controls. Any classifier required is trained once per
+        population and reused for every control, and controls are gated in parallel across a process pool.
+
+        Parameters
+        ----------
+        ctrl_ids : list, optional
+            Controls to predict populations for; by default, all controls associated to Gating object
+        tree_map : dict, optional
+            Dictionary describing the axis of populations in the population tree. This is only necessary if populations
+            currently in population tree were generated using a supervised machine learning method.
+        overwrite_existing : bool, (default=False)
+            If True, any existing control populations will be removed
+        verbose : bool, (default=True)
+            If True, text output is provided
+        model : str, (default='knn')
+            Type of model to use for per-population classification. Currently supports K-Nearest Neighbours (knn),
+            Support Vector Machines (svm) and logistic regression (linear)
+        use_geom : bool, (default=True)
+            If True, populations are predicted by applying their geom where possible. If False, a classifier is
+            trained for every population
+        pool : Pool, optional
+            Existing multiprocessing Pool to use, such that a pool can be reused across samples; if not given and
+            there is more than one control, a Pool is created for the call
+        model_kwargs :
+            Additional keyword arguments to pass to instance of Scikit-Learn classifier (see sklearn documentation)
+
+        Returns
+        -------
+        None
+        """
+        if tree_map is None:
+            tree_map = {}
+        vprint = print if verbose else lambda *a, **k: None
+        assert self.ctrl, 'No control data present for current gating instance, was "include_controls" set to False?'
+        if ctrl_ids is None:
+            ctrl_ids = list(self.ctrl.keys())
+        assert all([c in self.ctrl.keys() for c in ctrl_ids]), f'No control data found for one or more of {ctrl_ids}'
+        assert all([all([i in x.keys() for i in ['x', 'y']]) for x in tree_map.values()]), 'Invalid tree_map'
+        model = self._ctrl_model(model, **model_kwargs)
+        if overwrite_existing:
+            for ctrl_id in ctrl_ids:
+                self.clear_control_cache(ctrl_id)
+        self._check_sml_tree_map(tree_map)
+
+        # One predictor per population required by any control; geoms of siblings are applied together
+        caches = {c: {p: node.control_idx[c] for p, node in self.populations.items()
+                      if node.control_idx is not None and node.control_idx.get(c) is not None}
+                  for c in ctrl_ids}
+        populations = sorted([node for name, node in self.populations.items() if name != 'root'],
+                             key=lambda n: n.depth)
+        populations = [n.name for n in populations if any([n.name not in cache.keys() for cache in caches.values()])]
+        if not populations:
+            return
+        vprint(f'------ Gating controls {ctrl_ids} ------')
+        predictors, geoms = list(), dict()
+        for pop_name in populations:
+            predictor = self._ctrl_predictor(pop_name, model, mappings=tree_map.get(pop_name), use_geom=use_geom)
+            if predictor[0] == 'model':
+                predictors.append(predictor)
+            elif predictor[1] in geoms.keys():
+                geoms[predictor[1]].update(predictor[2])
+            else:
+                geoms[predictor[1]] = predictor[2]
+                predictors.append(('geom', predictor[1], geoms[predictor[1]]))
+        columns = [[p[3], p[4]] if p[0] == 'model' else [g.get(axis) for g in p[2].values() for axis in ['x', 'y']]
+                   for p in predictors]
+        columns = list(set([c for cols in columns for c in cols if c is not None]))
+        tasks = [(c, self.ctrl[c][columns], predictors, caches[c]) for c in ctrl_ids]
+
+        # Predict populations for each control
+        if pool is not None:
+            results = pool.map(_gate_control, tasks)
+        elif len(tasks) == 1:
+            results = list(map(_gate_control, tasks))
+        else:
+            with Pool(min(cpu_count(), len(tasks))) as p:
+                results = p.map(_gate_control, tasks)
+        for ctrl_id, cache in results:
+            for pop_name in populations:
+                self.populations[pop_name].control_idx[ctrl_id] = cache[pop_name]
+            vprint(f'{ctrl_id} complete')
 
     @staticmethod
     def _check_class_args(klass,
@@ -558,14 +853,13 @@ class Gating:
                                                                   f'right parent = {population_right_parent}'
         parent = self.populations[population_left_parent]
         x, y = self.populations[population_left].geom['x'], self.populations[population_left].geom['y']
-        left_idx, right_idx = self.populations[population_left].index, self.populations[population_right].index
-        index = np.unique(np.concatenate((left_idx, right_idx)))
+        mask = self.population_mask(population_left) | self.population_mask(population_right)
+        index = self._mask_to_index(mask)
         new_population = ChildPopulationCollection(gate_type='merge')
         new_population.add_population(new_population_name)
-        parent_df = self.get_population_df(parent.name)
-        d = parent_df.loc[index][[x, y]]
+        d = self.data[[x, y]].values[mask]
         hull = ConvexHull(d)
-        polygon = Polygon([(d.values[v, 0], d.values[v, 1]) for v in hull.vertices])
+        polygon = Polygon([(d[v, 0], d[v, 1]) for v in hull.vertices])
         cords = dict(x=polygon.exterior.xy[0], y=polygon.exterior.xy[1])
         new_population.populations[new_population_name].update_geom(x=x, y=y, shape='poly', cords=cords)
         new_population.populations[new_population_name].update_index(index)
@@ -609,10 +903,10 @@ class Gating:
 
         x = self.populations[parent].geom['x']
         y = self.populations[parent].geom['y']
-        pindex = self.populations[parent].index
-        tindex = np.unique(np.concatenate([self.populations[t].index for t in target], axis=0))
-        index = np.setdiff1d(pindex, tindex)
-        # index = [p for p in pindex if p not in tindex]
+        mask = self.population_mask(parent)
+        for t in target:
+            mask &= ~self.population_mask(t)
+        index = self._mask_to_index(mask)
         new_population = ChildPopulationCollection(gate_type='sub')
         new_population.add_population(new_population_name)
         new_population.populations[new_population_name].update_geom(x=x, y=y, shape='sub')
@@ -728,6 +1022,10 @@ class Gating:
                        if k in inspect.signature(getattr(klass, gatedoc.method)).parameters.keys()}
         analyst = klass(data=parent_population, **constructor_args)
         output = getattr(analyst, gatedoc.method)(**method_args)
+        if analyst.template_kwargs:
+            gkwargs = {k: v for k, v in gatedoc.kwargs}
+            gkwargs.update(analyst.template_kwargs)
+            gatedoc.kwargs = [[k, v] for k, v in gkwargs.items()]
         if feedback:
             print(f'------ {gatedoc.gate_name} ------')
             if analyst.warnings:
@@ -809,14 +1107,14 @@ class Gating:
         ChildPopulationCollection
             output
         """
-        parent_df = self.get_population_df(parent_name)
+        parent_n = len(self.populations[parent_name].index)
         for name, population in output.populations.items():
             n = len(population.index)
             if n == 0:
                 prop_of_total = 0
                 prop_of_parent = 0
             else:
-                prop_of_parent = n / parent_df.shape[0]
+                prop_of_parent = n / parent_n
                 prop_of_total = n / self.data.shape[0]
             geom = None
             if population.geom is not None:
@@ -873,213 +1171,30 @@ class Gating:
         if feedback:
             print('Complete!')
 
-    @staticmethod
-    def _geom_bool(geom: dict,
-                   definition: str,
-                   parent: pd.DataFrame):
-        """
-        Internal function. Edit a population defined by two thresholds (in x-axis and y-axis plane).
-        Given some geom dictionary and a parent data-frame, parse the thresholds stored in the geom
-        and return index of parent data-frame when filtered according to thresholds
+    def _update_indexes(self,
+                        geoms: dict) -> dict:
+        """Given new gating geoms for populations that share the same parent, return the updated population
+        indexes. All geoms are evaluated on the parent in a single pass (see flow.gating.geometry.geom_masks)
 
         Parameters
         ----------
-        geom: dict
-            Dictionary of geometric description of gate. Expected to contain keys: x, y, threshold_x, threshold_y
-        definition : str
-            Definition associated to population that is being edited (e.g. '++' relates to a population that is
-            positive in both x and y dimension
-        parent : Pandas.DataFrame
-            Parent DataFrame that relates to the parent of the population being edited
+        geoms : dict
+            {population name: valid dictionary describing geom}
 
         Returns
         -------
-        Numpy.array
-            Array of index values for new edited population
-        """
-        parent = parent.round(decimals=2)
-        x_, y_ = geom['x'], geom['y']
-        tx, ty = round(geom['threshold_x'], 2), round(geom['threshold_y'], 2)
-        if definition == '++':
-            return parent[(parent[x_] > tx) & (parent[y_] > ty)].index.values
-        if definition == '--':
-            return parent[(parent[x_] < tx) & (parent[y_] < ty)].index.values
-        if definition == '+-':
-            return parent[(parent[x_] > tx) & (parent[y_] < ty)].index.values
-        if definition == '-+':
-            return parent[(parent[x_] < tx) & (parent[y_] > ty)].index.values
-        raise ValueError('Definition must have a value of "+-", "-+", "--", or "++" for a 2D threshold gate')
-
-    @staticmethod
-    def _update_threshold_1d(geom: dict,
-                             parent: pd.DataFrame):
-        """
-        Internal function. Edit a population defined by a threshold (in x-axis plane).
-        Given some geom dictionary and a parent data-frame, parse the thresholds stored in the geom
-        and return index of parent data-frame when filtered according to thresholds
-
-        Parameters
-        ----------
-        geom: dict
-            Dictionary of geometric description of gate. Expected to contain keys: x, threshold, transform_x
-        parent : Pandas.DataFrame
-            Parent DataFrame that relates to the parent of the population being edited
-
-        Returns
-        -------
-        Numpy.array
-            Array of index values for new edited population
-        """
-        assert 'threshold' in geom.keys(), 'Geom must contain a key "threshold" with a float value'
-        assert 'transform_x' in geom.keys(), 'Geom must contain a key "transform_x", ' \
-                                             'the transform method for the x-axis'
-        assert 'definition' in geom.keys(), 'Geom must contain key "definition", a string value that indicates ' \
-                                            'if population is the "positive" or "negative"'
-        if geom['definition'] == '+':
-            return parent[parent[geom['x']] >= geom['threshold']].index.values
-        if geom['definition'] == '-':
-            return parent[parent[geom['x']] < geom['threshold']].index.values
-        raise ValueError('Definition must have a value of "+" or "-" for a 1D threshold gate')
-
-    @staticmethod
-    def _update_rect(geom: dict,
-                     parent: pd.DataFrame):
-        """
-        Internal function. Edit a population defined by a rectangular gate.
-        Given some geom dictionary and a parent data-frame, parse the rectangular gate parameters stored in the geom
-        and return index of parent data-frame when filtered according to geom
-
-        Parameters
-        ----------
-        geom: dict
-            Dictionary of geometric description of gate. Expected to contain keys: x, y, transform_x, transform_y,
-            x_min, x_max, y_min, y_max
-        parent : Pandas.DataFrame
-            Parent DataFrame that relates to the parent of the population being edited
-
-        Returns
-        -------
-        Numpy.array
-            Array of index values for new edited population
-        """
-        keys = ['x_min', 'x_max', 'y_min', 'y_max']
-        assert 'definition' in geom.keys(), 'Geom must contain key "definition", a string value that indicates ' \
-                                            'if population is the "positive" or "negative"'
-        assert all([r in geom.keys() for r in keys]), f'Geom must contain keys {keys} both with a float value'
-        assert all(
-            [t in geom.keys() for t in ['transform_x', 'transform_y']]), 'Geom must contain a key "transform_x", ' \
-                                                                         'the transform method for the x-axis AND ' \
-                                                                         'a key "transform_y", ' \
-                                                                         'the transform method for the y-axis'
-        assert geom.get('y'), 'Geom is missing value for "y"'
-
-        x = (parent[geom['x']] >= geom['x_min']) & (parent[geom['x']] <= geom['x_max'])
-        y = (parent[geom['y']] >= geom['y_min']) & (parent[geom['y']] <= geom['y_max'])
-        pos = parent[x & y]
-        if geom['definition'] == '+':
-            return pos.index.values
-        if geom['definition'] == '-':
-            return parent[~parent.index.isin(pos.index)].index.values
-        raise ValueError('Definition must have a value of "+" or "-" for a rectangular geom')
-
-    @staticmethod
-    def _update_ellipse(geom: dict,
-                        parent: pd.DataFrame):
-        keys = ['centroid', 'width', 'height', 'angle']
-        assert 'definition' in geom.keys(), 'Geom must contain key "definition", a string value that indicates ' \
-                                            'if population is the "positive" or "negative"'
-        assert all([c in geom.keys() for c in
-                    keys]), f'Geom must contain keys {keys}; note, centroid must be a tuple and all others a float value'
-        assert geom.get('y'), 'Geom is missing value for "y"'
-        assert all(
-            [t in geom.keys() for t in ['transform_x', 'transform_y']]), 'Geom must contain a key "transform_x", ' \
-                                                                         'the transform method for the x-axis AND ' \
-                                                                         'a key "transform_y", ' \
-                                                                         'the transform method for the y-axis'
-
-        channels = [geom['x'], geom['y']]
-        mask = inside_ellipse(parent[channels].values,
-                              center=tuple(geom['centroid']),
-                              width=geom['width'],
-                              height=geom['height'],
-                              angle=geom['angle'])
-        pos = parent[mask]
-        if geom['definition'] == '+':
-            return pos.index
-        if geom['definition'] == '-':
-            return parent[~parent.index.isin(pos.index)].index.values
-        raise ValueError('Definition must have a value of "+" or "-" for a ellipse geom')##
-
-    @staticmethod
-    def _update_poly(geom: dict,
-                     x: str,
-                     y: str,
-                     parent: pd.DataFrame):
-        """
-         Internal function. Edit a population defined by a polygon gate.
-         Given some geom dictionary and a parent data-frame, parse the polygon gate parameters stored in the geom
-         and return index of parent data-frame when filtered according to geom
-
-         Parameters
-         ----------
-         geom: dict
-             Dictionary of geometric description of gate. Expected to contain keys: x, y, transform_x, transform_y,
-             cords
-         parent : Pandas.DataFrame
-             Parent DataFrame that relates to the parent of the population being edited
-
-         Returns
-         -------
-         Numpy.array
-             Array of index values for new edited population
-         """
-        keys = ['cords', 'transform_x', 'transform_y', 'x', 'y']
-        assert all([c in geom.keys() for c in keys]), f'Geom must contain keys {keys}'
-        assert type(geom.get('cords')) == dict, 'Cords should be of type dictionary with keys: x, y'
-        cords = geom.get('cords')
-        assert all([_ in cords.keys() for _ in ['x', 'y']]), 'Cords should contain keys: x, y'
-
-        poly = Polygon([(x, y) for x, y in zip(cords['x'], cords['y'])])
-        pos = inside_polygon(parent, x, y, poly)
-        return pos.index
-
-    def _update_threshold_2d(self,
-                             geom: dict,
-                             parent: pd.DataFrame):
-        """
-        Internal function. Edit a population defined by a two thresholds (in x-axis and y-axis plane).
-        Given some geom dictionary and a parent data-frame, parse the thresholds stored in the geom
-        and return index of parent data-frame when filtered according to thresholds
-
-        Parameters
-        ----------
-        geom: dict
-            Dictionary of geometric description of gate. Expected to contain keys: x, y, threshold_x, threshold_y,
-            transform_x, transform_y
-        parent : Pandas.DataFrame
-            Parent DataFrame that relates to the parent of the population being edited
-
-        Returns
-        -------
-        Numpy.array
-            Array of index values for new edited population
-        """
-        assert 'definition' in geom.keys(), 'Geom must contain key "definition", a string value that indicates ' \
-                                            'if population is the "positive" or "negative"'
-        assert all([t in geom.keys() for t in ['threshold_x', 'threshold_y']]), \
-            'Geom must contain keys "threshold_x" and "threshold_y" both with a float value'
-        assert geom.get('y'), 'Geom is missing value for "y"'
-        assert all(
-            [t in geom.keys() for t in ['transform_x', 'transform_y']]), 'Geom must contain a key "transform_x", ' \
-                                                                         'the transform method for the x-axis AND ' \
-                                                                         'a key "transform_y", ' \
-                                                                         'the transform method for the y-axis'
-
-        if type(geom['definition']) == list or type(geom['definition']) == BaseList:
-            idx = list(map(lambda d: self._geom_bool(geom, d, parent), geom['definition']))
-            return [i for l in idx for i in l]
-        else:
-            return self._geom_bool(geom, geom['definition'], parent)
+        dict
+            {population name: Numpy.array of index values}
+        """
+        assert all([p in self.populations.keys() for p in geoms.keys()]), \
+            f'One or more populations do not exist: {list(geoms.keys())}'
+        parents = set([self.populations[p].parent.name for p in geoms.keys()])
+        assert len(parents) == 1, 'Populations must share the same parent'
+        parent_idx = self.populations[parents.pop()].index
+        columns = [c for c in set([g.get(axis) for g in geoms.values() for axis in ['x', 'y']])
+                   if c in self.data.columns]
+        masks = geom_masks(geoms, self.data[columns].iloc[self._positions(parent_idx)])
+        return {p: parent_idx[mask] for p, mask in masks.items()}
 
     def _update_index(self,
                       population_name: str,
@@ -1099,37 +1214,7 @@ class Gating:
 
         """
         assert population_name in self.populations.keys(), f'Population {population_name} does not exist'
-        assert 'shape' in geom, 'Geom missing key argument "shape"'
-        parent_name = self.populations[population_name].parent.name
-        parent = self.get_population_df(parent_name, transform=False)
-        transform_x, transform_y = geom.get('transform_x'), geom.get('transform_y')
-        x, y = geom.get('x'), geom.get('y')
-        assert x, 'Geom is missing value for "x"'
-        if transform_x is not None and x is not None:
-            parent = apply_transform(parent,
-                                     transform_method=transform_x,
-                                     features_to_transform=[x])
-        if transform_y is not None and y is not None:
-            parent = apply_transform(parent,
-                                     transform_method=transform_y,
-                                     features_to_transform=[y])
-
-        if geom['shape'] == 'threshold':
-            return self._update_threshold_1d(geom=geom, parent=parent)
-
-        if geom['shape'] == '2d_threshold':
-            return self._update_threshold_2d(geom=geom, parent=parent)
-
-        if geom['shape'] == 'rect':
-            return self._update_rect(geom=geom, parent=parent)
-
-        if geom['shape'] == 'ellipse':
-            return self._update_ellipse(geom=geom, parent=parent)
-
-        if geom['shape'] == 'poly':
-            return self._update_poly(geom=geom, x=x, y=y, parent=parent)
-
-        raise ValueError('Geom shape not recognised, should be one of: threshold, 2d_threshold, ellipse, rect, poly')
+        return self._update_indexes({population_name: geom})[population_name]
 
     def edit_gate(self,
                   gate_name: str,
@@ -1154,14 +1239,16 @@ class Gating:
         print(f'Editing gate: {gate_name}')
         assert gate_name in self.gates.keys(), f'Invalid gate, existing gates are: {self.gates.keys()}'
         children = self.gates[gate_name].children
+        for c in children:
+            assert c in updated_geom.keys(), f'Invalid child populations specified/missing child, gate {gate_name} ' \
+                                             f'has the following children: {children}'
+        indexes = self._update_indexes({c: updated_geom[c] for c in children})
         effected_populations = list()
         immediate_children = list()
         for c in children:
             print(f'Updating {c}')
-            assert c in updated_geom.keys(), f'Invalid child populations specified/missing child, gate {gate_name} ' \
-                                             f'has the following children: {children}'
             self.populations[c].geom = updated_geom[c]
-            self.populations[c].index = self._update_index(c, updated_geom[c])
+            self.populations[c].index = indexes[c]
             effected_populations = effected_populations + self.find_dependencies(population=c)
             immediate_children = immediate_children + [n.name for n in self.populations[c].children]
         effected_gates = [name for name, gate in self.gates.items() if gate.parent in effected_populations]
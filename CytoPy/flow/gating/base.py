@@ -1,11 +1,13 @@
 from .defaults import ChildPopulationCollection
 from ..transforms import apply_transform
 from .utilities import density_dependent_downsample
+from .geometry import threshold_mask, threshold_2d_mask
 from shapely.geometry.polygon import Polygon
 from scipy.spatial import ConvexHull
 from functools import partial
 import pandas as pd
 import numpy as np
+import collections
 
 
 class GateError(Exception):
@@ -61,6 +63,8 @@ class Gate:
             self.data = apply_transform(self.data, features_to_transform=[self.y], transform_method=transform_y)
         self.child_populations = child_populations
         self.warnings = list()
+        # Keyword arguments to be updated in the gate definition once the gate has been applied
+        self.template_kwargs = dict()
         self.empty_parent = self._empty_parent()
         self.frac = frac
         if low_memory:
@@ -149,14 +153,13 @@ class Gate:
         pos = self.child_populations.fetch_by_definition('+')
         if neg is None or pos is None:
             GateError('Invalid ChildPopulationCollection; must contain definitions for - and + populations')
-        pos_pop = self.data[self.data[self.x].round(decimals=2) >= round(threshold, 2)]
-        neg_pop = self.data[self.data[self.x].round(decimals=2) < round(threshold, 2)]
+        pos_mask = threshold_mask(self.data[self.x].values, threshold, '+')
         for x, definition in zip([pos, neg], ['+', '-']):
             self.child_populations.populations[x].update_geom(shape='threshold', x=self.x, y=self.y,
                                                               method=method, threshold=float(threshold),
                                                               definition=definition, transform_x=self.transform_x)
-        self.child_populations.populations[pos].update_index(idx=pos_pop.index.values)
-        self.child_populations.populations[neg].update_index(idx=neg_pop.index.values)
+        self.child_populations.populations[pos].update_index(idx=self.data.index.values[pos_mask])
+        self.child_populations.populations[neg].update_index(idx=self.data.index.values[~pos_mask])
 
     def child_update_2d(self,
                         x_threshold: float,
@@ -184,31 +187,15 @@ class Gate:
         if any([x is None for x in populations]):
             GateError('Invalid ChildPopulationCollection; must contain definitions for --, -+, +-, and ++ populations')
 
-        # Get index according to threshold
-        xp_idx = self.data[self.data[self.x].round(decimals=2) >= round(x_threshold, 2)].index.values
-        yp_idx = self.data[self.data[self.y].round(decimals=2) >= round(y_threshold, 2)].index.values
-        xn_idx = self.data[self.data[self.x].round(decimals=2) < round(x_threshold, 2)].index.values
-        yn_idx = self.data[self.data[self.y].round(decimals=2) < round(y_threshold, 2)].index.values
-
-        negneg_idx = np.intersect1d(xn_idx, yn_idx)
-        pospos_idx = np.intersect1d(xp_idx, yp_idx)
-        posneg_idx = np.intersect1d(xp_idx, yn_idx)
-        negpos_idx = np.intersect1d(xn_idx, yp_idx)
-
-        # Create a list of population definitions, with keys for the definition, population it is associated to
-        # and the relative index
-        populations_idx = list()
-        i = zip(populations, [negneg_idx, pospos_idx, posneg_idx, negpos_idx], ['--', '++', '+-', '-+'])
-        for pop_name, index, d in i:
-            populations_idx.append(dict(pop_name=pop_name, index=index, definition=d))
-
-        # Now merge the dictionaries on the population name
+        # Merge definitions on the population name and get index according to thresholds
+        definitions = collections.defaultdict(list)
+        for pop_name, d in zip(populations, ['--', '++', '+-', '-+']):
+            definitions[pop_name].append(d)
+        x, y = self.data[self.x].values, self.data[self.y].values
         merged_poulation_idx = dict()
-        for pop in set(d.get('pop_name') for d in populations_idx):
-            matching_populations = [d for d in populations_idx if d.get('pop_name') == pop]
-            definition = [d.get('definition') for d in matching_populations]
-            index = np.unique(np.concatenate([d.get('index') for d in matching_populations]))
-            merged_poulation_idx[pop] = dict(definition=definition, index=index)
+        for pop_name, definition in definitions.items():
+            mask = threshold_2d_mask(x, y, x_threshold, y_threshold, definition)
+            merged_poulation_idx[pop_name] = dict(definition=definition, index=self.data.index.values[mask])
 
         # Update index and geom for child populations
         for pop_name in merged_poulation_idx.keys():
@@ -271,14 +258,19 @@ class Gate:
         chunksize = int(np.ceil(self.data.shape[0] / d))
 
         if self.downsample_method == 'uniform':
-            sampling_func = partial(self.uniform_downsample, sample_size=chunksize)
+            # Uniform chunks are a random partition of the data, no need to sample iteratively
+            order = np.random.permutation(self.data.shape[0])
+            for x, idx in enumerate(np.array_split(order, int(d))):
+                sample = self.data.iloc[idx].copy()
+                sample['chunk_idx'] = x
+                chunks.append(sample)
+            return chunks
+        if self.density_downsample_kwargs is not None:
+            kwargs = dict(sample_n=chunksize, features=[self.x, self.y], **self.density_downsample_kwargs)
+            sampling_func = partial(density_dependent_downsample, **kwargs)
         else:
-            if self.density_downsample_kwargs is not None:
-                kwargs = dict(sample_n=chunksize, features=[self.x, self.y], **self.density_downsample_kwargs)
-                sampling_func = partial(density_dependent_downsample, **kwargs)
-            else:
-                sampling_func = partial(density_dependent_downsample, sample_n=chunksize,
-                                        features=[self.x, self.y])
+            sampling_func = partial(density_dependent_downsample, sample_n=chunksize,
+                                    features=[self.x, self.y])
         data = self.data.copy()
         for x in range(0, int(d)):
             if data.shape[0] <= chunksize:
@@ -1,38 +1,148 @@
 from .base import Gate, GateError
-from .utilities import multi_centroid_calculation, inside_polygon, centroid
+from .utilities import polygon_mask
 from multiprocessing import Pool, cpu_count
 from sklearn.cluster import DBSCAN, KMeans
 from sklearn.neighbors import KDTree, KNeighborsClassifier
 from shapely.geometry import Point
-from functools import partial
 import pandas as pd
 import numpy as np
 import collections
+import hashlib
 import hdbscan
+import json
 
 
-def _meta_assignment_df(label: str or int, ref_df: pd.DataFrame) -> str or int:
-    ref_df = ref_df.copy()
-    if label == -1:
-        return -1
-    ref_df = ref_df[ref_df['cluster'] == label]
-    assert ref_df.shape[0] > 0, f'No associated meta-cluster for {label}'
-    assert ref_df.shape[0] == 1, f'More than one meta-cluster found for {label}'
-    return ref_df['meta_cluster'].values[0]
+_DBSCAN_STATE = dict()
+_HDBSCAN_STATE = dict()
+# Fitted HDBSCAN models and event assignments, most recently used last
+_HDBSCAN_CACHE = collections.OrderedDict()
+HDBSCAN_CACHE_SIZE = 5
 
 
-def meta_assignment(df: pd.DataFrame, meta_clusters: pd.DataFrame) -> pd.DataFrame:
+def _init_dbscan_worker(xy: np.array,
+                        dbscan_kwargs: dict,
+                        core_only: bool) -> None:
     """
-    Given a reference dataframe of meta-cluster assignments, update the target dataframes cluster
-    assignments
-    :param df: Target dataframe for updating
-    :param meta_clusters: Reference dataframe of meta clusters as generated from self._meta_clustering
-    :return: Updated dataframe
+    Internal function. Initialise a DBSCAN worker process. The event coordinates are inherited by worker
+    processes upon creation rather than being pickled with each chunk; chunks are passed as positional indices.
+
+    Parameters
+    ----------
+    xy: Numpy.array
+        (n, 2) array of event coordinates
+    dbscan_kwargs: dict
+        keyword arguments for DBSCAN
+    core_only: bool
+        If True, only data-points considered 'core samples' are kept
+
+    Returns
+    -------
+    None
     """
-    df = df.copy()
-    ref_df = meta_clusters[meta_clusters['chunk_idx'] == df['chunk_idx'].values[0]]
-    df['labels'] = df['labels'].apply(lambda x: _meta_assignment_df(label=x, ref_df=ref_df))
-    return df
+    _DBSCAN_STATE['xy'] = xy
+    _DBSCAN_STATE['dbscan_kwargs'] = dbscan_kwargs
+    _DBSCAN_STATE['core_only'] = core_only
+
+
+def _dbscan_chunk(idx: np.array) -> np.array:
+    """
+    Internal function. Perform DBSCAN on a single chunk of events in a worker process
+
+    Parameters
+    ----------
+    idx: Numpy.array
+        positional index of events in chunk
+
+    Returns
+    -------
+    Numpy.array
+        cluster labels (-1 for noise)
+    """
+    model = DBSCAN(**_DBSCAN_STATE['dbscan_kwargs'])
+    model.fit(_DBSCAN_STATE['xy'][idx])
+    db_labels = model.labels_
+    if _DBSCAN_STATE['core_only']:
+        non_core_mask = np.ones(len(db_labels), bool)
+        non_core_mask[model.core_sample_indices_] = False
+        db_labels[non_core_mask] = -1
+    return db_labels
+
+
+def _init_hdbscan_worker(model: hdbscan.HDBSCAN,
+                         xy: np.array) -> None:
+    """
+    Internal function. Initialise a worker process for HDBSCAN prediction. The fitted model and event coordinates
+    are inherited by worker processes upon creation; chunks are passed as positional slices.
+
+    Parameters
+    ----------
+    model: hdbscan.HDBSCAN
+        HDBSCAN model fitted with prediction_data=True
+    xy: Numpy.array
+        (n, 2) array of event coordinates
+
+    Returns
+    -------
+    None
+    """
+    _HDBSCAN_STATE['model'] = model
+    _HDBSCAN_STATE['xy'] = xy
+
+
+def _approximate_predict_chunk(chunk: tuple) -> (np.array, np.array):
+    """
+    Internal function. Predict cluster labels for a single chunk of events in a worker process
+
+    Parameters
+    ----------
+    chunk: tuple
+        (start, end) position of chunk
+
+    Returns
+    -------
+    Numpy.array, Numpy.array
+        cluster labels, label strengths
+    """
+    start, end = chunk
+    return hdbscan.approximate_predict(_HDBSCAN_STATE['model'], _HDBSCAN_STATE['xy'][start:end])
+
+
+def clear_hdbscan_cache() -> None:
+    """
+    Remove all fitted HDBSCAN models cached by DensityClustering.hdbscan
+
+    Returns
+    -------
+    None
+    """
+    _HDBSCAN_CACHE.clear()
+
+
+def meta_assignment(labels: np.array,
+                    chunk_idx: np.array,
+                    meta_clusters: pd.DataFrame) -> np.array:
+    """
+    Given a reference dataframe of meta-cluster assignments, update the cluster assignments of each event.
+    Labels are mapped through an integer lookup table of shape (chunks, clusters); noise remains as -1.
+
+    Parameters
+    ----------
+    labels: Numpy.array
+        cluster label of each event (relative to the chunk it belongs to)
+    chunk_idx: Numpy.array
+        chunk that each event belongs to
+    meta_clusters: Pandas.DataFrame
+        Reference dataframe of meta clusters as generated from DensityClustering._meta_clustering
+
+    Returns
+    -------
+    Numpy.array
+        meta-cluster label of each event
+    """
+    lookup = np.full((chunk_idx.max() + 1, labels.max() + 2), -1)
+    lookup[meta_clusters['chunk_idx'].values,
+           meta_clusters['cluster'].values + 1] = meta_clusters['meta_cluster'].values
+    return lookup[chunk_idx, labels + 1]
 
 
 class DensityClustering(Gate):
@@ -45,26 +155,33 @@ class DensityClustering(Gate):
         The minimum number of samples ("total weight") in a neighborhood for a point to be considered a core point.
         (see Scikit-Learn user guide and https://hdbscan.readthedocs.io/en/latest/how_hdbscan_works.html for details)
     tree: KDTree
-        Nearest neighbours tree used for associating target population to cluster
+        Nearest neighbours tree used for associating target population to cluster; built on the down-sampled
+        data if frac is given
     """
     def __init__(self,
                  min_pop_size: int,
                  **kwargs):
         super().__init__(**kwargs)
         self.min_pop_size = min_pop_size
-        self.tree = KDTree(self.data[[self.x, self.y]].values, leaf_size=100)
-
-    def _meta_clustering(self, clustered_chunks: list):
+        self.sample = self.sampling(self.data, 40000)
+        tree_data = self.data if self.sample is None else self.sample
+        self.tree = KDTree(tree_data[[self.x, self.y]].values, leaf_size=100)
+        self.tree_index = tree_data.index.values
+
+    def _meta_clustering(self,
+                         cluster_centroids: pd.DataFrame,
+                         n_chunks: int) -> pd.DataFrame:
         """
-        Given a list of clustered samples, fit a KMeans model to find 'meta-clusters' that will allow for merging
-        of samples into a single dataframe
+        Given the centroids of clusters found in each chunk, fit a KMeans model to find 'meta-clusters' that
+        will allow for merging of chunks into a single dataframe
 
         Parameters
         -----------
-
-        clustered_chunks: list
-            list of pandas dataframes, each clustered using DBSCAN and cluster labels assigned
-            to a column named 'labels'
+        cluster_centroids: Pandas.DataFrame
+            DataFrame with columns 'chunk_idx', 'cluster', 'x', and 'y', where 'x' and 'y' correspond
+            to the coordinates of the centroid of each cluster (noise excluded)
+        n_chunks: int
+            Number of chunks clustered
 
         Returns
         --------
@@ -73,18 +190,11 @@ class DensityClustering(Gate):
         """
         # Calculate K (number of meta clusters) as the number of expected populations OR the median number of
         # clusters found in each sample IF this median is less that the number of expected populations
-        clustered_chunks_wo_noise = [x[x['labels'] != -1] for x in clustered_chunks]
-        median_k = np.median([len(x['labels'].unique()) for x in clustered_chunks_wo_noise])
+        median_k = np.median(np.bincount(cluster_centroids['chunk_idx'].values, minlength=n_chunks))
         if median_k < len(self.child_populations.populations.keys()):
             k = int(median_k)
         else:
             k = len(self.child_populations.populations.keys())
-
-        # Calculate centroids of each cluster, this will be used as the training data
-        pool = Pool(cpu_count())
-        cluster_centroids = pd.concat(pool.map(multi_centroid_calculation, clustered_chunks_wo_noise))
-        pool.close()
-        pool.join()
         meta = KMeans(n_clusters=k, n_init=10, precompute_distances=True, random_state=42, n_jobs=-1)
         meta.fit(cluster_centroids[['x', 'y']].values)
         cluster_centroids['meta_cluster'] = meta.labels_
@@ -95,6 +205,7 @@ class DensityClustering(Gate):
                        core_only: bool):
         """
         Perform DBSCAN across 'chunks' of original data set and perform meta-clustering to form a consensus.
+        Chunks are clustered concurrently in a single process pool.
 
         Parameters
         ----------
@@ -111,40 +222,36 @@ class DensityClustering(Gate):
             Meta-clustering results and polygon objects for each cluster
         """
         # Break data into workable chunks
-        chunks = self.generate_chunks(30000)
+        chunks = [self.data.index.get_indexer(c.index) for c in self.generate_chunks(30000)]
+        xy = self.data[[self.x, self.y]].values
 
         # Cluster each chunk!
-        clustered_data = list()
-        for sample in chunks:
-            model = DBSCAN(eps=distance_nn,
-                           min_samples=self.min_pop_size,
-                           algorithm='ball_tree',
-                           n_jobs=-1)
-            model.fit(sample[[self.x, self.y]])
-            db_labels = model.labels_
-            if core_only:
-                non_core_mask = np.ones(len(db_labels), np.bool)
-                non_core_mask[model.core_sample_indices_] = 0
-                np.put(db_labels, non_core_mask, -1)
-            sample['labels'] = db_labels
-            clustered_data.append(sample)
+        dbscan_kwargs = dict(eps=distance_nn, min_samples=self.min_pop_size, algorithm='ball_tree', n_jobs=1)
+        with Pool(min(cpu_count(), len(chunks)), initializer=_init_dbscan_worker,
+                  initargs=(xy, dbscan_kwargs, core_only)) as pool:
+            chunk_labels = pool.map(_dbscan_chunk, chunks)
+        labels = np.full(xy.shape[0], -1)
+        chunk_idx = np.zeros(xy.shape[0], dtype=int)
+        for i, (idx, db_labels) in enumerate(zip(chunks, chunk_labels)):
+            labels[idx] = db_labels
+            chunk_idx[idx] = i
 
         # Perform meta clustering and merge clusters across samples
-        meta_clusters = self._meta_clustering(clustered_data)
-        pool = Pool(cpu_count())
-        f = partial(meta_assignment, meta_clusters=meta_clusters)
-        data = pd.concat(pool.map(f, clustered_data))
-        pool.close()
-        pool.join()
+        clustered = labels != -1
+        cluster_centroids = pd.DataFrame(dict(chunk_idx=chunk_idx[clustered], cluster=labels[clustered],
+                                              x=xy[clustered, 0], y=xy[clustered, 1]))
+        cluster_centroids = cluster_centroids.groupby(['chunk_idx', 'cluster'])[['x', 'y']].median().reset_index()
+        meta_clusters = self._meta_clustering(cluster_centroids, n_chunks=len(chunks))
+        data = self.data
+        data['labels'] = meta_assignment(labels, chunk_idx, meta_clusters)
         data = self._post_cluster_checks(data)
 
         # Generate a Polygon for each cluster and update data according to polygon gates
         polygon_shapes = self.generate_polygons()
+        labels = data['labels'].values.copy()
         for cluster_name, poly in polygon_shapes.items():
-            mask = inside_polygon(data, self.x, self.y, poly)
-            label_mask = data.index.isin(mask.index)
-            data['labels'] = data['labels'].mask(label_mask, cluster_name)
-
+            labels[polygon_mask(xy, poly)] = cluster_name
+        data['labels'] = labels
         return data, polygon_shapes
 
     def _post_cluster_checks(self, data):
@@ -194,7 +301,7 @@ class DensityClustering(Gate):
         None
         """
 
-        sample = self.sampling(self.data, 40000)
+        sample = self.sample
         if sample is None:
             print('Warning: no value given for frac, downsampling is recommended prior to fitting model')
             sample = self.data
@@ -205,9 +312,9 @@ class DensityClustering(Gate):
         model.fit(sample[[self.x, self.y]])
         db_labels = model.labels_
         if core_only:
-            non_core_mask = np.ones(len(db_labels), np.bool)
-            non_core_mask[model.core_sample_indices_] = 0
-            np.put(db_labels, non_core_mask, -1)
+            non_core_mask = np.ones(len(db_labels), bool)
+            non_core_mask[model.core_sample_indices_] = False
+            db_labels[non_core_mask] = -1
 
         knn = KNeighborsClassifier(n_neighbors=10,
                                    weights='distance',
@@ -251,8 +358,54 @@ class DensityClustering(Gate):
         # Update child populations
         return self._assign_clusters(target_predictions, polygon_shapes)
 
+    def _hdbscan_cache_key(self) -> str:
+        """
+        Internal function. Generate the key under which a fitted HDBSCAN model is cached. The key is a hash of
+        the (transformed) parent events and their index, such that it identifies the sample, population, x and y
+        axis and transformation, and of the parameters that affect the clustering.
+
+        Returns
+        -------
+        str
+        """
+        key = hashlib.sha256(pd.util.hash_pandas_object(self.data[[self.x, self.y]], index=True).values.tobytes())
+        key.update(json.dumps([self.x, self.y, self.transform_x, self.transform_y, self.min_pop_size,
+                               self.frac, self.downsample_method, self.density_downsample_kwargs],
+                              sort_keys=True, default=str).encode())
+        return key.hexdigest()
+
+    def _approximate_predict(self,
+                             model: hdbscan.HDBSCAN,
+                             chunk_size: int) -> (np.array, np.array):
+        """
+        Internal function. Predict the cluster assignment of all events using a model fitted to a sample of events
+        (see https://hdbscan.readthedocs.io/en/latest/api.html#hdbscan.prediction.approximate_predict). Large
+        parent populations are predicted in chunks of chunk_size events across a process pool.
+
+        Parameters
+        ----------
+        model: hdbscan.HDBSCAN
+            HDBSCAN model fitted with prediction_data=True
+        chunk_size: int
+            Number of events predicted per process
+
+        Returns
+        -------
+        Numpy.array, Numpy.array
+            cluster labels, label strengths
+        """
+        xy = self.data[[self.x, self.y]].values
+        if xy.shape[0] <= chunk_size:
+            return hdbscan.approximate_predict(model, xy)
+        chunks = [(i, i + chunk_size) for i in range(0, xy.shape[0], chunk_size)]
+        with Pool(min(cpu_count(), len(chunks)), initializer=_init_hdbscan_worker, initargs=(model, xy)) as pool:
+            predictions = pool.map(_approximate_predict_chunk, chunks)
+        return np.concatenate([p[0] for p in predictions]), np.concatenate([p[1] for p in predictions])
+
     def hdbscan(self,
-                inclusion_threshold: float or None = None):
+                inclusion_threshold: float or None = None,
+                cache: bool = True,
+                chunk_size: int = 100000):
         """
         Perform gating with HDBSCAN algorithm
         (https://hdbscan.readthedocs.io/en/latest/how_hdbscan_works.html)
@@ -261,33 +414,48 @@ class DensityClustering(Gate):
         If clustering is performed on a sample, a call to 'approximate_predict' is made for remaining data.
         (https://hdbscan.readthedocs.io/en/latest/api.html#hdbscan.prediction.approximate_predict)
 
+        The fitted model and the resulting cluster assignments are cached (for the most recent HDBSCAN_CACHE_SIZE
+        gates) so that applying the gate again to the same population, e.g. when editing inclusion_threshold or
+        re-applying a template, does not repeat clustering.
+
         Parameters
         -----------
         inclusion_threshold: float, optional
             float value for minimum probability threshold for data inclusion; data below this
             threshold will be classed as noise
+        cache: bool, (default=True)
+            If True, use and update the cache of fitted models
+        chunk_size: int, (default=100000)
+            Number of events per process when predicting cluster assignment from a sample
 
         Returns
         --------
         ChildPopulationCollection
             Updated child populations with events indexing complete
         """
-        sample = None
+        sample = self.sample
         # If parent is empty just return the child populations with empty index array
         if self.empty_parent:
             return self.child_populations
-        if self.frac is not None:
-            sample = self.sampling(self.data, 40000)
-        # Cluster!
-        model = hdbscan.HDBSCAN(core_dist_n_jobs=-1, min_cluster_size=self.min_pop_size, prediction_data=True)
-        if sample is not None:
-            model.fit(sample[[self.x, self.y]])
-            self.data['labels'], self.data['label_strength'] = hdbscan.approximate_predict(model,
-                                                                                           self.data[[self.x, self.y]])
+        key = self._hdbscan_cache_key() if cache else None
+        if key is not None and key in _HDBSCAN_CACHE:
+            _HDBSCAN_CACHE.move_to_end(key)
+            model, labels, label_strength = _HDBSCAN_CACHE[key]
         else:
-            model.fit(self.data[[self.x, self.y]])
-            self.data['labels'] = model.labels_
-            self.data['label_strength'] = model.probabilities_
+            # Cluster!
+            model = hdbscan.HDBSCAN(core_dist_n_jobs=-1, min_cluster_size=self.min_pop_size, prediction_data=True)
+            if sample is not None:
+                model.fit(sample[[self.x, self.y]])
+                labels, label_strength = self._approximate_predict(model, chunk_size)
+            else:
+                model.fit(self.data[[self.x, self.y]])
+                labels, label_strength = model.labels_, model.probabilities_
+            if key is not None:
+                _HDBSCAN_CACHE[key] = (model, labels, label_strength)
+                while len(_HDBSCAN_CACHE) > HDBSCAN_CACHE_SIZE:
+                    _HDBSCAN_CACHE.popitem(last=False)
+        self.data['labels'] = np.array(labels)
+        self.data['label_strength'] = np.array(label_strength)
         # Post clustering checks
         if inclusion_threshold is not None:
             mask = self.data['label_strength'] < inclusion_threshold
@@ -297,9 +465,22 @@ class DensityClustering(Gate):
         population_predictions = self._predict_pop_clusters(polygon_shapes)
         return self._assign_clusters(population_predictions, polygon_shapes)
 
+    def _cluster_centroids(self) -> pd.DataFrame:
+        """
+        Internal function. Calculate the centroid (median) of each cluster, excluding noise
+
+        Returns
+        -------
+        Pandas.DataFrame
+            Centroid coordinates indexed by cluster label
+        """
+        clustered = self.data[self.data['labels'] != -1]
+        return clustered.groupby('labels')[[self.x, self.y]].median()
+
     def _match_pop_to_cluster(self,
                               target_population: str,
-                              cluster_polygons: dict):
+                              cluster_polygons: dict,
+                              cluster_centroids: pd.DataFrame):
         """
         Internal function. Match target populations to clusters. First target population is checked to
         ensure that surrounding data-points are not all noise (neighbours checked = 1% of total events or 100 if
@@ -312,6 +493,8 @@ class DensityClustering(Gate):
             Name of target population
         cluster_polygons: dict
             cluster polygons
+        cluster_centroids: Pandas.DataFrame
+            centroid of each cluster (see self._cluster_centroids)
         Returns
         -------
         str
@@ -325,19 +508,15 @@ class DensityClustering(Gate):
         if len(cluster_assingments) == 0:
             # Target does not fall directly into any cluster
             # Is the target surrounded by noise? (i.e. target cluster not found)
-            k = int(self.data.shape[0] * 0.01)
-            if k > 100:
-                k = 100
-            _, nearest_neighbours_idx = self.tree.query(self.data[[self.x, self.y]].values, k=k)
-            neighbours = self.data.iloc[nearest_neighbours_idx[0]]
-            if set(neighbours['labels'].unique()) == {-1}:
+            k = min(max(int(self.tree_index.shape[0] * 0.01), 1), 100)
+            _, nearest_neighbours_idx = self.tree.query(target.reshape(1, -1), k=k)
+            neighbours = self.data.loc[self.tree_index[nearest_neighbours_idx[0]], 'labels']
+            if set(neighbours.unique()) == {-1}:
                 self.warnings.append(f'Population {target_population} assigned to noise (i.e. population not found)')
                 return -1
         # Not surrounded by noise, assign to nearest centroid
-        cluster_centroids = [(x, centroid(self.data[self.data['labels'] == x][[self.x, self.y]].values))
-                             for x in [label for label in self.data['labels'].unique() if label != -1]]
-        distance_to_centroids = [(x, np.linalg.norm(target-c)) for x, c in cluster_centroids]
-        return min(distance_to_centroids, key=lambda x: x[1])[0]
+        distance_to_centroids = np.linalg.norm(cluster_centroids.values - target, axis=1)
+        return cluster_centroids.index[np.argmin(distance_to_centroids)]
 
     def _predict_pop_clusters(self,
                               cluster_polygons: dict):
@@ -356,9 +535,11 @@ class DensityClustering(Gate):
             raise GateError('Clustering algorithm failed to identify any clusters (all labels attain to noise) '
                             'If sampling, try increasing sample size')
         assignments = dict()
+        cluster_centroids = self._cluster_centroids()
         for p in self.child_populations.populations.keys():
             assignments[p] = self._match_pop_to_cluster(target_population=p,
-                                                        cluster_polygons=cluster_polygons)
+                                                        cluster_polygons=cluster_polygons,
+                                                        cluster_centroids=cluster_centroids)
         # Check for multiple cluster assignments
         final_assignments = dict()
         clusters_pops = collections.defaultdict(list)
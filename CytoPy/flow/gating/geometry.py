@@ -0,0 +1,294 @@
+from ..transforms import apply_transform
+from .utilities import inside_ellipse, polygon_mask
+from shapely.geometry.polygon import Polygon
+from mongoengine.base import BaseList
+import pandas as pd
+import numpy as np
+
+
+def threshold_mask(x: np.array,
+                   threshold: float,
+                   definition: str) -> np.array:
+    """
+    Boolean mask for a population defined by a threshold in one dimension. As when gating
+    (see flow.gating.base.Gate.child_update_1d) values are compared to two decimal places and events
+    equal to the threshold are positive.
+
+    Parameters
+    ----------
+    x: Numpy.array
+        x-axis values
+    threshold: float
+    definition: str
+        either '+' or '-'
+
+    Returns
+    -------
+    Numpy.array
+    """
+    x = np.round(x, decimals=2)
+    threshold = round(threshold, 2)
+    if definition == '+':
+        return x >= threshold
+    if definition == '-':
+        return x < threshold
+    raise ValueError('Definition must have a value of "+" or "-" for a 1D threshold gate')
+
+
+def threshold_2d_mask(x: np.array,
+                      y: np.array,
+                      threshold_x: float,
+                      threshold_y: float,
+                      definition: str or list) -> np.array:
+    """
+    Boolean mask for a population defined by two thresholds (in x-axis and y-axis plane). As when gating
+    (see flow.gating.base.Gate.child_update_2d) values are compared to two decimal places and events
+    equal to a threshold are positive.
+
+    Parameters
+    ----------
+    x: Numpy.array
+        x-axis values
+    y: Numpy.array
+        y-axis values
+    threshold_x: float
+    threshold_y: float
+    definition: str or list
+        one or more of '++', '--', '+-', '-+'; a population with multiple definitions is the union of the
+        quadrants
+
+    Returns
+    -------
+    Numpy.array
+    """
+    xp = np.round(x, decimals=2) >= round(threshold_x, 2)
+    yp = np.round(y, decimals=2) >= round(threshold_y, 2)
+    quadrants = {'++': lambda: xp & yp,
+                 '--': lambda: ~xp & ~yp,
+                 '+-': lambda: xp & ~yp,
+                 '-+': lambda: ~xp & yp}
+    if type(definition) not in [list, BaseList]:
+        definition = [definition]
+    mask = np.zeros(x.shape[0], dtype=bool)
+    for d in definition:
+        if d not in quadrants.keys():
+            raise ValueError('Definition must have a value of "+-", "-+", "--", or "++" for a 2D threshold gate')
+        mask |= quadrants[d]()
+    return mask
+
+
+def _signed(mask: np.array,
+            definition: str,
+            shape: str) -> np.array:
+    if definition == '+':
+        return mask
+    if definition == '-':
+        return ~mask
+    raise ValueError(f'Definition must have a value of "+" or "-" for a {shape} geom')
+
+
+def rect_mask(x: np.array,
+              y: np.array,
+              x_min: float,
+              x_max: float,
+              y_min: float,
+              y_max: float,
+              definition: str) -> np.array:
+    """
+    Boolean mask for a population defined by a rectangular gate (bounds inclusive)
+
+    Parameters
+    ----------
+    x: Numpy.array
+        x-axis values
+    y: Numpy.array
+        y-axis values
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    definition: str
+        '+' for events inside the gate, '-' for events outside
+
+    Returns
+    -------
+    Numpy.array
+    """
+    mask = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+    return _signed(mask, definition, 'rectangular')
+
+
+def ellipse_mask(x: np.array,
+                 y: np.array,
+                 centroid: tuple,
+                 width: float,
+                 height: float,
+                 angle: float,
+                 definition: str) -> np.array:
+    """
+    Boolean mask for a population defined by an elliptical gate (see flow.gating.utilities.inside_ellipse)
+
+    Parameters
+    ----------
+    x: Numpy.array
+        x-axis values
+    y: Numpy.array
+        y-axis values
+    centroid: tuple
+        x,y coordinate corresponding to center of elipse
+    width: float
+    height: float
+    angle: float
+    definition: str
+        '+' for events inside the gate, '-' for events outside
+
+    Returns
+    -------
+    Numpy.array
+    """
+    mask = inside_ellipse(np.column_stack([x, y]), center=tuple(centroid), width=width, height=height, angle=angle)
+    return _signed(mask, definition, 'ellipse')
+
+
+def poly_mask(x: np.array,
+              y: np.array,
+              cords: dict,
+              definition: str = '+') -> np.array:
+    """
+    Boolean mask for a population defined by a polygon gate
+
+    Parameters
+    ----------
+    x: Numpy.array
+        x-axis values
+    y: Numpy.array
+        y-axis values
+    cords: dict
+        polygon vertices; dictionary with keys x and y
+    definition: str, (default='+')
+        '+' for events inside the gate, '-' for events outside
+
+    Returns
+    -------
+    Numpy.array
+    """
+    if len(cords['x']) < 3:
+        # Empty polygon e.g. cluster gate where the population was not found
+        return _signed(np.zeros(x.shape[0], dtype=bool), definition, 'polygon')
+    poly = Polygon([(i, j) for i, j in zip(cords['x'], cords['y'])])
+    return _signed(polygon_mask(np.column_stack([x, y]), poly), definition, 'polygon')
+
+
+def _check_geom(geom: dict) -> None:
+    assert 'shape' in geom, 'Geom missing key argument "shape"'
+    assert geom.get('x'), 'Geom is missing value for "x"'
+    keys = {'threshold': ['threshold', 'transform_x', 'definition'],
+            '2d_threshold': ['threshold_x', 'threshold_y', 'transform_x', 'transform_y', 'definition'],
+            'rect': ['x_min', 'x_max', 'y_min', 'y_max', 'transform_x', 'transform_y', 'definition'],
+            'ellipse': ['centroid', 'width', 'height', 'angle', 'transform_x', 'transform_y', 'definition'],
+            'poly': ['cords', 'transform_x', 'transform_y']}
+    if geom['shape'] not in keys.keys():
+        raise ValueError('Geom shape not recognised, should be one of: threshold, 2d_threshold, ellipse, rect, poly')
+    missing = [k for k in keys[geom['shape']] if k not in geom.keys()]
+    assert not missing, f'Geom of shape {geom["shape"]} is missing keys: {missing}'
+    if geom['shape'] != 'threshold':
+        assert geom.get('y'), 'Geom is missing value for "y"'
+    if geom['shape'] == 'poly':
+        assert type(geom.get('cords')) == dict and all([c in geom['cords'].keys() for c in ['x', 'y']]), \
+            'Cords should be of type dictionary with keys: x, y'
+
+
+def valid_geom(geom: dict or None) -> bool:
+    """
+    Whether a geom fully describes a gate, such that it can be evaluated with geom_mask (e.g. populations
+    generated by merging populations or by a supervised method only record their axes)
+
+    Parameters
+    ----------
+    geom: dict, optional
+
+    Returns
+    -------
+    bool
+    """
+    if not geom:
+        return False
+    try:
+        _check_geom(geom)
+    except (AssertionError, ValueError):
+        return False
+    return True
+
+
+def geom_mask(geom: dict,
+              x: np.array,
+              y: np.array or None = None) -> np.array:
+    """
+    Given the geom of a population and the (transformed) values of the parent population, return a boolean
+    mask of the events that belong to the population
+
+    Parameters
+    ----------
+    geom: dict
+        Dictionary of geometric description of gate; keys required depend on the shape (threshold, 2d_threshold,
+        rect, ellipse or poly)
+    x: Numpy.array
+        x-axis values of the parent population, transformed as specified by the geom
+    y: Numpy.array, optional
+        y-axis values of the parent population, transformed as specified by the geom (not required for 'threshold')
+
+    Returns
+    -------
+    Numpy.array
+    """
+    _check_geom(geom)
+    shape = geom['shape']
+    if shape == 'threshold':
+        return threshold_mask(x, geom['threshold'], geom['definition'])
+    if shape == '2d_threshold':
+        return threshold_2d_mask(x, y, geom['threshold_x'], geom['threshold_y'], geom['definition'])
+    if shape == 'rect':
+        return rect_mask(x, y, geom['x_min'], geom['x_max'], geom['y_min'], geom['y_max'], geom['definition'])
+    if shape == 'ellipse':
+        return ellipse_mask(x, y, geom['centroid'], geom['width'], geom['height'], geom['angle'], geom['definition'])
+    return poly_mask(x, y, geom['cords'], geom.get('definition', '+'))
+
+
+def geom_masks(geoms: dict,
+               data: pd.DataFrame) -> dict:
+    """
+    Evaluate the geoms of populations that share the same parent in one pass. Only the columns required by the
+    geoms are taken from the parent data and each (column, transform) pair is transformed once, regardless of
+    how many populations use it.
+
+    Parameters
+    ----------
+    geoms: dict
+        {population name: geom}
+    data: Pandas.DataFrame
+        Parent population (untransformed)
+
+    Returns
+    -------
+    dict
+        {population name: boolean mask}
+    """
+    columns = dict()
+
+    def column(name: str, transform: str or None) -> np.array:
+        if (name, transform) not in columns.keys():
+            values = data[[name]]
+            if transform is not None:
+                values = apply_transform(values, features_to_transform=[name], transform_method=transform)
+            columns[(name, transform)] = values[name].values
+        return columns[(name, transform)]
+
+    masks = dict()
+    for population, geom in geoms.items():
+        _check_geom(geom)
+        x = column(geom['x'], geom.get('transform_x'))
+        y = None
+        if geom['shape'] != 'threshold':
+            y = column(geom['y'], geom.get('transform_y'))
+        masks[population] = geom_mask(geom, x, y)
+    return masks
@@ -4,7 +4,6 @@ from sklearn.mixture import GaussianMixture, BayesianGaussianMixture
 from scipy import linalg, stats
 import pandas as pd
 import numpy as np
-import math
 
 
 class MixtureModel(Gate):
@@ -29,6 +28,13 @@ class MixtureModel(Gate):
         rectangular filter to apply to data prior to gating (see flow.gating.utilities.rectangular_filter)
     covar: str, (default='full')
         string describing the type of covariance parameters to use (see sklearn documentation for details)
+    init_params: dict, optional
+        initial component weights ('weights'), means ('means') and precisions ('precisions') of a gaussian mixture
+        model (ignored if method is 'bayesian'); typically the parameters fitted to a previous sample (see warm_start)
+    warm_start: bool, (default=False)
+        If True, the fitted model parameters are returned to the gate (see template_kwargs) and used to initialise
+        the model the next time the gate is applied, such that applying a template across samples converges in a
+        few iterations
     kwargs:
         Gate constructor arguments (see flow.gating.base)
     """
@@ -39,6 +45,8 @@ class MixtureModel(Gate):
                  conf: float = 0.95,
                  rect_filter: dict or None = None,
                  covar: str = 'full',
+                 init_params: dict or None = None,
+                 warm_start: bool = False,
                  **kwargs):
         super().__init__(**kwargs)
         self.sample = self.sampling(self.data, 5000)
@@ -48,6 +56,36 @@ class MixtureModel(Gate):
         self.conf = conf
         self.rect_filter = rect_filter
         self.covar = covar
+        self.init_params = init_params
+        self.warm_start = warm_start
+
+    def _model(self,
+               k: int) -> GaussianMixture or BayesianGaussianMixture:
+        """
+        Internal method. Construct the mixture model, initialised from init_params if given.
+
+        Parameters
+        ----------
+        k: int
+            number of components
+
+        Returns
+        -------
+        GaussianMixture or BayesianGaussianMixture
+        """
+        if self.method == 'bayesian':
+            return BayesianGaussianMixture(n_components=k, covariance_type=self.covar, random_state=42)
+        if self.method != 'gmm':
+            raise GateError('Invalid method, must be one of: gmm, bayesian')
+        if self.init_params is None:
+            return GaussianMixture(n_components=k, covariance_type=self.covar, random_state=42)
+        if len(self.init_params.get('means')) != k:
+            self.warnings.append('Initial parameters do not match the number of components and have been ignored')
+            return GaussianMixture(n_components=k, covariance_type=self.covar, random_state=42)
+        return GaussianMixture(n_components=k, covariance_type=self.covar, random_state=42,
+                               weights_init=np.array(self.init_params.get('weights')),
+                               means_init=np.array(self.init_params.get('means')),
+                               precisions_init=np.array(self.init_params.get('precisions')))
 
     def gate(self):
         """
@@ -59,34 +97,34 @@ class MixtureModel(Gate):
             Updated child population collection
         """
         data = self.data[[self.x, self.y]]
+        # Fit to the down-sample, if generated
+        sample = data if self.sample is None else self.sample[[self.x, self.y]]
 
         # Filter if necessary
         if self.rect_filter:
             data = rectangular_filter(data, self.x, self.y, self.rect_filter)
+            sample = rectangular_filter(sample, self.x, self.y, self.rect_filter)
 
         # Define model
         k = self.k
         if k is None:
             k = 3
-        if self.method == 'gmm':
-            model = GaussianMixture(n_components=k, covariance_type=self.covar, random_state=42).fit(data)
-        elif self.method == 'bayesian':
-            model = BayesianGaussianMixture(n_components=k, covariance_type=self.covar, random_state=42).fit(data)
-        else:
-            raise GateError('Invalid method, must be one of: gmm, bayesian')
+        model = self._model(k).fit(sample)
+        if self.warm_start and self.method == 'gmm':
+            self.template_kwargs['init_params'] = dict(weights=model.weights_.tolist(),
+                                                       means=model.means_.tolist(),
+                                                       precisions=model.precisions_.tolist())
 
         # Select optimal component
         if self.target:
             # Choose component closest to target
-            tp_medoid = min(model.means_, key=lambda m: math.hypot(m[0] - self.target[0], m[1] - self.target[1]))
-            tp_idx = [list(x) for x in model.means_].index(list(tp_medoid))
+            tp_idx = int(np.argmin(np.hypot(model.means_[:, 0] - self.target[0], model.means_[:, 1] - self.target[1])))
         else:
             # If target isn't specified then select the most populous component
-            y_hat = model.predict(data)
-            tp_idx = stats.mode(y_hat)[0][0]
+            tp_idx = int(np.argmax(np.bincount(model.predict(sample), minlength=k)))
         mask, geom = self.create_ellipse(data, model, tp_idx)
         pos_pop = data[mask]
-        neg_pop = data[~data.index.isin(pos_pop.index.values)]
+        neg_pop = data[~mask]
         neg = self.child_populations.fetch_by_definition('-')
         pos = self.child_populations.fetch_by_definition('+')
         for x, definition in zip([pos, neg], ['+', '-']):
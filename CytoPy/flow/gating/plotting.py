@@ -73,6 +73,59 @@ def plot_axis_lims(x: str, y: str, xlim: tuple, ylim: tuple) -> tuple and tuple:
     return update_lim(x, xlim), update_lim(y, ylim)
 
 
+def draw_geoms(ax: matplotlib.pyplot.axes,
+               geoms: dict,
+               colour: str = '#EB1313',
+               lw: float = 2.5,
+               verbose: bool = True) -> matplotlib.pyplot.axes:
+    """
+    Draw the geometric gates of populations on an axes object
+
+    Parameters
+    ----------
+    ax : matplotlib.pyplot.axes
+
+    geoms : dict
+        dictionary object; keys correspond to child population names and values their geometric gate definition
+    colour : str, (default='#EB1313')
+        colour of gates
+    lw : float, (default=2.5)
+        line width
+    verbose : bool, (default=True)
+        If True, populations without a gate are reported
+
+    Returns
+    -------
+    matplotlib.pyplot.axes
+        Updated axes object
+    """
+    for child_name, geom in geoms.items():
+        if geom is None or geom == dict():
+            if verbose:
+                print(f'Population {child_name} has no associated gate, skipping...')
+            continue
+        if geom['shape'] == 'threshold':
+            ax.axvline(geom['threshold'], c=colour, lw=lw)
+        if geom['shape'] == '2d_threshold':
+            ax.axvline(geom['threshold_x'], c=colour, lw=lw)
+            ax.axhline(geom['threshold_y'], c=colour, lw=lw)
+        if geom['shape'] == 'ellipse':
+            ellipse = patches.Ellipse(xy=geom['centroid'], width=geom['width'], height=geom['height'],
+                                      angle=geom['angle'], fill=False, edgecolor=colour, lw=lw)
+            ax.add_patch(ellipse)
+        if geom['shape'] == 'rect':
+            rect = patches.Rectangle(xy=(geom['x_min'], geom['y_min']),
+                                     width=((geom['x_max']) - (geom['x_min'])),
+                                     height=(geom['y_max'] - geom['y_min']),
+                                     fill=False, edgecolor=colour, lw=lw)
+            ax.add_patch(rect)
+        if geom['shape'] == 'poly':
+            x = geom['cords']['x']
+            y = geom['cords']['y']
+            ax.plot(x, y, '-', c=colour, label=child_name, lw=lw)
+    return ax
+
+
 class Plot:
     """
     Class for producing static FACs plots. Must be associated to a Gating object.
@@ -92,6 +145,289 @@ class Plot:
                    'orchid']
         random.shuffle(colours)
         self.colours = cycle(colours)
+        self._hist_cache = dict()
+
+    def clear_cache(self) -> None:
+        """
+        Clear cached 2D histograms (see population_histogram)
+
+        Returns
+        -------
+        None
+        """
+        self._hist_cache = dict()
+
+    def _population_index(self,
+                          population: str,
+                          ctrl_id: str or None = None) -> np.array:
+        """
+        Internal method. Index of a population in the primary data or, if ctrl_id is given, in the control data
+
+        Parameters
+        ----------
+        population: str
+        ctrl_id: str, optional
+
+        Returns
+        -------
+        Numpy.array
+        """
+        assert population in self.gating.populations.keys(), f'Invalid population {population}'
+        if ctrl_id is None:
+            return self.gating.populations[population].index
+        idx = self.gating.populations[population].control_idx.get(ctrl_id)
+        assert idx is not None, f'No cached index for {ctrl_id} associated to population {population}, ' \
+                                f'have you called "control_gating" previously?'
+        return idx
+
+    def _event_xy(self,
+                  idx: np.array,
+                  x: str,
+                  y: str,
+                  transforms: dict,
+                  ctrl_id: str or None = None) -> np.array:
+        """
+        Internal method. Fetch the x and y values of the given events, transformed for plotting. Only the two
+        columns are taken from the primary (or control) data.
+
+        Parameters
+        ----------
+        idx: Numpy.array
+            index of events
+        x: str
+            name of x-axis dimension
+        y: str
+            name of y-axis dimension
+        transforms: dict
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
+        ctrl_id: str, optional
+            If given, events are taken from the control data
+
+        Returns
+        -------
+        Numpy.array
+            (n, 2) array of x and y values
+        """
+        columns = list(dict.fromkeys([x, y]))
+        if ctrl_id is None:
+            data = self.gating.data[columns].iloc[self.gating._positions(idx)]
+        else:
+            data = self.gating.ctrl[ctrl_id][columns].loc[idx]
+        return transform_axes(data=data, axes_vars={'x': x, 'y': y}, transforms=transforms).values
+
+    @staticmethod
+    def _bins(n: int) -> int:
+        """
+        Internal method. Number of bins (per axis) of a 2D histogram of n events
+
+        Parameters
+        ----------
+        n: int
+
+        Returns
+        -------
+        int
+        """
+        if n <= 100:
+            return 50
+        if n > 1000:
+            return 500
+        return int(n * 0.5)
+
+    def population_histogram(self,
+                             population: str,
+                             x: str,
+                             y: str,
+                             transforms: dict or None = None,
+                             ctrl_id: str or None = None,
+                             bins: int or None = None,
+                             xlim: tuple or None = None,
+                             ylim: tuple or None = None) -> (np.array, np.array, np.array):
+        """
+        2D histogram of a population. Histograms are cached for each population, control, axis, transform, bins
+        and limits, such that a population is only fetched and transformed once regardless of how many times it is
+        plotted. The cache is invalidated when the index of the population changes (e.g. the gate is edited).
+
+        Parameters
+        ----------
+        population: str
+            name of population
+        x: str
+            name of x-axis dimension
+        y: str
+            name of y-axis dimension
+        transforms: dict, optional
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
+        ctrl_id: str, optional
+            If given, the histogram of the equivalent population within the control data is returned
+        bins: int, optional
+            Number of bins per axis; by default determined by the number of events
+        xlim: tuple, optional
+            x-axis range of histogram; by default the range of the data
+        ylim: tuple, optional
+            y-axis range of histogram; by default the range of the data
+
+        Returns
+        -------
+        Numpy.array, Numpy.array, Numpy.array
+            bin counts (x bins, y bins), x bin edges, y bin edges
+        """
+        if transforms is None:
+            transforms = dict()
+        idx = self._population_index(population, ctrl_id)
+        bins = bins or self._bins(idx.shape[0])
+        key = (population, ctrl_id, x, y, transforms.get('x'), transforms.get('y'), bins,
+               None if xlim is None else tuple(xlim), None if ylim is None else tuple(ylim))
+        cached = self._hist_cache.get(key)
+        if cached is not None and cached[0] is idx:
+            return cached[1]
+        xy = self._event_xy(idx, x, y, transforms, ctrl_id)
+        xy = xy[np.isfinite(xy).all(axis=1)]
+
+        def data_range(values, lim):
+            if lim:
+                return lim[0], lim[1]
+            if values.shape[0] == 0:
+                return 0, 1
+            return values.min(), values.max()
+        hist_range = [data_range(xy[:, 0], xlim), data_range(xy[:, 1], ylim)]
+        hist = np.histogram2d(xy[:, 0], xy[:, 1], bins=bins, range=hist_range)
+        self._hist_cache[key] = (idx, hist)
+        return hist
+
+    def population_hull(self,
+                        population: str,
+                        x: str,
+                        y: str,
+                        transforms: dict or None = None,
+                        ctrl_id: str or None = None) -> np.array:
+        """
+        Vertices of the convex hull of a population, as a closed path. For populations of 1000 events or more the
+        hull is computed from the corners of the non-empty bins of the cached 2D histogram (see
+        population_histogram), which encloses every event and is exact to within one bin.
+
+        Parameters
+        ----------
+        population: str
+            name of population
+        x: str
+            name of x-axis dimension
+        y: str
+            name of y-axis dimension
+        transforms: dict, optional
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
+        ctrl_id: str, optional
+            If given, the hull of the equivalent population within the control data is returned
+
+        Returns
+        -------
+        Numpy.array
+            (n, 2) array of vertices
+        """
+        if transforms is None:
+            transforms = dict()
+        idx = self._population_index(population, ctrl_id)
+        if idx.shape[0] < 1000:
+            points = self._event_xy(idx, x, y, transforms, ctrl_id)
+        else:
+            h, xedges, yedges = self.population_histogram(population, x, y, transforms, ctrl_id=ctrl_id)
+            i, j = np.nonzero(h)
+            points = np.concatenate([np.column_stack([xedges[i + a], yedges[j + b]])
+                                     for a in [0, 1] for b in [0, 1]])
+        hull = ConvexHull(points)
+        return points[np.append(hull.vertices, hull.vertices[0])]
+
+    @staticmethod
+    def _render_hist(ax: matplotlib.pyplot.axes,
+                     hist: (np.array, np.array, np.array)) -> matplotlib.pyplot.axes:
+        """
+        Internal method. Render a precomputed 2D histogram (see population_histogram) as an image
+
+        Parameters
+        ----------
+        ax: matplotlib.pyplot.axes
+
+        hist: tuple
+            bin counts, x bin edges, y bin edges
+
+        Returns
+        -------
+        matplotlib.pyplot.axes
+            Updated matplotlib axes object
+        """
+        h, xedges, yedges = hist
+        if h.max() > 0:
+            ax.imshow(np.ma.masked_less_equal(h.T, 0), origin='lower', aspect='auto', interpolation='nearest',
+                      extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]), norm=LogNorm(), cmap=plt.cm.jet)
+        return ax
+
+    def _plot_population(self,
+                         ax: matplotlib.pyplot.axes,
+                         population: str,
+                         x: str,
+                         y: str,
+                         transforms: dict,
+                         ctrl_id: str or None = None,
+                         xlim: tuple or None = None,
+                         ylim: tuple or None = None) -> matplotlib.pyplot.axes:
+        """
+        Internal method. Plot a population as a scatter plot if it has fewer than 1000 events, otherwise as a
+        (cached) 2D histogram
+
+        Parameters
+        ----------
+        ax: matplotlib.pyplot.axes
+
+        population: str
+            name of population
+        x: str
+            name of x-axis dimension
+        y: str
+            name of y-axis dimension
+        transforms: dict
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
+        ctrl_id: str, optional
+            If given, the equivalent population within the control data is plotted
+        xlim: tuple, optional
+            x-axis range of histogram
+        ylim: tuple, optional
+            y-axis range of histogram
+
+        Returns
+        -------
+        matplotlib.pyplot.axes
+            Updated matplotlib axes object
+        """
+        idx = self._population_index(population, ctrl_id)
+        if idx.shape[0] < 1000:
+            xy = self._event_xy(idx, x, y, transforms, ctrl_id)
+            ax.scatter(x=xy[:, 0], y=xy[:, 1], s=3)
+            return ax
+        hist = self.population_histogram(population, x, y, transforms, ctrl_id=ctrl_id, xlim=xlim, ylim=ylim)
+        return self._render_hist(ax, hist)
+
+    def gate_axes(self,
+                  gate_name: str) -> (dict, dict):
+        """
+        Axes and transforms used to plot a gate; FSC and SSC axes are not transformed
+
+        Parameters
+        ----------
+        gate_name : str
+            Name of gate
+
+        Returns
+        -------
+        dict, dict
+            axes variables {'x': x, 'y': y}, transforms {'x': transform method, 'y': transform method}
+        """
+        kwargs = {k: v for k, v in self.gating.gates[gate_name].kwargs}
+        axes_vars = {'x': kwargs['x'], 'y': kwargs.get('y') or self.default_axis}
+        transforms = dict(x=kwargs.get('transform_x', None), y=kwargs.get('transform_y', None))
+        for a in ['x', 'y']:
+            if any([x in axes_vars[a] for x in ['FSC', 'SSC']]):
+                transforms[a] = None
+        return axes_vars, transforms
 
     @staticmethod
     def _plot_asthetics(ax: matplotlib.pyplot.axes, x: str, y: str,
@@ -157,34 +493,21 @@ class Plot:
         """
         assert gate_name in self.gating.gates.keys(), f'Error: could not find {gate_name} in attached gate object'
         gate = self.gating.gates[gate_name]
-        kwargs = {k: v for k, v in gate.kwargs}
-
-        y = self.default_axis
-        if 'y' in kwargs.keys():
-            y = kwargs['y']
-        axes_vars = {'x': kwargs['x'], 'y': y}
-
+        axes_vars, default_transforms = self.gate_axes(gate_name)
+        y = axes_vars['y']
         if transforms is None:
-            xt = kwargs.get('transform_x', None)
-            yt = kwargs.get('transform_y', None)
-            transforms = dict(x=xt, y=yt)
-            for a in ['x', 'y']:
-                if any([x in axes_vars[a] for x in ['FSC', 'SSC']]):
-                    transforms[a] = None
+            transforms = default_transforms
 
         geoms = {c: self.gating.populations[c].geom for c in gate.children
                  if self.gating.populations[c].geom is not None}
-        data = transform_axes(data=self.gating.get_population_df(gate.parent, transform=False),
-                              axes_vars=axes_vars,
-                              transforms=transforms)
         xlim, ylim = plot_axis_lims(x=axes_vars['x'], y=y, xlim=xlim, ylim=ylim)
         num_axes = 1
         fig, axes = plt.subplots(ncols=num_axes, figsize=figsize)
-        self._geom_plot(data=data, fig=fig, axes=axes,
+        self._geom_plot(population=gate.parent, transforms=transforms, fig=fig, axes=axes,
                         geoms=geoms, axes_vars=axes_vars,
                         xlim=xlim, ylim=ylim, name=gate_name)
 
-    def _geom_plot(self, data: pd.DataFrame, fig: matplotlib.pyplot.figure,
+    def _geom_plot(self, population: str, transforms: dict, fig: matplotlib.pyplot.figure,
                    axes: np.array or matplotlib.pyplot.axes, geoms: dict,
                    axes_vars: dict, xlim: tuple, ylim: tuple, name: str) -> None:
         """
@@ -196,8 +519,10 @@ class Plot:
 
         Parameters
         -----------
-        data: Pandas.DataFrame
-            population data
+        population: str
+            name of the population the gate was applied to
+        transforms: dict
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
         geoms: dict
             dictionary object; keys correspond to child population names and values their geometric gate definition
         axes_vars: dict
@@ -218,20 +543,29 @@ class Plot:
         --------
         None
         """
-        self._build_geom_plot(data=data, x=axes_vars['x'], y=axes_vars['y'], geoms=geoms,
-                              ax=axes, xlim=xlim, ylim=ylim, title=name)
+        self._build_geom_plot(population=population, transforms=transforms, x=axes_vars['x'], y=axes_vars['y'],
+                              geoms=geoms, ax=axes, xlim=xlim, ylim=ylim, title=name)
         fig.tight_layout()
         fig.show()
 
-    def _build_geom_plot(self, data: pd.DataFrame, x: str, y: str or None, geoms: dict, ax: matplotlib.pyplot.axes,
-                         xlim: tuple or None, ylim: tuple or None, title: str) -> matplotlib.pyplot.axes or None:
+    def _build_geom_plot(self, population: str, transforms: dict, x: str, y: str or None, geoms: dict,
+                         ax: matplotlib.pyplot.axes, xlim: tuple or None, ylim: tuple or None,
+                         title: str) -> matplotlib.pyplot.axes or None:
         """
         Produce a plot of a gate that generates a geometric object
 
         Parameters
         -----------
-        data: Pandas.DataFrame
-            pandas dataframe of events data to plot
+        population: str
+            name of the population the gate was applied to
+        transforms: dict
+            dictionary of transformations to be applied to axis {'x' or 'y': transform method}
+        x: str
+            name of x-axis dimension
+        y: str
+            name of y-axis dimension
+        geoms: dict
+            dictionary object; keys correspond to child population names and values their geometric gate definition
         xlim: tuple, optional
             custom x-axis limit (default = None)
         ylim: tuple, optional
@@ -253,38 +587,11 @@ class Plot:
                   f'a population classified by this method in 2D, use the `plot_sml` method')
             return None
 
-        if data.shape[0] < 1000:
-            ax.scatter(x=data[x], y=data[y], s=3)
-            ax = self._plot_asthetics(ax, x, y, xlim, ylim, title)
-        else:
-            ax = self._2dhist(ax, data, x, y)
-            ax = self._plot_asthetics(ax, x, y, xlim, ylim, title)
+        ax = self._plot_population(ax, population, x, y, transforms, xlim=xlim, ylim=ylim)
+        ax = self._plot_asthetics(ax, x, y, xlim, ylim, title)
 
         # Draw geom
-        for (child_name, geom), cc in zip(geoms.items(), self.colours):
-            colour = '#EB1313'
-            if geom is None or geom == dict():
-                print(f'Population {child_name} has no associated gate, skipping...')
-                continue
-            if geom['shape'] == 'threshold':
-                ax.axvline(geom['threshold'], c=colour, lw=2.5)
-            if geom['shape'] == '2d_threshold':
-                ax.axvline(geom['threshold_x'], c=colour, lw=2.5)
-                ax.axhline(geom['threshold_y'], c=colour, lw=2.5)
-            if geom['shape'] == 'ellipse':
-                ellipse = patches.Ellipse(xy=geom['centroid'], width=geom['width'], height=geom['height'],
-                                          angle=geom['angle'], fill=False, edgecolor=colour, lw=2.5)
-                ax.add_patch(ellipse)
-            if geom['shape'] == 'rect':
-                rect = patches.Rectangle(xy=(geom['x_min'], geom['y_min']),
-                                         width=((geom['x_max']) - (geom['x_min'])),
-                                         height=(geom['y_max'] - geom['y_min']),
-                                         fill=False, edgecolor=colour, lw=2.5)
-                ax.add_patch(rect)
-            if geom['shape'] == 'poly':
-                x = geom['cords']['x']
-                y = geom['cords']['y']
-                ax.plot(x, y, '-k', c=colour, label=child_name, lw=2.5)
+        return draw_geoms(ax, geoms)
 
     @staticmethod
     def _2dhist(ax: matplotlib.pyplot.axes, data: pd.DataFrame, x: str, y: str) -> matplotlib.pyplot.axes:
@@ -307,14 +614,8 @@ class Plot:
         matplotlib.pyplot.axes
             Updated matplotlib axes object
         """
-        if data.shape[0] <= 100:
-            bins = 50
-        elif data.shape[0] > 1000:
-            bins = 500
-        else:
-            bins = int(data.shape[0] * 0.5)
-        ax.hist2d(data[x], data[y], bins=bins, norm=LogNorm(), cmap=plt.cm.jet)
-        return ax
+        hist = np.histogram2d(data[x].values, data[y].values, bins=Plot._bins(data.shape[0]))
+        return Plot._render_hist(ax, hist)
 
     def plot_population(self,
                         population_name: str,
@@ -345,7 +646,9 @@ class Plot:
             dictionary object, key corresponds to one of 3 possible axes (x, y or z) and value
             the variable to plot (If None, defaults to logicle transform for every axis)
         sample : float, optional
-            if a float value is provided, given proportion of data is sampled prior to plotting (optional)
+            if a float value is provided, given proportion of data is sampled prior to plotting a scatter plot
+            (populations of 1000 events or more are plotted as a 2D histogram of all events; see
+            population_histogram)
         figsize: tuple, (default=(5,5))
             Figure size passed to matplotlib.pyplot.subplots call
         ctrl_id: str, optional
@@ -356,25 +659,20 @@ class Plot:
         None
         """
         fig, ax = plt.subplots(figsize=figsize)
-        data = self.gating.get_population_df(population_name,
-                                             transform=False,
-                                             ctrl_id=ctrl_id).copy()
-        assert data is not None, 'Invalid population'
+        idx = self._population_index(population_name, ctrl_id)
 
         if transforms is None:
             print('No transforms provided, defaulting to logicle')
             transforms = dict(x='logicle', y='logicle')
-        data = transform_axes(data=data, axes_vars={'x': x, 'y': y}, transforms=transforms)
-        if sample is not None:
-            data = data.sample(frac=sample)
 
         xlim, ylim = plot_axis_lims(x=x, y=y, xlim=xlim, ylim=ylim)
-        if data.shape[0] < 1000:
-            ax.scatter(x=data[x], y=data[y], s=3)
-            ax = self._plot_asthetics(ax, x, y, xlim, ylim, title=population_name)
+        if idx.shape[0] < 1000 and sample is not None:
+            xy = self._event_xy(idx, x, y, transforms, ctrl_id)
+            xy = xy[np.random.choice(xy.shape[0], int(xy.shape[0] * sample), replace=False)]
+            ax.scatter(x=xy[:, 0], y=xy[:, 1], s=3)
         else:
-            self._2dhist(ax, data, x, y)
-            ax = self._plot_asthetics(ax, x, y, xlim, ylim, title=population_name)
+            ax = self._plot_population(ax, population_name, x, y, transforms, ctrl_id=ctrl_id, xlim=xlim, ylim=ylim)
+        ax = self._plot_asthetics(ax, x, y, xlim, ylim, title=population_name)
         fig.show()
 
     def compare_control(self,
@@ -417,32 +715,18 @@ class Plot:
         if transforms is None:
             print('No transforms provided, defaulting to logicle')
             transforms = dict(x='logicle', y='logicle')
-        axes_vars = {'x': x, 'y': y}
-        base_pop = transform_axes(data=self.gating.get_population_df(population, transform=False),
-                                  axes_vars=axes_vars,
-                                  transforms=transforms)
-        parent = transform_axes(data=self.gating.get_population_df(self.gating.populations[population].parent.name,
-                                                                   transform=False),
-                                axes_vars=axes_vars,
-                                transforms=transforms)
-        ctrls = [transform_axes(data=self.gating.get_population_df(population,
-                                                                   transform=False,
-                                                                   ctrl_id=c),
-                                axes_vars=axes_vars,
-                                transforms=transforms) for c in ctrl_id]
+        pop_hull = {population: self.population_hull(population, x, y, transforms)}
+        pop_hull.update({c: self.population_hull(population, x, y, transforms, ctrl_id=c) for c in ctrl_id})
 
         fig, ax = plt.subplots(figsize=figsize)
         xlim, ylim = plot_axis_lims(x=x, y=y, xlim=xlim, ylim=ylim)
+        parent = self.gating.populations[population].parent.name
+        ax = self._render_hist(ax, self.population_histogram(parent, x, y, transforms, xlim=xlim, ylim=ylim))
         ax = self._plot_asthetics(ax, x, y, xlim, ylim, title=f'Control comparison; {population}; {ctrl_id}')
-        ax = self._2dhist(ax=ax, data=parent, x=x, y=y)
-        pop_hull = {pid: {'data': d[[x, y]].values, 'hull': ConvexHull(d[[x, y]].values)}
-                    for pid, d in zip([population] + ctrl_id, [base_pop] + ctrls)}
         legend_handles = list()
-        for pid, data_hull in pop_hull.items():
+        for pid, hull in pop_hull.items():
             colour = next(self.colours)
-            d = data_hull.get('data')
-            for simplex in data_hull.get('hull').simplices:
-                ax.plot(d[simplex, 0], d[simplex, 1], '-k', c=colour)
+            ax.plot(hull[:, 0], hull[:, 1], '-', c=colour)
             legend_handles.append(mpatches.Patch(color=colour, label=pid))
         ax.legend(handles=legend_handles, loc='center left', bbox_to_anchor=(1, 0.5))
         return ax
@@ -531,29 +815,23 @@ class Plot:
                     transforms[a] = None
         populations = pgeoms + poverlay
 
-        # Get root data
-        root_data = transform_axes(self.gating.get_population_df(base_population),
-                                   transforms=transforms, axes_vars=axes_vars)
-        # Get population data
-        pop_data = {p: root_data.loc[self.gating.populations[p].index][[x, y]].values
+        # Get population data; populations displayed as a gate are represented by their convex hull and only
+        # overlaid populations are fetched event by event
+        pop_data = {p: self.population_hull(p, x, y, transforms) if p in pgeoms else
+                    self._event_xy(self.gating.populations[p].index, x, y, transforms)
                     for p in populations}
-        # Establish convex hull and centroids for populations
-        pop_hull = {p: ConvexHull(d) for p, d in pop_data.items() if p in pgeoms}
 
         # Get cluster data
-        c_hull = dict()
         cgeoms = [(c, self.gating._cluster_idx(c, clustering_root=cluster_root_population, meta=meta_clusters))
                   for c in cgeoms]
         coverlay = [(c, self.gating._cluster_idx(c, clustering_root=cluster_root_population, meta=meta_clusters))
                     for c in coverlay]
-        if cgeoms:
-            c_hull = {c: ConvexHull(root_data.loc[idx][[x, y]].values) for c, idx in cgeoms}
 
         # Build plotting constructs
         if title is None:
             title = f'{base_population}: {populations}'
         fig, ax = plt.subplots(figsize=figsize)
-        ax = self._2dhist(ax=ax, data=root_data, x=x, y=y)
+        ax = self._render_hist(ax, self.population_histogram(base_population, x, y, transforms, xlim=xlim, ylim=ylim))
         ax = self._plot_asthetics(ax, x, y, xlim, ylim, title)
         colours = ['black', 'gray', 'brown', 'red', 'orange',
                    'coral', 'peru', 'olive', 'magenta', 'crimson',
@@ -563,20 +841,20 @@ class Plot:
         for p in pop_data.keys():
             c = next(colours)
             if p in pgeoms:
-                for simplex in pop_hull[p].simplices:
-                    ax.plot(pop_data[p][simplex, 0], pop_data[p][simplex, 1], '-k', c=c)
+                ax.plot(pop_data[p][:, 0], pop_data[p][:, 1], '-', c=c)
             else:
                 ax.scatter(x=pop_data[p][:, 0], y=pop_data[p][:, 1], s=15, c=[c], alpha=0.8, label=p,
                            linewidth=0.4, edgecolors='black')
         for c, idx in coverlay:
             col = next(colours)
-            cd = root_data.loc[idx][[x, y]].values
+            cd = self._event_xy(idx, x, y, transforms)
             ax.scatter(x=cd[:, 0], y=cd[:, 1], s=15, alpha=0.8, label=c, c=[col], linewidth=0.4, edgecolors='black')
         for c, idx in cgeoms:
             col = next(colours)
-            cd = root_data.loc[idx][[x, y]].values
-            for simplex in c_hull[c].simplices:
-                ax.plot(cd[simplex, 0], cd[simplex, 1], '-k', c=col)
+            cd = self._event_xy(idx, x, y, transforms)
+            vertices = ConvexHull(cd).vertices
+            vertices = np.append(vertices, vertices[0])
+            ax.plot(cd[vertices, 0], cd[vertices, 1], '-', c=col)
         ax.legend()
 
     def _get_data_transform(self, node: Node, geom: dict) -> pd.DataFrame:
@@ -0,0 +1,367 @@
+from ...data.fcs_experiments import FCSExperiment
+from .actions import Gating, Template
+from .base import GateError
+from .plotting import Plot, draw_geoms, plot_axis_lims
+from ..feedback import progress_bar
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from multiprocessing import Pool, cpu_count
+from collections import defaultdict, deque
+import pandas as pd
+import numpy as np
+import hashlib
+import html
+import re
+import os
+
+_REPORT_STATE = dict()
+
+
+def _filename(name: str) -> str:
+    """
+    Internal function. Make a gate or sample name safe for use as a file name. Unsafe characters are replaced
+    and a short digest of the name is appended, such that distinct names (e.g. "CD4+" and "CD4-") do not collide
+
+    Parameters
+    ----------
+    name: str
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1(str(name).encode()).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]', '_', str(name))}_{digest}"
+
+
+def _init_report_worker(output_dir: str,
+                        thumbnail_size: float,
+                        dpi: int) -> None:
+    """
+    Internal function. Initialise a worker process for rendering thumbnails
+
+    Parameters
+    ----------
+    output_dir: str
+    thumbnail_size: float
+    dpi: int
+
+    Returns
+    -------
+    None
+    """
+    _REPORT_STATE['output_dir'] = output_dir
+    _REPORT_STATE['thumbnail_size'] = thumbnail_size
+    _REPORT_STATE['dpi'] = dpi
+
+
+def _render_thumbnails(task: tuple) -> (str, list):
+    """
+    Internal function. Render the thumbnail of each gate of a single sample from precomputed histograms
+    (see _sample_panels). Figures are created without pyplot, such that no figure is retained by the worker.
+
+    Parameters
+    ----------
+    task: tuple
+        (sample ID, list of panels)
+
+    Returns
+    -------
+    str, list
+        sample ID, list of (gate name, path of thumbnail relative to the output directory)
+    """
+    sample_id, panels = task
+    size, dpi = _REPORT_STATE['thumbnail_size'], _REPORT_STATE['dpi']
+    paths = list()
+    for panel in panels:
+        path = os.path.join('thumbnails', _filename(panel['gate']), f'{_filename(sample_id)}.png')
+        os.makedirs(os.path.join(_REPORT_STATE['output_dir'], os.path.dirname(path)), exist_ok=True)
+        fig = Figure(figsize=(size, size), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        h, xedges, yedges = panel['hist']
+        Plot._render_hist(ax, panel['hist'])
+        ax.set_xlim(xedges[0], xedges[-1])
+        ax.set_ylim(yedges[0], yedges[-1])
+        draw_geoms(ax, panel['geoms'], lw=1, verbose=False)
+        ax.set_title(f'{sample_id} (n={int(h.sum())})', fontsize=7)
+        ax.set_xlabel(panel['x'], fontsize=6)
+        ax.set_ylabel(panel['y'], fontsize=6)
+        ax.tick_params(labelsize=5)
+        fig.tight_layout()
+        fig.savefig(os.path.join(_REPORT_STATE['output_dir'], path))
+        paths.append((panel['gate'], path))
+    return sample_id, paths
+
+
+def population_statistics(gating: Gating) -> pd.DataFrame:
+    """
+    Summary statistics of every population of a sample
+
+    Parameters
+    ----------
+    gating: Gating
+
+    Returns
+    -------
+    Pandas.DataFrame
+        DataFrame with columns: sample_id, population, parent, n, prop_of_parent, prop_of_total
+    """
+    total = len(gating.populations['root'].index)
+    stats = list()
+    for name, node in gating.populations.items():
+        n = len(node.index)
+        parent_n = len(node.parent.index) if node.parent is not None else total
+        stats.append(dict(sample_id=gating.id,
+                          population=name,
+                          parent=node.parent.name if node.parent is not None else None,
+                          n=n,
+                          prop_of_parent=n / parent_n if parent_n else 0.,
+                          prop_of_total=n / total if total else 0.))
+    return pd.DataFrame(stats)
+
+
+def _sample_panels(gating: Gating,
+                   bins: int) -> list:
+    """
+    Internal function. For each gate of a sample, compute the 2D histogram of the parent population
+    (see Plot.population_histogram) and collect the geoms of the child populations
+
+    Parameters
+    ----------
+    gating: Gating
+    bins: int
+        Number of bins per axis
+
+    Returns
+    -------
+    list
+        List of panels, each a dictionary with keys: gate, x, y, hist, geoms, proportions
+    """
+    panels = list()
+    for gate_name, gate in gating.gates.items():
+        if gate.parent not in gating.populations.keys():
+            continue
+        axes_vars, transforms = gating.plotting.gate_axes(gate_name)
+        x, y = axes_vars['x'], axes_vars['y']
+        xlim, ylim = plot_axis_lims(x=x, y=y, xlim=None, ylim=None)
+        children = [c for c in gate.children if c in gating.populations.keys()]
+        geoms = {c: gating.populations[c].geom for c in children
+                 if gating.populations[c].geom and gating.populations[c].geom.get('shape') not in [None, 'sml']}
+        h, xedges, yedges = gating.plotting.population_histogram(gate.parent, x, y, transforms,
+                                                                  bins=bins, xlim=xlim, ylim=ylim)
+        parent_n = len(gating.populations[gate.parent].index)
+        proportions = {c: len(gating.populations[c].index) / parent_n if parent_n else 0. for c in children}
+        panels.append(dict(gate=gate_name, x=x, y=y, hist=(h.astype(np.float32), xedges, yedges),
+                           geoms=geoms, proportions=proportions))
+    return panels
+
+
+def _gate_sample(experiment: FCSExperiment,
+                 sample_id: str,
+                 template: str or None,
+                 sample_size: int or None) -> Gating:
+    """
+    Internal function. Load a sample and, if a template is given and the sample has no existing populations,
+    apply the template (results are not saved). Existing populations index the complete sample, so samples
+    with existing populations are always loaded in full; sample_size only applies when the template is applied.
+
+    Parameters
+    ----------
+    experiment: FCSExperiment
+    sample_id: str
+    template: str, optional
+    sample_size: int, optional
+
+    Returns
+    -------
+    Gating
+    """
+    fg = experiment.pull_sample(sample_id)
+    if fg is None:
+        raise GateError(f'Invalid sample ID {sample_id}')
+    apply_template = template is not None and (not fg.populations or len(fg.populations) == 1)
+    gating = Template(experiment, sample_id, sample=sample_size if apply_template else None,
+                      include_controls=False)
+    if apply_template:
+        if not gating.load_template(template):
+            raise GateError(f'Failed to load template {template}')
+        gating.apply_many(apply_all=True, feedback=False)
+    return gating
+
+
+def _write_gate_page(path: str,
+                     gate_name: str,
+                     thumbnails: dict) -> None:
+    """
+    Internal function. Write the HTML page of a gate; a grid of the thumbnail of every sample
+
+    Parameters
+    ----------
+    path: str
+    gate_name: str
+    thumbnails: dict
+        {sample ID: (thumbnail path, {child population: proportion of parent})}
+
+    Returns
+    -------
+    None
+    """
+    figures = list()
+    for sample_id, (thumbnail, proportions) in thumbnails.items():
+        caption = '<br>'.join([f'{html.escape(c)}: {p * 100:.1f}%' for c, p in proportions.items()])
+        figures.append(f'<figure><img src="{html.escape(thumbnail)}" alt="{html.escape(sample_id)}">'
+                       f'<figcaption>{caption}</figcaption></figure>')
+    with open(path, 'w') as f:
+        f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(gate_name)}</title>'
+                '<style>body{font-family:sans-serif} .grid{display:flex;flex-wrap:wrap}'
+                'figure{margin:4px;font-size:11px;text-align:center}</style></head><body>'
+                f'<p><a href="../index.html">Index</a></p><h1>{html.escape(gate_name)}</h1>'
+                f'<div class="grid">{"".join(figures)}</div></body></html>\n')
+
+
+def _write_index(path: str,
+                 gates: list,
+                 statistics: pd.DataFrame,
+                 failed: dict) -> None:
+    """
+    Internal function. Write the index HTML page of a report; links to gate pages, summary of population
+    statistics across samples and any samples that failed
+
+    Parameters
+    ----------
+    path: str
+    gates: list
+    statistics: Pandas.DataFrame
+    failed: dict
+        {sample ID: error message}
+
+    Returns
+    -------
+    None
+    """
+    links = ''.join([f'<li><a href="gates/{_filename(g)}.html">{html.escape(g)}</a></li>' for g in gates])
+    summary = ''
+    if statistics.shape[0]:
+        summary = statistics.groupby('population')['prop_of_parent'].describe().to_html(float_format='{:.3f}'.format)
+    errors = ''.join([f'<li>{html.escape(s)}: {html.escape(e)}</li>' for s, e in failed.items()])
+    with open(path, 'w') as f:
+        f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Gating report</title>'
+                '<style>body{font-family:sans-serif} td,th{padding:2px 6px}</style></head><body>'
+                f'<h1>Gating report</h1><h2>Gates</h2><ul>{links}</ul>'
+                '<h2>Proportion of parent</h2><p><a href="statistics.csv">statistics.csv</a></p>'
+                f'{summary}<h2>Failed samples</h2><ul>{errors}</ul></body></html>\n')
+
+
+def gating_report(experiment: FCSExperiment,
+                  output_dir: str,
+                  samples: list or None = None,
+                  template: str or None = None,
+                  sample_size: int or None = None,
+                  bins: int = 128,
+                  thumbnail_size: float = 2.5,
+                  dpi: int = 80,
+                  n_jobs: int = -1,
+                  verbose: bool = True) -> pd.DataFrame:
+    """
+    Generate a gating quality control report for many samples of an experiment. For every gate, a thumbnail of
+    the parent population (a 2D histogram; see Plot.population_histogram) with the gate overlaid is rendered for
+    each sample, and population statistics are collected. Written to output_dir are:
+    * index.html - links to each gate, summary of population statistics and samples that failed
+    * gates/<gate>.html - grid of the thumbnails of all samples for a gate
+    * thumbnails/<gate>/<sample>.png - thumbnails
+    * statistics.csv - population statistics of every sample (see population_statistics)
+
+    Samples are loaded and gated one at a time, as access to the database is serialised, whilst thumbnails are
+    rendered by a pool of worker processes. Only histograms are sent to workers and the number of samples
+    waiting to be rendered is bounded, such that memory use does not grow with the number of samples.
+
+    Parameters
+    ----------
+    experiment: FCSExperiment
+        Experiment to report on
+    output_dir: str
+        Directory to write the report to (created if it does not exist)
+    samples: list, optional
+        Samples to include; by default, all samples in experiment
+    template: str, optional
+        Name of gating template; if given, the template is applied to samples without existing populations
+        (results are not saved). Otherwise, the existing gates of each sample are reported
+    sample_size: int, optional
+        If given, the number of events sampled from each sample the template is applied to; samples with
+        existing populations are always reported in full
+    bins: int, (default=128)
+        Number of bins per axis of thumbnails
+    thumbnail_size: float, (default=2.5)
+        Width and height of thumbnails in inches
+    dpi: int, (default=80)
+        Resolution of thumbnails
+    n_jobs: int, (default=-1)
+        Number of processes used to render thumbnails; if -1, the number of available CPUs
+    verbose: bool, (default=True)
+        If True, a progress bar is provided
+
+    Returns
+    -------
+    Pandas.DataFrame
+        Population statistics of every sample
+    """
+    if samples is None:
+        samples = experiment.list_samples()
+    os.makedirs(os.path.join(output_dir, 'gates'), exist_ok=True)
+    n_jobs = cpu_count() if n_jobs < 1 else n_jobs
+    statistics, failed = list(), dict()
+    thumbnails = defaultdict(dict)
+    captions = defaultdict(dict)
+    pending = deque()
+
+    def collect(sample_id, sample_statistics, result):
+        # A failure to render is recorded against the sample, rather than aborting the report; the statistics of
+        # the sample are only reported once its thumbnails are rendered
+        try:
+            _, paths = result.get()
+        except Exception as e:
+            failed[sample_id] = f'Failed to render thumbnails: {e}'
+            for gate_captions in captions.values():
+                gate_captions.pop(sample_id, None)
+            return
+        statistics.append(sample_statistics)
+        for gate_name, path in paths:
+            thumbnails[gate_name][sample_id] = ('../' + path.replace(os.sep, '/'),
+                                                captions[gate_name].pop(sample_id))
+
+    # The pool is created prior to loading any data
+    pool = Pool(n_jobs, initializer=_init_report_worker, initargs=(output_dir, thumbnail_size, dpi))
+    try:
+        for sample_id in progress_bar(samples, verbose):
+            # Any error is recorded against the sample, such that one sample cannot abort the report
+            try:
+                gating = _gate_sample(experiment, sample_id, template, sample_size)
+                sample_statistics = population_statistics(gating)
+                panels = _sample_panels(gating, bins)
+            except Exception as e:
+                failed[sample_id] = f'{type(e).__name__}: {e}'
+                continue
+            for panel in panels:
+                captions[panel['gate']][sample_id] = panel['proportions']
+            pending.append((sample_id, sample_statistics,
+                            pool.apply_async(_render_thumbnails, ((sample_id, panels),))))
+            del gating, panels
+            while len(pending) >= 2 * n_jobs:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+    finally:
+        pool.close()
+        pool.join()
+
+    statistics = pd.concat(statistics, ignore_index=True) if statistics else pd.DataFrame(
+        columns=['sample_id', 'population', 'parent', 'n', 'prop_of_parent', 'prop_of_total'])
+    statistics.to_csv(os.path.join(output_dir, 'statistics.csv'), index=False)
+    gates = [g for g in captions.keys() if g in thumbnails.keys()]
+    for gate_name in gates:
+        gate_thumbnails = {s: thumbnails[gate_name][s] for s in samples if s in thumbnails[gate_name].keys()}
+        _write_gate_page(os.path.join(output_dir, 'gates', f'{_filename(gate_name)}.html'), gate_name,
+                         gate_thumbnails)
+    _write_index(os.path.join(output_dir, 'index.html'), gates, statistics, failed)
+    return statistics
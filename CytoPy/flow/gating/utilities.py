@@ -1,6 +1,7 @@
 from shapely.geometry import Point, Polygon
 from functools import partial
 from sklearn.neighbors import KernelDensity, KDTree
+from matplotlib.path import Path
 import pandas as pd
 import numpy as np
 import inspect
@@ -128,7 +129,7 @@ def inside_ellipse(data: np.array,
     Returns
     --------
     Numpy.array
-        numpy array of indices for values inside specified ellipse
+        boolean mask of values inside specified ellipse
     """
     cos_angle = np.cos(np.radians(180.-angle))
     sin_angle = np.sin(np.radians(180.-angle))
@@ -143,17 +144,7 @@ def inside_ellipse(data: np.array,
     yct = xc * sin_angle + yc * cos_angle
 
     rad_cc = (xct ** 2 / (width / 2.)**2) + (yct**2 / (height / 2.)**2)
-
-    in_ellipse = []
-
-    for r in rad_cc:
-        if r <= 1.:
-            # point in ellipse
-            in_ellipse.append(True)
-        else:
-            # point not in ellipse
-            in_ellipse.append(False)
-    return in_ellipse
+    return rad_cc <= 1.
 
 
 def rectangular_filter(data: pd.DataFrame,
@@ -241,6 +232,29 @@ def __multiprocess_point_in_poly(df: pd.DataFrame,
     return df.loc[mask]
 
 
+def polygon_mask(xy: np.array,
+                 poly: Polygon) -> np.array:
+    """
+    Return mask of two dimensional matrix specifying if a data point (row) falls within some polygon; all
+    points are tested at once (see matplotlib.path.Path.contains_points)
+
+    Parameters
+    ----------
+    xy: Numpy.array
+        two dimensional matrix (x,y)
+    poly: shapely.geometry.Polygon
+        Polygon object to search
+
+    Returns
+    --------
+    Numpy.array
+        boolean mask of values inside polygon
+    """
+    if xy.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+    return Path(np.array(poly.exterior.coords)).contains_points(xy)
+
+
 def inside_polygon(df: pd.DataFrame,
                    x: str,
                    y: str,
@@ -264,9 +278,70 @@ def inside_polygon(df: pd.DataFrame,
     Pandas.DataFrame
         Masked DataFrame containing only those rows that fall within the Polygon
     """
-    xy = df[[x, y]].values
-    pos_idx = list(map(lambda i: poly.contains(Point(i)), xy))
-    return df.iloc[pos_idx]
+    return df[polygon_mask(df[[x, y]].values, poly)]
+
+
+def index_positions(index: pd.Index) -> callable:
+    """
+    Generate a function that converts index values to their position in the given index (-1 for values absent
+    from the index). For non-negative integer indexes a dense look-up array is used, otherwise positions are found
+    with Pandas.Index.get_indexer
+
+    Parameters
+    ----------
+    index: Pandas.Index
+
+    Returns
+    -------
+    callable
+    """
+    values = index.values
+    if values.size == 0 or not np.issubdtype(values.dtype, np.integer) or values.min() < 0 or \
+            values.max() > 10 * values.size:
+        return index.get_indexer
+    lookup = np.full(values.max() + 1, -1, dtype=np.int64)
+    lookup[values] = np.arange(values.size)
+
+    def positions(idx: np.array) -> np.array:
+        idx = np.asarray(idx, dtype=np.int64)
+        pos = np.full(idx.shape[0], -1, dtype=np.int64)
+        valid = (idx >= 0) & (idx < lookup.shape[0])
+        pos[valid] = lookup[idx[valid]]
+        return pos
+    return positions
+
+
+def population_labels(index: pd.Index,
+                      root,
+                      default: str or None = None) -> np.array:
+    """
+    Label each event with the name of the most downstream population it belongs to, out of the populations
+    beneath the given node of the population tree. Populations are ordered by depth and an integer code is written
+    for each into a single array by position, deepest last (such that the deepest population wins); codes are then
+    mapped to population names once.
+
+    Parameters
+    ----------
+    index: Pandas.Index
+        Index of the events to label
+    root: Node
+        anytree Node of the population tree; the populations labelled are the descendants of this node
+    default: str, optional
+        Label given to events that do not belong to any descendant population
+
+    Returns
+    -------
+    Numpy.array
+        Population label of each event
+    """
+    nodes = sorted(root.descendants, key=lambda n: n.depth)
+    positions = index_positions(index)
+    codes = np.full(len(index), len(nodes), dtype=np.int32)
+    for i, node in enumerate(nodes):
+        pos = positions(node.index)
+        codes[pos[pos >= 0]] = i
+    names = np.array([node.name for node in nodes] + [default], dtype=object)
+    return names[codes]
 
 
 def density_dependent_downsample(data: pd.DataFrame,
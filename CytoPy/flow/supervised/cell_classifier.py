@@ -1,9 +1,12 @@
 from ...data.fcs_experiments import FCSExperiment
 from ...data.fcs import FileGroup, File, ChannelMap, Population
 from ...data.panel import Panel
+from ...data.classifier import ClassifierModel
 from ...flow.gating.actions import Gating
+from ...flow.gating.base import GateError
 from ...flow.gating.defaults import ChildPopulationCollection
-from ...flow.supervised.utilities import find_common_features, predict_class, random_oversampling
+from ...flow.supervised.utilities import find_common_features, predict_class, random_oversampling, \
+    population_label_matrix, labelled_event_batches
 from ..transforms import scaler
 from ...flow.gating.utilities import density_dependent_downsample
 from ...flow.supervised.evaluate import evaluate_model, report_card
@@ -12,15 +15,23 @@ from sklearn.model_selection import train_test_split, KFold, GridSearchCV
 from sklearn.decomposition import PCA
 from sklearn.utils.class_weight import compute_class_weight
 from sklearn.linear_model import LinearRegression
+from sklearn.base import clone
 from umap import UMAP
 from phate import PHATE
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, cpu_count, get_start_method
 from seaborn import heatmap
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from anytree import Node
+from copy import copy
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+import importlib
+import hashlib
+import pickle
+import json
+import os
 
 
 def _check_columns(data: pd.DataFrame, 
@@ -48,62 +59,70 @@ def _check_columns(data: pd.DataFrame,
     return data[valid_features]
 
 
-def multi_process_ordered(func: callable,
-                          x: iter,
-                          chunksize: int = 100) -> list:
+def _label_signatures(y: np.array) -> (np.array, np.array):
     """
-    Map a function (func) to some iterable (x) using multiprocessing. Iterable will be divided into chunks
-    of size `chunksize`. The chunks will be given as a list of tuples, where the first value is the index of
-    the chunk and the second value the chunk itself; this allows for ordered reassembly once processing has
-    completed. For this reason, the function `func` MUST handle and return the index of the chunk upon which
-    it acts.
+    Internal function. Used for assigning a unique 'fake' label to each multi-label sequence in a set. Each binary
+    sequence is packed into bytes and the packed signatures are hashed to integer codes; codes are ordered as the
+    sequences themselves would be lexicographically.
 
     Parameters
     -----------
-    func: callable
-        callable function to applied in parallel
-    x: iterable
-        some iterable to apply the function to
-    chunksize: int, (default=100)
-        size of chunks for multiprocessing
+    y: Numpy.array
+        (n, m) binary array of multi-label sequences
 
     Returns
-    --------
-    list
-        ordered list of funciton output
+    ---------
+    (Numpy.array, Numpy.array)
+        (unique multi-label sequences, 'fake' label of each sequence in y)
     """
-    def chunks(l: iter):
-        for i in range(0, len(l), chunksize):
-            yield l[i:i + chunksize]
-    indexed_chunks = [(i, xc) for i, xc in enumerate(chunks(x))]
-    pool = Pool(cpu_count())
-    results = pool.map(func, indexed_chunks)
-    results = [x[1] for x in sorted(results, key=lambda t: t[0])]
-    results = [x for l in results for x in l]
-    pool.close()
-    pool.join()
-    return results
+    y = np.asarray(y).astype(bool)
+    packed = np.ascontiguousarray(np.packbits(y, axis=1))
+    signatures = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+    _, first, codes = np.unique(signatures, return_index=True, return_inverse=True)
+    return y[first].astype(int), codes.ravel()
+
+
+_CV_STATE = dict()
 
 
-def _assign_labels(x: tuple,
-                   labels: dict) -> tuple:
+def _init_cv_worker(classifier, fit_kwargs: dict) -> None:
     """
-    Internal function. Used for assigning a unique 'fake' label to each multi-label sequence in a set in
-    a parallel process
+    Internal function. Initialise a cross-validation worker process. The CellClassifier (and so its training data)
+    is inherited by worker processes upon creation rather than being pickled with each fold; requires that
+    processes are started by forking.
 
     Parameters
-    -----------
-    x: tuple
-        (index of chunk, list of multi-label sequence's)
-    labels: dict
-        {multi-label sequence: unique 'fake' label}
+    ----------
+    classifier: CellClassifier
+    fit_kwargs: dict
+        keyword arguments for model fit
 
     Returns
-    ---------
-    tuple
-        (index of chunk, list of 'fake' labels)
+    -------
+    None
+    """
+    _CV_STATE['classifier'] = classifier
+    _CV_STATE['fit_kwargs'] = fit_kwargs
+
+
+def _cv_fold(fold: tuple) -> (pd.DataFrame, pd.DataFrame):
+    """
+    Internal function. Fit and evaluate a single cross-validation fold in a worker process, using an unfitted
+    copy of the model.
+
+    Parameters
+    ----------
+    fold: tuple
+        (fold number, training index, test index)
+
+    Returns
+    -------
+    (Pandas.DataFrame, Pandas.DataFrame)
+        training performance, test performance
     """
-    return x[0], [labels[np.array_str(s)] for s in x[1]]
+    obj = copy(_CV_STATE['classifier'])
+    obj.classifier = clone(obj.classifier)
+    return obj._evaluate_fold(*fold, **_CV_STATE['fit_kwargs'])
 
 
 def _channel_mappings(features: list,
@@ -143,6 +162,88 @@ def _channel_mappings(features: list,
     return mappings
 
 
+def _sample_events(data: pd.DataFrame,
+                   sampling_method: str,
+                   sample_n: int or float,
+                   features: list,
+                   downsampling_kwargs: dict or None = None) -> pd.DataFrame:
+    """
+    Internal function. Sample events from a single sample for the generation of a reference sample. Valid sampling
+    methods are:
+    * 'uniform' - events are sampled uniformly at random
+    * 'density' - density dependent downsampling (see flow.gating.utilities.density_dependent_downsample)
+    * 'stratified' - events are sampled equally from each population, given by the 'label' column of data; where
+    a population contains too few events, all are kept
+
+    Parameters
+    ----------
+    data: Pandas.DataFrame
+        events to sample
+    sampling_method: str
+        method to use for sampling
+    sample_n: int or float
+        number or fraction of events to sample
+    features: list
+        features used for density dependent downsampling
+    downsampling_kwargs: dict, optional
+        additional keyword arguments passed to density_dependent_downsample
+
+    Returns
+    -------
+    Pandas.DataFrame
+    """
+    n = sample_n if type(sample_n) == int else int(data.shape[0] * sample_n)
+    if data.shape[0] <= n:
+        return data
+    if sampling_method == 'uniform':
+        return data.sample(n)
+    if sampling_method == 'density':
+        return density_dependent_downsample(data=data, features=features, sample_n=n, **(downsampling_kwargs or {}))
+    if sampling_method == 'stratified':
+        groups = data.groupby('label', sort=False)
+        n_per_group = int(np.ceil(n / groups.ngroups))
+        return pd.concat([g if g.shape[0] <= n_per_group else g.sample(n_per_group) for _, g in groups])
+    raise ValueError('Sampling method must be one of: "uniform", "density" or "stratified"')
+
+
+def _reference_events(sample_id: str,
+                      experiment: FCSExperiment,
+                      root_population: str,
+                      features: list,
+                      sampling_method: str,
+                      sample_n: int or float,
+                      include_population_labels: bool,
+                      downsampling_kwargs: dict or None = None) -> (str, np.array or None, np.array or None):
+    """
+    Internal function. Load and sample the root population of a single sample for the generation of a reference
+    sample. Returns None in place of the sampled events if the sample is missing the root population.
+
+    Parameters
+    ----------
+    sample_id: str
+    experiment: FCSExperiment
+    root_population: str
+    features: list
+    sampling_method: str
+    sample_n: int or float
+    include_population_labels: bool
+    downsampling_kwargs: dict, optional
+
+    Returns
+    -------
+    (str, Numpy.array or None, Numpy.array or None)
+        sample ID, sampled events, population label of sampled events (None if include_population_labels is False)
+    """
+    g = Gating(experiment, sample_id, include_controls=False)
+    if root_population not in g.populations.keys():
+        return sample_id, None, None
+    label = include_population_labels or sampling_method == 'stratified'
+    df = g.get_population_df(root_population, label=label)
+    df = _sample_events(df, sampling_method, sample_n, features, downsampling_kwargs)
+    labels = df['label'].values if include_population_labels else None
+    return sample_id, df[features].values, labels
+
+
 def create_reference_sample(experiment: FCSExperiment,
                             root_population='root',
                             samples: list or None = None,
@@ -150,11 +251,12 @@ def create_reference_sample(experiment: FCSExperiment,
                             sampling_method: str = 'uniform',
                             sample_n: int or float = 1000,
                             include_population_labels: bool = False,
+                            downsampling_kwargs: dict or None = None,
                             verbose: bool = True) -> None:
     """
     Given some experiment and a root population that is common to all fcs file groups within this experiment, take
     a sample from each and create a new file group from the concatenation of these data. New file group will be created
-    and associated to the given FileExperiment object.
+    and associated to the given FileExperiment object. Samples are loaded and sampled in parallel.
     If no file name is given it will default to '{Experiment Name}_sampled_data'
 
     Parameters
@@ -169,11 +271,14 @@ def create_reference_sample(experiment: FCSExperiment,
     new_file_name: str
         name of file group generated
     sampling_method: str, (default='uniform')
-        method to use for sampling files (currently only supports 'uniform')
+        method to use for sampling files; either 'uniform', 'density' (density dependent downsampling) or
+        'stratified' (events sampled equally from each population)
     sample_n: int, (default=1000)
         number or fraction of events to sample from each file
     include_population_labels: bool, (default=False)
         If True, populations in the new file generated are inferred from the existing samples
+    downsampling_kwargs: dict, optional
+        keyword arguments to be passed to density dependent downsampling
     verbose: bool, (default=True)
         Whether to provide feedback
 
@@ -181,16 +286,11 @@ def create_reference_sample(experiment: FCSExperiment,
     --------
     None
     """
-    def sample(d):
-        if sampling_method == 'uniform':
-            if type(sample_n) == int:
-                if d.shape[0] > sample_n:
-                    return d.sample(sample_n)
-                return d
-            return d.sample(frac=sample_n)
-        raise ValueError('Error: currently only uniform sampling is implemented in this version of cytopy')
-
+    assert sampling_method in ['uniform', 'density', 'stratified'], \
+        'Sampling method must be one of: "uniform", "density" or "stratified"'
     vprint = print if verbose else lambda *a, **k: None
+    if samples is None:
+        samples = experiment.list_samples()
     assert all([s in experiment.list_samples() for s in samples]), 'One or more samples specified do not belong to experiment'
     vprint('-------------------- Generating Reference Sample --------------------')
     if new_file_name is None:
@@ -199,18 +299,27 @@ def create_reference_sample(experiment: FCSExperiment,
     features = find_common_features(experiment=experiment, samples=samples)
     channel_mappings = _channel_mappings(features,
                                          experiment.panel)
-    data = pd.DataFrame()
-    if include_population_labels:
-        features.append('label')
-    for s in samples:
-        vprint(f'Sampling {s}...')
-        g = Gating(experiment, s, include_controls=False)
-        if root_population not in g.populations.keys():
-            vprint(f'Skipping {s} as {root_population} is absent from gated populations')
-            continue
-        df = g.get_population_df(root_population, label=include_population_labels)[features]
-        data = pd.concat([data, sample(df)])
-    data = data.reset_index(drop=True)
+    vprint('Sampling...')
+    f = partial(_reference_events, experiment=experiment, root_population=root_population, features=features,
+                sampling_method=sampling_method, sample_n=sample_n,
+                include_population_labels=include_population_labels, downsampling_kwargs=downsampling_kwargs)
+    pool = Pool(cpu_count())
+    sampled = pool.map(f, samples)
+    pool.close()
+    pool.join()
+    for sid, x, _ in sampled:
+        if x is None:
+            vprint(f'Skipping {sid} as {root_population} is absent from gated populations')
+    sampled = [(x, labels) for _, x, labels in sampled if x is not None]
+    data = np.empty((sum([x.shape[0] for x, _ in sampled]), len(features)))
+    labels = np.empty(data.shape[0], dtype=object)
+    i = 0
+    for x, l in sampled:
+        data[i:i + x.shape[0]] = x
+        if include_population_labels:
+            labels[i:i + x.shape[0]] = l
+        i += x.shape[0]
+    del sampled
     vprint('Sampling complete!')
     new_filegroup = FileGroup(primary_id=new_file_name)
     new_filegroup.flags = 'sampled data'
@@ -218,18 +327,19 @@ def create_reference_sample(experiment: FCSExperiment,
                     compensated=True,
                     channel_mappings=channel_mappings)
     vprint('Inserting sampled data to database...')
-    new_file.put(data[[f for f in features if f != 'label']].values)
+    new_file.put(data)
     new_filegroup.files.append(new_file)
     root_p = Population(population_name='root',
                         prop_of_parent=1.0, prop_of_total=1.0,
                         warnings=[], geom=[['shape', None], ['x', 'FSC-A'], ['y', 'SSC-A']])
-    root_p.save_index(data.index.values)
+    root_p.save_index(np.arange(data.shape[0]))
     new_filegroup.populations.append(root_p)
     if include_population_labels:
         vprint('Warning: new concatenated sample will inherit population labels but NOT gates or '
                'population hierarchy')
-        for pop in data.label.unique():
-            idx = data[data.label == pop].index.values
+        codes, pops = pd.factorize(labels)
+        for i, pop in enumerate(pops):
+            idx = np.where(codes == i)[0]
             n = len(idx)
             p = Population(population_name=pop, prop_of_parent=n/data.shape[0],
                            prop_of_total=n/data.shape[0], warnings=[], parent='root',
@@ -244,6 +354,41 @@ def create_reference_sample(experiment: FCSExperiment,
     vprint('-----------------------------------------------------------------')
 
 
+_CLASSIFIER_MODULES = {'DeepGating': 'deep_gating',
+                       'DiscriminantAnalysis': 'discriminant_analysis',
+                       'XGBoostClassifier': 'xgboost',
+                       'SupportVectorMachine': 'svm',
+                       'KNN': 'knn'}
+
+
+def _classifier_class(name: str):
+    """
+    Internal function. Given the name of a CellClassifier class (as stored in the model registry), return the
+    class. Subclasses that have not been imported are imported from this package.
+
+    Parameters
+    ----------
+    name: str
+
+    Returns
+    -------
+    type
+    """
+    def subclasses(klass):
+        for sub in klass.__subclasses__():
+            yield sub
+            yield from subclasses(sub)
+    if name == CellClassifier.__name__:
+        return CellClassifier
+    for klass in subclasses(CellClassifier):
+        if klass.__name__ == name:
+            return klass
+    assert name in _CLASSIFIER_MODULES.keys(), f'Unknown classifier class {name}; import the module defining ' \
+                                               f'it prior to loading the model'
+    module = importlib.import_module(f'.{_CLASSIFIER_MODULES[name]}', package=__package__)
+    return getattr(module, name)
+
+
 class CellClassifier:
     """
     Base class for performing classification of cells by supervised machine learning.
@@ -286,7 +431,13 @@ class CellClassifier:
         If provided, data will be downsampled to given fraction prior to classification
     downsampling_kwargs: dict, optional
         keyword arguments to be passed to density dependent downsampling
+    cache_dir: str, optional
+        If given, the labelled and scaled training data is cached as a file in this directory and reused by
+        any classifier constructed with the same experiment, reference sample, populations, features, root
+        population, transform and scaling (provided the reference sample's populations are unchanged)
     """
+    parallel_cv = True
+
     def __init__(self,
                  experiment: FCSExperiment,
                  reference_sample: str,
@@ -301,10 +452,13 @@ class CellClassifier:
                  frac: float or None = None,
                  downsampling_kwargs: dict or None = None,
                  scale_kwargs: dict or None = None,
+                 cache_dir: str or None = None,
                  verbose=True):
+        self.verbose = verbose
         self.vprint = print if verbose else lambda *a, **k: None
         self.vprint('Constructing cell classifier object...')
         self.experiment = experiment
+        self.reference_sample = reference_sample
         self.transform = transform
         self.multi_label = multi_label
         self.classifier = None
@@ -315,26 +469,11 @@ class CellClassifier:
         self.mappings = None
         self.class_weights = None
         self.prefix = 'sml'
-        self.vprint('Loading information on reference sample...')
-        ref = Gating(self.experiment, reference_sample, include_controls=False)
-
-        self.population_labels = ref.valid_populations(population_labels)
-        assert len(self.population_labels) > 2, f'Error: reference sample {reference_sample} does not contain any '\
-                                                f'gated populations, please ensure that the reference sample has ' \
-                                                f'been gated prior to training.'
-        self.vprint('Preparing training data and labels...')
         if multi_label:
             self.threshold = None
-            self.train_X, self.train_y, self.mappings = self.multiclass_labels(ref, features, root_population)
-        else:
-            self.train_X, self.train_y, self.mappings = self.singleclass_labels(ref, features, root_population)
-        self.vprint('Scaling data...')
-        if scale is not None:
-            if scale_kwargs is not None:
-                self.train_X, self.preprocessor = scaler(self.train_X, scale_method=scale, **scale_kwargs)
-            else:
-                self.train_X, self.preprocessor = scaler(self.train_X, scale_method=scale)
-        else:
+        training_data = self._training_data(reference_sample, population_labels, scale, scale_kwargs, cache_dir)
+        self.train_X, self.train_y, self.mappings, self.preprocessor = training_data
+        if scale is None:
             self.vprint('Warning: it is recommended that data is scaled prior to training. Unscaled data can result '
                   'in some weights updating faster than others, having a negative effect on classifier performance')
 
@@ -358,6 +497,103 @@ class CellClassifier:
             self.class_weights = list(map(lambda x: balance_method[x], self.train_y))
         self.vprint('Ready for training!')
 
+    def _cache_key(self,
+                   reference_sample: str,
+                   population_labels: list,
+                   scale: str or None,
+                   scale_kwargs: dict or None) -> str:
+        """
+        Internal method. Generate the key for cached training data; a SHA-256 hash of everything that determines
+        the training data, including a digest of the index of the root population and of each labelled population
+        in the reference sample, such that any change to the gating of the reference sample invalidates the cache.
+
+        Parameters
+        ----------
+        reference_sample: str
+        population_labels: list
+        scale: str, optional
+        scale_kwargs: dict, optional
+
+        Returns
+        -------
+        str
+        """
+        fg = self.experiment.pull_sample(reference_sample)
+        reference_populations = list()
+        for p in fg.populations:
+            if p.population_name not in [self.root_population] + list(population_labels):
+                continue
+            idx = p.load_index()
+            digest = None if idx is None else hashlib.sha256(np.ascontiguousarray(idx).tobytes()).hexdigest()
+            reference_populations.append((p.population_name, digest))
+        key = dict(experiment=self.experiment.experiment_id,
+                   reference_sample=reference_sample,
+                   reference_populations=reference_populations,
+                   population_labels=list(population_labels),
+                   features=list(self.features),
+                   root_population=self.root_population,
+                   transform=self.transform,
+                   multi_label=self.multi_label,
+                   scale=scale,
+                   scale_kwargs=scale_kwargs)
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _training_data(self,
+                       reference_sample: str,
+                       population_labels: list,
+                       scale: str or None,
+                       scale_kwargs: dict or None,
+                       cache_dir: str or None) -> (np.array, np.array, dict, object):
+        """
+        Internal method. Generate the labelled, scaled feature space of the reference sample. If cache_dir is given,
+        the result is loaded from the cache if present, otherwise it is generated and written to the cache.
+
+        Parameters
+        ----------
+        reference_sample: str
+        population_labels: list
+        scale: str, optional
+        scale_kwargs: dict, optional
+        cache_dir: str, optional
+
+        Returns
+        -------
+        (Numpy.array, Numpy.array, dict, object)
+            Feature space, labels, label mappings and preprocessor
+        """
+        path = None
+        if cache_dir is not None:
+            path = os.path.join(cache_dir,
+                                f'{self._cache_key(reference_sample, population_labels, scale, scale_kwargs)}.pkl')
+            if os.path.isfile(path):
+                self.vprint('Loading training data from cache...')
+                with open(path, 'rb') as f:
+                    cached = pickle.load(f)
+                self.population_labels = cached.get('population_labels')
+                self.features = cached.get('features')
+                return cached.get('train_X'), cached.get('train_y'), cached.get('mappings'), cached.get('preprocessor')
+        self.vprint('Loading information on reference sample...')
+        ref = Gating(self.experiment, reference_sample, include_controls=False)
+        self.population_labels = ref.valid_populations(population_labels)
+        assert len(self.population_labels) > 2, f'Error: reference sample {reference_sample} does not contain any '\
+                                                f'gated populations, please ensure that the reference sample has ' \
+                                                f'been gated prior to training.'
+        self.vprint('Preparing training data and labels...')
+        if self.multi_label:
+            train_x, train_y, mappings = self.multiclass_labels(ref, self.features, self.root_population)
+        else:
+            train_x, train_y, mappings = self.singleclass_labels(ref, self.features, self.root_population)
+        preprocessor = None
+        if scale is not None:
+            self.vprint('Scaling data...')
+            train_x, preprocessor = scaler(train_x, scale_method=scale, **(scale_kwargs or {}))
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(dict(train_X=train_x, train_y=train_y, mappings=mappings, preprocessor=preprocessor,
+                                 population_labels=self.population_labels, features=self.features), f)
+        return train_x, train_y, mappings, preprocessor
+
     def _binarize_labels(self,
                          ref: Gating,
                          features: list,
@@ -387,10 +623,7 @@ class CellClassifier:
                                                     transform_method=self.transform),
                               features)
         self.features = list(root.columns)
-        for pop in self.population_labels:
-            root[pop] = 0
-            root.loc[ref.populations[pop].index, pop] = 1
-        return root[self.features].values, root[self.population_labels].values
+        return root.values, population_label_matrix(ref, root.index.values, self.population_labels)
 
     def multiclass_labels(self,
                           ref: Gating,
@@ -419,13 +652,9 @@ class CellClassifier:
             DataFrame of feature space, array of target labels, and a dictionary of cell population mappings
         """
         train_X, train_y = self._binarize_labels(ref, features, root_pop)
-        labels = {np.array2string(x): i for i, x in enumerate(np.unique(train_y, axis=0))}
-        label_f = partial(_assign_labels, labels=labels)
-        train_y = np.array(multi_process_ordered(label_f, train_y))
-        labels = {i: list(map(lambda x: int(x), a.replace('[', '').replace(']', '').split(' ')))
-                  for a, i in labels.items()}
+        signatures, train_y = _label_signatures(train_y)
         pops = np.array(self.population_labels)
-        mappings = {i: pops[np.where(np.array(x) == 1)] for i, x in labels.items()}
+        mappings = {i: pops[x == 1] for i, x in enumerate(signatures)}
         mappings = {k: v if len(v) > 0 else np.array(['None']) for k, v in mappings.items()}
         return train_X, train_y, mappings
 
@@ -451,12 +680,9 @@ class CellClassifier:
         if ref.check_downstream_overlaps(root_pop, self.population_labels):
             raise ValueError('Error: one or more population dependency errors')
         root = ref.get_population_df(root_pop, transform=True, transform_method=self.transform)[features]
-        y = np.zeros((root.shape[0], len(self.population_labels)))
-        mappings = dict()
-        for i, pop in enumerate(self.population_labels):
-            pop_idx = ref.populations[pop].index
-            np.put(y, pop_idx, i + 1)
-            mappings[i+1] = np.array([pop])
+        y = population_label_matrix(ref, root.index.values, self.population_labels)
+        y = np.where(y.any(axis=1), np.argmax(y, axis=1) + 1, 0)
+        mappings = {i + 1: np.array([pop]) for i, pop in enumerate(self.population_labels)}
         return root, y, mappings
 
     def train_test_split(self,
@@ -537,10 +763,7 @@ class CellClassifier:
         tree[branch.name].collection.populations[branch.name].update_geom(shape='sml', x=None, y=None)
         labels = [x[0] for x in mappings.items() if any([branch.name == l for l in x[1]])]
         assert labels, f'Population {branch.name} does not appear in mappings'
-        idx = np.array([])
-        for i in labels:
-            idx_ = target.populations[root_pop].index[np.where(y_hat == i)]
-            idx = np.unique(np.concatenate((idx_, idx)))
+        idx = np.unique(target.populations[root_pop].index[np.isin(y_hat, labels)])
         tree[branch.name].collection.populations[branch.name].update_index(idx)
         for child in tree[branch.name].children:
             tree = self._create_populations(tree, child, y_hat, target, root_pop, mappings)
@@ -612,16 +835,285 @@ class CellClassifier:
         target = Gating(self.experiment, target_sample, include_controls=False)
         x = target.get_population_df(root_pop, transform=True, transform_method=self.transform)
         x = _check_columns(x, self.features).values
-        # Standardise/normalise if necessary
-        if self.preprocessor is not None:
-            x = self.preprocessor.transform(x)
-        # Make prediction
-        y_probs = self.classifier.predict_proba(x)
-        y_hat = np.array(predict_class(y_probs, self.threshold))
+        y_probs, y_hat = self._predict_chunked(x)
         if return_gating:
             return self._save_gating(target, y_hat, root_pop)
         return y_probs, y_hat
 
+    def _predict_chunked(self,
+                         x: np.array,
+                         chunk_size: int or None = None) -> (np.array, np.array):
+        """
+        Internal method. Scale (if a preprocessor was fitted) and classify the given feature space in chunks of
+        rows, limiting the size of the intermediate arrays generated by the preprocessor and classifier.
+
+        Parameters
+        ----------
+        x: Numpy.array
+            Feature space (untransformed by the preprocessor)
+        chunk_size: int, optional
+            Number of rows to process at once; if None, the feature space is processed in a single pass
+
+        Returns
+        -------
+        (Numpy.array, Numpy.array)
+            Predicted probabilities, predicted labels
+        """
+        if chunk_size is None or x.shape[0] <= chunk_size:
+            chunks = [x]
+        else:
+            chunks = (x[i:i + chunk_size] for i in range(0, x.shape[0], chunk_size))
+        y_probs = list()
+        for chunk in chunks:
+            # Standardise/normalise if necessary
+            if self.preprocessor is not None:
+                chunk = self.preprocessor.transform(chunk)
+            y_probs.append(self.classifier.predict_proba(chunk))
+        y_probs = np.concatenate(y_probs)
+        return y_probs, predict_class(y_probs, self.threshold)
+
+    def _load_target(self,
+                     sample_id: str,
+                     root_pop: str) -> (Gating or None, np.array or None):
+        """
+        Internal method. Load the Gating object and transformed feature space of the root population for a sample
+        to be classified. Returns (None, None) if the sample cannot be loaded or is missing the root population.
+
+        Parameters
+        ----------
+        sample_id: str
+            Sample to load
+        root_pop: str
+            Name of the root population
+
+        Returns
+        -------
+        (Gating, Numpy.array) or (None, None)
+        """
+        try:
+            target = Gating(self.experiment, sample_id, include_controls=False)
+        except GateError:
+            return None, None
+        if root_pop not in target.populations.keys():
+            return None, None
+        x = target.get_population_df(root_pop, transform=True, transform_method=self.transform)
+        return target, _check_columns(x, self.features).values
+
+    def predict_many(self,
+                     samples: list or None = None,
+                     root_population: str or None = None,
+                     chunk_size: int = 100000,
+                     prefetch: int = 2,
+                     save: bool = True,
+                     overwrite: bool = False) -> pd.DataFrame:
+        """
+        Predict cell populations for many samples of the associated experiment. Samples are loaded in a background
+        thread (up to `prefetch` samples ahead of the classifier) so that database I/O overlaps with inference, and
+        each sample is classified in chunks of `chunk_size` rows. If save is True, the predicted populations of
+        each sample are written to the database in a single save of the sample's FileGroup, performed by the same
+        background thread.
+
+        Parameters
+        ----------
+        samples: list, optional
+            Sample IDs to classify (default = all samples in experiment)
+        root_population: str, optional
+            Name of root population. If none given, defaults to root population used in training.
+        chunk_size: int, (default=100000)
+            Number of events passed to the classifier at once
+        prefetch: int, (default=2)
+            Maximum number of samples loaded ahead of the classifier
+        save: bool, (default=True)
+            If True, predicted populations are saved to the database
+        overwrite: bool, (default=False)
+            Passed to Gating.save; if True, existing populations of the same name are overwritten
+
+        Returns
+        -------
+        Pandas.DataFrame
+            Number of events and proportion of the root population for each predicted population of each sample
+        """
+        assert self.classifier is not None, 'Model must be trained prior to prediction'
+        root_pop = root_population
+        if root_pop is None:
+            root_pop = self.root_population
+        if samples is None:
+            samples = self.experiment.list_samples()
+        assert all([s in self.experiment.list_samples() for s in samples]), \
+            'One or more samples specified do not belong to experiment'
+        summary = list()
+        saves = list()
+        # A single I/O thread is used for both loading and saving; pull_sample_data resets the database connection
+        # and so database operations must not run concurrently with one another
+        with ThreadPoolExecutor(max_workers=1) as io:
+            loads = [io.submit(self._load_target, sid, root_pop) for sid in samples[:prefetch + 1]]
+            for i in progress_bar(range(len(samples)), verbose=self.verbose):
+                target, x = loads[i].result()
+                if i + prefetch + 1 < len(samples):
+                    loads.append(io.submit(self._load_target, samples[i + prefetch + 1], root_pop))
+                loads[i] = None
+                if target is None:
+                    self.vprint(f'Skipping {samples[i]}; failed to load {root_pop}')
+                    continue
+                _, y_hat = self._predict_chunked(x, chunk_size=chunk_size)
+                target = self._save_gating(target, y_hat, root_pop)
+                root_n = len(target.populations[root_pop].index)
+                for name, node in target.populations.items():
+                    if name.startswith(f'{self.prefix}_'):
+                        summary.append(dict(sample_id=samples[i], population=name, n=len(node.index),
+                                            prop_of_root=len(node.index) / root_n))
+                if save:
+                    saves.append(io.submit(target.save, overwrite=overwrite, feedback=False))
+            for s in saves:
+                s.result()
+        return pd.DataFrame(summary, columns=['sample_id', 'population', 'n', 'prop_of_root'])
+
+    def _training_hash(self) -> str:
+        """
+        Internal method. SHA-256 hash of the training data and labels, used to identify the data a registered
+        model was trained on.
+
+        Returns
+        -------
+        str
+        """
+        sha = hashlib.sha256()
+        for a in [self.train_X, self.train_y]:
+            sha.update(np.ascontiguousarray(np.asarray(a)).tobytes())
+        return sha.hexdigest()
+
+    def _serialise_classifier(self):
+        """
+        Internal method. Serialise the classifier for storage in the model registry. The classifier object is
+        returned as is (it is pickled upon storage); overwritten by classes whose models cannot be pickled.
+
+        Returns
+        -------
+        object
+        """
+        return self.classifier
+
+    def _deserialise_classifier(self, classifier):
+        """
+        Internal method. Reverse of _serialise_classifier.
+
+        Parameters
+        ----------
+        classifier:
+            Serialised classifier as stored in the model registry
+
+        Returns
+        -------
+        object
+        """
+        return classifier
+
+    def _registry_parameters(self) -> dict:
+        """
+        Internal method. Additional class attributes to store in the model registry, restored when the model is
+        loaded; overwritten by classes with additional attributes.
+
+        Returns
+        -------
+        dict
+        """
+        return dict()
+
+    def register_model(self,
+                       model_name: str,
+                       notes: str or None = None) -> int:
+        """
+        Save the trained classifier, along with the preprocessor, features, transform and label mappings, to the
+        model registry (see data.classifier.ClassifierModel). Each call creates a new version of the named model.
+        The model can then be restored with `from_registry` without access to the reference sample.
+
+        Parameters
+        ----------
+        model_name: str
+            Name to register model under
+        notes: str, optional
+            Free text comments to store with the model
+
+        Returns
+        -------
+        int
+            Version of the registered model
+        """
+        assert self.classifier is not None, 'Model must be trained prior to registering'
+        record = ClassifierModel(model_name=model_name,
+                                 version=ClassifierModel.next_version(model_name),
+                                 experiment=self.experiment,
+                                 classifier_class=self.__class__.__name__,
+                                 reference_sample=self.reference_sample,
+                                 features=list(self.features),
+                                 transform_method=self.transform,
+                                 root_population=self.root_population,
+                                 multi_label=self.multi_label,
+                                 threshold=self.threshold,
+                                 population_labels=list(self.population_labels),
+                                 mappings=[(int(k), list(v)) for k, v in self.mappings.items()],
+                                 prefix=self.prefix,
+                                 parameters=list(self._registry_parameters().items()),
+                                 training_hash=self._training_hash(),
+                                 notes=notes)
+        record.save_model(dict(classifier=self._serialise_classifier(),
+                               preprocessor=self.preprocessor))
+        record.save()
+        self.vprint(f'Model saved to registry: {model_name}, version {record.version}')
+        return record.version
+
+    @classmethod
+    def from_registry(cls,
+                      model_name: str,
+                      version: int or None = None,
+                      verbose: bool = True):
+        """
+        Restore a trained classifier from the model registry (see `register_model`). The returned object is ready
+        for prediction; training data is not loaded and so methods that require training data are unavailable.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of registered model
+        version: int, optional
+            Version to load; if None, the latest version is loaded
+        verbose: bool, (default=True)
+            Whether to provide feedback
+
+        Returns
+        -------
+        CellClassifier
+            Instance of the class that generated the model (when called on CellClassifier)
+        """
+        record = ClassifierModel.fetch(model_name, version)
+        if cls is CellClassifier:
+            # Dispatch to the class that generated the model, such that the classifier is deserialised correctly
+            cls = _classifier_class(record.classifier_class)
+        assert record.classifier_class == cls.__name__, f'Model {model_name} was generated by ' \
+                                                        f'{record.classifier_class} not {cls.__name__}'
+        obj = cls.__new__(cls)
+        obj.verbose = verbose
+        obj.vprint = print if verbose else lambda *a, **k: None
+        obj.experiment = record.experiment
+        obj.reference_sample = record.reference_sample
+        obj.transform = record.transform_method
+        obj.multi_label = record.multi_label
+        obj.features = record.features
+        obj.root_population = record.root_population
+        obj.threshold = record.threshold
+        obj.population_labels = record.population_labels
+        obj.mappings = {k: np.array(v) for k, v in record.mappings}
+        obj.prefix = record.prefix
+        obj.class_weights = None
+        obj.train_X, obj.train_y = None, None
+        for k, v in record.parameters:
+            setattr(obj, k, v)
+        model = record.load_model()
+        obj.classifier = obj._deserialise_classifier(model.get('classifier'))
+        obj.preprocessor = model.get('preprocessor')
+        obj.vprint(f'Loaded {model_name}, version {record.version} ({record.classifier_class})')
+        return obj
+
     def _fit(self,
              x: np.array,
              y: np.array,
@@ -645,16 +1137,59 @@ class CellClassifier:
         assert self.classifier is not None, 'Must construct classifier prior to calling `fit` using the `build` method'
         self.classifier.fit(x, y, **kwargs)
 
+    def _evaluate_fold(self,
+                       i: int,
+                       train_index: np.array,
+                       test_index: np.array,
+                       **kwargs) -> (pd.DataFrame, pd.DataFrame):
+        """
+        Internal method. Fit the model to a single cross-validation fold and evaluate on training and test data.
+
+        Parameters
+        ----------
+        i: int
+            fold number
+        train_index: Numpy.array
+            training data index
+        test_index: Numpy.array
+            test data index
+        kwargs:
+            Optional additional kwargs for model fit.
+
+        Returns
+        -------
+        (Pandas.DataFrame, Pandas.DataFrame)
+            training performance, test performance
+        """
+        train_x, test_x = self.train_X[train_index], self.train_X[test_index]
+        train_y, test_y = self.train_y[train_index], self.train_y[test_index]
+        if self.class_weights is not None:
+            self.class_weights = list(np.asarray(self.class_weights)[train_index])
+        self._fit(train_x, train_y, **kwargs)
+        test_y, train_y = self._flatten_one_hot(test_y, train_y)
+        train_performance = evaluate_model(self.classifier, train_x, train_y, self.threshold)
+        train_performance['k'] = i
+        test_performance = evaluate_model(self.classifier, test_x, test_y, self.threshold)
+        test_performance['k'] = i
+        return train_performance, test_performance
+
     def train_cv(self,
                  k: int = 5,
+                 n_jobs: int = -1,
                  **kwargs) -> pd.DataFrame:
         """
-        Fit classifier to training data using cross-validation
+        Fit classifier to training data using cross-validation. Where supported by the model, folds are fitted
+        concurrently in a process pool, each worker fitting an unfitted copy of the model; the classifier
+        itself remains unfitted. Worker processes inherit the classifier on creation, so folds are only fitted
+        concurrently when processes are started by forking. Otherwise (or if n_jobs is 1) folds are fitted
+        sequentially and the classifier is left fitted to the final fold.
 
         Parameters
         -----------
         k: int, (default=5)
             Number of folds for cross-validation (default = 5)
+        n_jobs: int, (default=-1)
+            Number of processes to use (-1 will use all available cores)
         kwargs:
             Optional additional kwargs for model fit.
 
@@ -663,27 +1198,23 @@ class CellClassifier:
         Pandas.DataFrame
             Pandas DataFrame detailing performance
         """
+        assert self.classifier is not None, 'Must construct classifier prior to calling `fit` using the `build` method'
         kf = KFold(n_splits=k)
-        train_performance = list()
-        test_performance = list()
+        folds = [(i, train_index, test_index) for i, (train_index, test_index) in enumerate(kf.split(self.train_X))]
         self.vprint(f'----------- Cross Validation: {k} folds -----------')
-        idx = kf.split(self.train_X)
-        for i in progress_bar(range(k)):
-            train_index, test_index = next(idx)
-            train_x, test_x = self.train_X[train_index], self.train_X[test_index]
-            train_y, test_y = self.train_y[train_index], self.train_y[test_index]
-            self._fit(train_x, train_y, **kwargs)
-            test_y, train_y = self._flatten_one_hot(test_y, train_y)
-            p = evaluate_model(self.classifier, train_x, train_y, self.threshold)
-            p['k'] = i
-            train_performance.append(p)
-            p = evaluate_model(self.classifier, test_x, test_y, self.threshold)
-            p['k'] = i
-            test_performance.append(p)
-
-        train_performance = pd.concat(train_performance)
+        if n_jobs == 1 or not self.parallel_cv or get_start_method() != 'fork':
+            class_weights = self.class_weights
+            performance = list()
+            for fold in progress_bar(folds, verbose=self.verbose):
+                performance.append(self._evaluate_fold(*fold, **kwargs))
+                self.class_weights = class_weights
+        else:
+            n_jobs = cpu_count() if n_jobs < 0 else n_jobs
+            with Pool(min(n_jobs, k), initializer=_init_cv_worker, initargs=(self, kwargs)) as pool:
+                performance = pool.map(_cv_fold, folds)
+        train_performance = pd.concat([p[0] for p in performance])
         train_performance['test_train'] = 'train'
-        test_performance = pd.concat(test_performance)
+        test_performance = pd.concat([p[1] for p in performance])
         test_performance['test_train'] = 'test'
         return pd.concat([train_performance, test_performance])
 
@@ -734,6 +1265,135 @@ class CellClassifier:
         """
         self._fit(self.train_X, self.train_y, **kwargs)
 
+    def _encode_labels(self,
+                       y: np.array) -> np.array:
+        """
+        Internal method. Encode a binary matrix of population labels (see
+        supervised.utilities.population_label_matrix) as the labels used in training. For multi-label
+        classification, each multi-label sequence is encoded using the existing label mappings; sequences absent
+        from the mappings are given a label of -1.
+
+        Parameters
+        ----------
+        y: Numpy.array
+            (n events, n populations) binary matrix
+
+        Returns
+        -------
+        Numpy.array
+        """
+        if not self.multi_label:
+            return np.where(y.any(axis=1), np.argmax(y, axis=1) + 1, 0)
+        pops = np.array(self.population_labels)
+        known = {np.packbits(np.isin(pops, v)).tobytes(): k for k, v in self.mappings.items()}
+        packed = np.ascontiguousarray(np.packbits(y.astype(bool), axis=1))
+        signatures, inverse = np.unique(packed.view(np.dtype((np.void, packed.shape[1]))).ravel(),
+                                        return_inverse=True)
+        codes = np.array([known.get(sig.tobytes(), -1) for sig in signatures])
+        return codes[inverse.ravel()]
+
+    def _classes(self) -> np.array:
+        """
+        Internal method. All labels the classifier can be trained on
+
+        Returns
+        -------
+        Numpy.array
+        """
+        if self.multi_label:
+            return np.array(sorted(self.mappings.keys()))
+        return np.array([0] + sorted(self.mappings.keys()))
+
+    def training_batches(self,
+                         samples: list or None = None,
+                         batch_size: int = 10000,
+                         shuffle: bool = True,
+                         random_state: int or None = None,
+                         drop_unmapped: bool = True):
+        """
+        Generator of mini-batches of training data streamed from gated samples (by default, the reference sample).
+        Events are transformed, scaled with the preprocessor fitted to the reference sample and labelled
+        with the existing label mappings; events with a multi-label sequence absent from the mappings are dropped
+        (or labelled -1 if drop_unmapped is False). Only one sample is held in memory at a time.
+
+        Parameters
+        ----------
+        samples: list, optional
+            Sample IDs to stream events from (default = reference sample)
+        batch_size: int, (default=10000)
+            Number of events in each batch (before dropping unmapped events)
+        shuffle: bool, (default=True)
+            If True, the order of samples and of the events within each sample is shuffled
+        random_state: int, optional
+            Random seed for shuffling
+        drop_unmapped: bool, (default=True)
+            If False, events absent from the label mappings are kept and labelled -1, such that the number and
+            size of batches depends only on the size of the root population in each sample
+
+        Returns
+        -------
+        Generator
+            Yields (Numpy.array, Numpy.array) of feature space and labels
+        """
+        if samples is None:
+            samples = [self.reference_sample]
+        for x, y in labelled_event_batches(experiment=self.experiment,
+                                           samples=samples,
+                                           root_population=self.root_population,
+                                           population_labels=self.population_labels,
+                                           features=self.features,
+                                           transform=self.transform,
+                                           batch_size=batch_size,
+                                           shuffle=shuffle,
+                                           random_state=random_state,
+                                           verbose=self.verbose):
+            y = self._encode_labels(y)
+            if self.preprocessor is not None:
+                x = self.preprocessor.transform(x)
+            if not drop_unmapped:
+                yield x, y
+                continue
+            yield x[y >= 0], y[y >= 0]
+
+    def train_incremental(self,
+                          samples: list or None = None,
+                          batch_size: int = 10000,
+                          epochs: int = 1,
+                          random_state: int or None = None,
+                          **kwargs):
+        """
+        Train classifier incrementally on mini-batches streamed from gated samples (see `training_batches`), such
+        that memory is bounded regardless of the total number of events. Requires a model that supports
+        `partial_fit` e.g. Scikit-Learn's SGDClassifier, Perceptron, MultinomialNB or MLPClassifier.
+
+        Parameters
+        ----------
+        samples: list, optional
+            Sample IDs to train on (default = reference sample)
+        batch_size: int, (default=10000)
+            Number of events in each batch
+        epochs: int, (default=1)
+            Number of passes over the data
+        random_state: int, optional
+            Random seed for shuffling
+        kwargs:
+            Additional keyword arguments to be passed to call to MODEL.partial_fit()
+
+        Returns
+        -------
+        None
+        """
+        assert self.classifier is not None, 'Must construct classifier prior to calling `fit` using the `build` method'
+        if not hasattr(self.classifier, 'partial_fit'):
+            raise ValueError(f'{type(self.classifier).__name__} does not support incremental training; model must '
+                             f'implement partial_fit')
+        classes = self._classes()
+        for epoch in range(epochs):
+            self.vprint(f'----------- Epoch {epoch + 1}/{epochs} -----------')
+            seed = None if random_state is None else random_state + epoch
+            for x, y in self.training_batches(samples, batch_size=batch_size, random_state=seed):
+                self.classifier.partial_fit(x, y, classes=classes, **kwargs)
+
     @staticmethod
     def _flatten_one_hot(test: np.array,
                          train: np.array):
@@ -1,4 +1,5 @@
 from .cell_classifier import CellClassifier
+from .inference import DenseNetwork
 from keras.models import Sequential
 from keras.layers import Dense
 from keras.models import load_model
@@ -7,6 +8,7 @@ from keras import callbacks as cb
 from keras.callbacks import LearningRateScheduler
 import keras.optimizers
 import numpy as np
+import tempfile
 import math
 import os
 
@@ -55,6 +57,9 @@ class DeepGating(CellClassifier):
     kwargs:
         Keyword arguments for CellClassifier
     """
+    # Keras models cannot be cloned or safely shared with forked processes
+    parallel_cv = False
+
     def __init__(self,
                  hidden_layer_sizes: list or None = None,
                  n_layers: int = 3,
@@ -172,6 +177,87 @@ class DeepGating(CellClassifier):
             self.classifier.fit(x, y, nb_epoch=epochs, batch_size=batch_size, shuffle=True,
                                 validation_split=validation_split, callbacks=callbacks, **kwargs)
 
+    def _format_labels(self,
+                       y: np.array) -> np.array:
+        """
+        Internal method. Format labels as expected by the loss function (see build_model)
+
+        Parameters
+        ----------
+        y: Numpy.array
+
+        Returns
+        -------
+        Numpy.array
+        """
+        if self.loss_func == 'sparse_categorical_crossentropy':
+            return np.expand_dims(y, -1)
+        if self.loss_func == 'categorical_crossentropy':
+            return keras.utils.to_categorical(y, num_classes=len(self._classes()))
+        return y
+
+    def train_incremental(self,
+                          samples: list or None = None,
+                          batch_size: int = 128,
+                          epochs: int = 80,
+                          steps_per_epoch: int or None = None,
+                          random_state: int or None = None,
+                          **kwargs):
+        """
+        Overwrites base class method. Train the network on mini-batches streamed from gated samples (see
+        `training_batches`) using a batch generator, such that memory is bounded regardless of the total number
+        of events. Events absent from the label mappings are kept in each batch with a sample weight of zero, rather
+        than dropped, so that the number of batches in each pass over the data does not depend upon the shuffle.
+        By default, one epoch is one pass over the data and the number of batches is derived from the stored size
+        of the root population of each sample.
+
+        Parameters
+        ----------
+        samples: list, optional
+            Sample IDs to train on (default = reference sample)
+        batch_size: int, (default=128)
+            Number of events in each batch
+        epochs: int, (default=80)
+            Number of epochs
+        steps_per_epoch: int, optional
+            Number of batches in each epoch (default = number of batches in one pass over the data)
+        random_state: int, optional
+            Random seed for shuffling
+        kwargs:
+            Additional keyword arguments to pass to fit_generator call
+
+        Returns
+        -------
+        None
+        """
+        assert self.classifier is not None, 'Must construct classifier prior to calling `fit` using the `build` method'
+        if samples is None:
+            samples = [self.reference_sample]
+        if steps_per_epoch is None:
+            steps_per_epoch = 0
+            for sample_id in samples:
+                fg = self.experiment.pull_sample(sample_id)
+                # Samples missing populations are skipped by training_batches
+                populations = list(fg.list_populations())
+                if any([p not in populations for p in [self.root_population] + list(self.population_labels)]):
+                    continue
+                steps_per_epoch += math.ceil(fg.get_population(self.root_population).n / batch_size)
+        assert steps_per_epoch > 0, 'No labelled events found in the given samples'
+
+        def generator():
+            epoch = 0
+            while True:
+                seed = None if random_state is None else random_state + epoch
+                for x, y in self.training_batches(samples, batch_size=batch_size, random_state=seed,
+                                                  drop_unmapped=False):
+                    weights = (y >= 0).astype(float)
+                    yield x, self._format_labels(np.where(y >= 0, y, 0)), weights
+                epoch += 1
+
+        lrate = LearningRateScheduler(step_decay)
+        self.classifier.fit_generator(generator(), steps_per_epoch=steps_per_epoch, epochs=epochs,
+                                      callbacks=[lrate], **kwargs)
+
     def save_classifier(self, path):
         """
         Save classifier to disk
@@ -188,4 +274,88 @@ class DeepGating(CellClassifier):
         self.classifier.save(path)
         print(f'Classifier saved to {path}')
 
+    def export_inference(self,
+                         batch_size: int = 100000) -> DenseNetwork:
+        """
+        Export the trained network as a DenseNetwork; a NumPy implementation of the forward pass that does not
+        require Keras or Tensorflow (see flow.supervised.inference). The DenseNetwork can replace the Keras model
+        as the classifier; if the model is then registered (see register_model), it can be restored with
+        CellClassifier.from_registry and used for prediction without importing Keras.
+
+        Parameters
+        ----------
+        batch_size: int, (default=100000)
+            Number of events passed through the network at once
+
+        Returns
+        -------
+        DenseNetwork
+        """
+        assert self.classifier is not None, 'Model must be trained prior to export'
+        weights, biases, activations = list(), list(), list()
+        for layer in self.classifier.layers:
+            name = type(layer).__name__
+            if name == 'Dense':
+                w, b = layer.get_weights()
+                weights.append(w)
+                biases.append(b)
+                activations.append(layer.get_config().get('activation'))
+            elif name == 'Activation':
+                assert activations and activations[-1] == 'linear', 'Unsupported sequence of activation layers'
+                activations[-1] = layer.get_config().get('activation')
+            elif name != 'Dropout':
+                raise ValueError(f'Unsupported layer for export {name}; supported layers are Dense, Activation '
+                                 f'and Dropout')
+        return DenseNetwork(weights=weights, biases=biases, activations=activations, batch_size=batch_size)
+
+    def _serialise_classifier(self) -> bytes:
+        """
+        Overwrites base class method; Keras models are stored as the bytes of a HDF5 model file. A network
+        exported for inference (see export_inference) is stored as is.
 
+        Returns
+        -------
+        bytes or DenseNetwork
+        """
+        if isinstance(self.classifier, DenseNetwork):
+            return self.classifier
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.h5')
+            self.classifier.save(path)
+            with open(path, 'rb') as f:
+                return f.read()
+
+    def _deserialise_classifier(self, classifier: bytes):
+        """
+        Overwrites base class method; loads a Keras model from the bytes of a HDF5 model file
+
+        Parameters
+        ----------
+        classifier: bytes or DenseNetwork
+
+        Returns
+        -------
+        Keras.models.Sequential or DenseNetwork
+        """
+        if isinstance(classifier, DenseNetwork):
+            return classifier
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.h5')
+            with open(path, 'wb') as f:
+                f.write(classifier)
+            return load_model(path)
+
+    def _registry_parameters(self) -> dict:
+        """
+        Overwrites base class method; network hyper-parameters are stored with the model
+
+        Returns
+        -------
+        dict
+        """
+        return dict(hidden_layer_sizes=list(self.hidden_layer_sizes),
+                    n_layers=len(self.hidden_layer_sizes),
+                    l2_penalty=self.l2_penalty,
+                    activation_func=self.activation_func,
+                    loss_func=self.loss_func,
+                    output_activation_func=self.output_activation_func)
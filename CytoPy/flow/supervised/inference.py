@@ -0,0 +1,129 @@
+import numpy as np
+
+
+def _softmax(x: np.array) -> np.array:
+    e = np.exp(x - np.max(x, axis=1, keepdims=True))
+    return e / np.sum(e, axis=1, keepdims=True)
+
+
+ACTIVATIONS = {'linear': lambda x: x,
+               'relu': lambda x: np.maximum(x, 0),
+               'softplus': lambda x: np.logaddexp(0, x),
+               'softsign': lambda x: x / (1 + np.abs(x)),
+               'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+               'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+               'tanh': np.tanh,
+               'elu': lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0))),
+               'softmax': _softmax}
+
+
+class DenseNetwork:
+    """
+    Feed-forward neural network for inference only, implemented with NumPy. Used to classify events with a
+    network trained with DeepGating without Keras or Tensorflow (see DeepGating.export_inference); the object
+    implements `predict_proba` and so can take the place of the Keras model as a CellClassifier's classifier.
+
+    Parameters
+    -----------
+    weights: list
+        Weight matrix of each dense layer, (n inputs, n outputs)
+    biases: list
+        Bias vector of each dense layer
+    activations: list
+        Name of the activation function of each dense layer (see ACTIVATIONS)
+    batch_size: int, (default=100000)
+        Number of events passed through the network at once
+    """
+    def __init__(self,
+                 weights: list,
+                 biases: list,
+                 activations: list,
+                 batch_size: int = 100000):
+        assert len(weights) == len(biases) == len(activations), 'Expected a weight matrix, bias vector and ' \
+                                                                 'activation function for every layer'
+        for a in activations:
+            assert a in ACTIVATIONS.keys(), f'Unsupported activation function {a}, must be one of ' \
+                                            f'{list(ACTIVATIONS.keys())}'
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.batch_size = batch_size
+
+    def _forward(self, x: np.array) -> np.array:
+        for w, b, a in zip(self.weights, self.biases, self.activations):
+            x = ACTIVATIONS[a](x @ w + b)
+        return x
+
+    def predict_proba(self, x: np.array) -> np.array:
+        """
+        Predict the probability of each class
+
+        Parameters
+        ----------
+        x: Numpy.array
+            Feature space
+
+        Returns
+        -------
+        Numpy.array
+        """
+        x = np.asarray(x, dtype=np.float32)
+        return np.concatenate([self._forward(x[i:i + self.batch_size])
+                               for i in range(0, max(x.shape[0], 1), self.batch_size)])
+
+    def predict(self, x: np.array) -> np.array:
+        """
+        Predict the class with the highest probability
+
+        Parameters
+        ----------
+        x: Numpy.array
+            Feature space
+
+        Returns
+        -------
+        Numpy.array
+        """
+        return np.argmax(self.predict_proba(x), axis=1)
+
+    def save(self, path: str) -> None:
+        """
+        Save network to disk as a NumPy .npz file
+
+        Parameters
+        ----------
+        path: str
+            File path
+
+        Returns
+        -------
+        None
+        """
+        arrays = {f'weights_{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'biases_{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, activations=np.array(self.activations), **arrays)
+
+    @classmethod
+    def load(cls,
+             path: str,
+             batch_size: int = 100000):
+        """
+        Load network saved with `save`
+
+        Parameters
+        ----------
+        path: str
+            File path
+        batch_size: int, (default=100000)
+            Number of events passed through the network at once
+
+        Returns
+        -------
+        DenseNetwork
+        """
+        with np.load(path) as f:
+            n = len(f['activations'])
+            return cls(weights=[f[f'weights_{i}'] for i in range(n)],
+                       biases=[f[f'biases_{i}'] for i in range(n)],
+                       activations=[str(a) for a in f['activations']],
+                       batch_size=batch_size)
@@ -49,30 +49,46 @@ def calculate_ref_sample_fast(experiment: FCSExperiment,
     pool = Pool(cpu_count())
     f = partial(pull_data_hashtable, experiment=experiment, features=features, sample_n=sample_n)
     all_data_ = pool.map(f, all_samples)
-    vprint('...calculate covariance matrix for each sample')
-    # Calculate covar for each
+    pool.close()
+    pool.join()
     all_data = dict()
     for d in all_data_:
         all_data.update(d)
     del all_data_
-    all_data = {k: np.cov(v, rowvar=False) for k, v in all_data.items()}
+    for sid in [s for s in all_samples if all_data.get(s) is None]:
+        vprint(f'Error: failed to fetch data for {sid}. Skipping.')
+    all_samples = [s for s in all_samples if all_data.get(s) is not None]
+    vprint('...calculate covariance matrix for each sample')
+    # Calculate covar for each
+    covariances = np.stack([np.cov(all_data[s], rowvar=False) for s in all_samples])
+    del all_data
     vprint('...search for sample with smallest average euclidean distance to all other samples')
-    # Make comparisons
-    n = len(all_samples)
-    norms = np.zeros(shape=[n, n])
-    ref_ind = None
-    for i in range(0, n):
-        cov_i = all_data[all_samples[i]]
-        for j in range(0, n):
-            cov_j = all_data[all_samples[j]]
-            cov_diff = cov_i - cov_j
-            norms[i, j] = np.linalg.norm(cov_diff, ord='fro')
-            norms[j, i] = norms[i, j]
-            avg = np.mean(norms, axis=1)
-            ref_ind = np.argmin(avg)
-    pool.close()
-    pool.join()
-    return all_samples[int(ref_ind)]
+    norms = covariance_distances(covariances)
+    return all_samples[int(np.argmin(np.mean(norms, axis=1)))]
+
+
+def covariance_distances(covariances: np.array) -> np.array:
+    """
+    Given a stacked array of n covariance matrices, (n, d, d), calculate the Frobenius norm of the difference between
+    every pair of matrices. The Frobenius norm of the difference of two matrices is the euclidean distance between
+    the flattened matrices; all pairwise distances are computed at once from the Gram matrix of the flattened
+    matrices, ||a - b||^2 = ||a||^2 + ||b||^2 - 2a.b
+
+    Parameters
+    ----------
+    covariances: Numpy.array
+        (n, d, d) array of covariance matrices
+
+    Returns
+    -------
+    Numpy.array
+        (n, n) array of pairwise distances
+    """
+    flat = covariances.reshape(covariances.shape[0], -1)
+    sq = np.einsum('ij,ij->i', flat, flat)
+    distances = sq[:, None] + sq[None, :] - 2 * (flat @ flat.T)
+    np.fill_diagonal(distances, 0)
+    return np.sqrt(np.clip(distances, 0, None))
 
 
 def pull_data_hashtable(sid: str,
@@ -170,29 +186,18 @@ def calculate_reference_sample(experiment: FCSExperiment,
     samples = [x for x in samples if x not in exclude_samples]
     if len(samples) == 0:
         raise ValueError('Error: no samples associated to given FCSExperiment')
-    n = len(samples)
-    norms = np.zeros(shape=[n, n])
-    ref_ind = None
-    for i, si in enumerate(samples):
-        print(f'Running comparisons for {si}')
+    covariances = list()
+    valid_samples = list()
+    for si in samples:
+        print(f'Calculating covariance matrix for {si}')
         data_i = pull_data(si, experiment, features)
         if data_i is None:
             print(f'Error: failed to fetch data for {si}. Skipping.')
             continue
-        cov_i = np.cov(data_i, rowvar=False)
-        for j, sj in enumerate(samples):
-            data_j = pull_data(sj, experiment, features)
-            if data_j is None:
-                print(f'Error: failed to fetch data for {sj}. Skipping.')
-                continue
-            cov_j = np.cov(data_j, rowvar=False)
-            cov_diff = cov_i - cov_j
-            norms[i, j] = np.linalg.norm(cov_diff, ord='fro')
-            norms[j, i] = norms[i, j]
-            avg = np.mean(norms, axis=1)
-            ref_ind = np.argmin(avg)
-    if ref_ind is not None:
-        return samples[int(ref_ind)]
-    else:
+        covariances.append(np.cov(data_i, rowvar=False))
+        valid_samples.append(si)
+    if not valid_samples:
         raise ValueError('Error: unable to calculate sample with minimum average distance. You must choose'
                          ' manually.')
+    norms = covariance_distances(np.stack(covariances))
+    return valid_samples[int(np.argmin(np.mean(norms, axis=1)))]
@@ -103,7 +103,7 @@ def find_common_features(experiment: FCSExperiment,
 
 
 def predict_class(y_probs: np.array,
-                  threshold: float or None = None):
+                  threshold: float or None = None) -> np.array:
     """
     Returns the predicted class given the probabilities of each class. If threshold = None, the class with
     the highest probability is returned for each value in y, otherwise assumed to be multi-label prediction
@@ -118,18 +118,105 @@ def predict_class(y_probs: np.array,
 
     Returns
     --------
-    List
+    Numpy.array
     """
-    def convert_ml(y):
-        if y > threshold:
-            return 1
-        return 0
+    y_probs = np.asarray(y_probs)
     if threshold is not None:
-        y_hat = list()
-        for x in y_probs:
-            y_hat.append(list(map(lambda i: convert_ml(i), x)))
-        return y_hat
-    return list(map(lambda j: np.argmax(j), y_probs))
+        return (y_probs > threshold).astype(int)
+    return np.argmax(y_probs, axis=1)
+
+
+def population_label_matrix(gating: Gating,
+                            index: np.array,
+                            populations: list) -> np.array:
+    """
+    Generate a binary (n events, n populations) matrix, where element (i, j) is 1 if event i belongs to
+    population j, in a single scatter of every population's index
+
+    Parameters
+    ----------
+    gating: Gating
+        Gating object populations belong to
+    index: Numpy.array
+        Index of events (e.g. index of the root population)
+    populations: list
+        Population names
+
+    Returns
+    -------
+    Numpy.array
+    """
+    pop_idx = [gating.populations[p].index for p in populations]
+    rows = pd.Index(index).get_indexer(np.concatenate(pop_idx))
+    cols = np.repeat(np.arange(len(populations)), [len(i) for i in pop_idx])
+    labels = np.zeros((len(index), len(populations)), dtype=int)
+    labels[rows[rows >= 0], cols[rows >= 0]] = 1
+    return labels
+
+
+def labelled_event_batches(experiment: FCSExperiment,
+                           samples: list,
+                           root_population: str,
+                           population_labels: list,
+                           features: list,
+                           transform: str or None = 'logicle',
+                           batch_size: int = 10000,
+                           shuffle: bool = True,
+                           random_state: int or None = None,
+                           verbose: bool = False):
+    """
+    Generator of mini-batches of labelled single cell data from one or more gated samples. Samples are loaded one
+    at a time, such that memory is bounded by the size of the largest sample rather than the total number of events.
+    Each batch is a tuple of the feature space and a binary matrix of population labels (see
+    population_label_matrix). Samples missing any of the given populations are skipped.
+
+    Parameters
+    ----------
+    experiment: FCSExperiment
+        Experiment samples belong to
+    samples: list
+        Sample IDs to stream events from
+    root_population: str
+        Name of the population to fetch from each sample
+    population_labels: list
+        Populations to label events with
+    features: list
+        Features (columns) to return
+    transform: str, optional, (default='logicle')
+        Transformation to apply; set to None to return untransformed data
+    batch_size: int, (default=10000)
+        Number of events in each batch
+    shuffle: bool, (default=True)
+        If True, the order of samples and of the events within each sample is shuffled
+    random_state: int, optional
+        Random seed for shuffling
+    verbose: bool, (default=False)
+        Set to True to print progress to screen
+
+    Returns
+    -------
+    Generator
+        Yields (Numpy.array, Numpy.array) of feature space and binary labels
+    """
+    vprint = print if verbose else lambda *a, **k: None
+    rng = np.random.RandomState(random_state)
+    order = rng.permutation(len(samples)) if shuffle else range(len(samples))
+    for i in order:
+        g = Gating(experiment=experiment, sample_id=samples[i], include_controls=False)
+        missing = [p for p in [root_population] + list(population_labels) if p not in g.populations.keys()]
+        if missing:
+            vprint(f'Skipping {samples[i]}; missing populations {missing}')
+            continue
+        data = g.get_population_df(population_name=root_population,
+                                   transform=transform is not None,
+                                   transform_method=transform)
+        x = data[features].values
+        y = population_label_matrix(g, data.index.values, population_labels)
+        del g, data
+        idx = rng.permutation(x.shape[0]) if shuffle else np.arange(x.shape[0])
+        for start in range(0, idx.shape[0], batch_size):
+            batch = idx[start:start + batch_size]
+            yield x[batch], y[batch]
 
 
 def build_labelled_dataset(experiment: FCSExperiment,
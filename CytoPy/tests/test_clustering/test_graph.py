@@ -0,0 +1,37 @@
+import sys
+sys.path.append('/home/ross/CytoPy')
+
+from CytoPy.flow.clustering import graph
+from CytoPy.tests import make_example_date
+import numpy as np
+import unittest
+
+
+class TestNearestNeighbours(unittest.TestCase):
+    def test(self):
+        data = make_example_date(n_samples=100, n_features=2)[['feature0', 'feature1']].values
+        idx = graph.nearest_neighbours(data, k=5)
+        self.assertEqual(idx.shape, (100, 5))
+        self.assertFalse(any(i in idx[i] for i in range(100)))
+
+
+class TestJaccardGraph(unittest.TestCase):
+    def test(self):
+        data = make_example_date(n_samples=100, n_features=2)[['feature0', 'feature1']].values
+        idx = graph.nearest_neighbours(data, k=5)
+        g = graph.jaccard_graph(idx, chunk_size=30).toarray()
+        for i in range(100):
+            for j in idx[i]:
+                shared = len(set(idx[i]).intersection(set(idx[j])))
+                self.assertAlmostEqual(g[i, j], shared / (10 - shared), places=5)
+
+
+class TestSortBySize(unittest.TestCase):
+    def test(self):
+        communities = np.array([3, 3, 3, 1, 1, 5, 5, 5, 5, 2])
+        self.assertListEqual(list(graph.sort_by_size(communities, min_size=2)),
+                             [1, 1, 1, 2, 2, 0, 0, 0, 0, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
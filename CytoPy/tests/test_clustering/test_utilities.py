@@ -4,6 +4,8 @@ sys.path.append('/home/ross/CytoPy')
 from CytoPy.data.mongo_setup import global_init
 from CytoPy.flow.clustering import main
 from sklearn.cluster import AgglomerativeClustering, KMeans
+import pandas as pd
+import numpy as np
 import unittest
 
 global_init('test')
@@ -33,5 +35,37 @@ class TestFetchClusteringClass(unittest.TestCase):
         self.assertListEqual(list(params.keys()), ['x'])
 
 
+class TestSummariseClusters(unittest.TestCase):
+    @staticmethod
+    def _build():
+        data = pd.DataFrame({'x': np.arange(10, dtype=float),
+                             'y': np.arange(10, dtype=float) * 2,
+                             'population_label': list('aabbbccccc')})
+        labels = np.array([0, 0, 0, 1, 1, 1, -1, 2, 2, 2])
+        return data, labels
+
+    def test_median(self):
+        data, labels = self._build()
+        summary = main.summarise_clusters(data, labels, ['c0', 'c1', 'c2'])
+        self.assertListEqual(list(summary.cluster_id.values), ['c0', 'c1', 'c2'])
+        self.assertListEqual(list(summary.x.values), [1., 4., 8.])
+        self.assertListEqual(list(summary.cluster_n.values), [3, 3, 3])
+        self.assertListEqual(list(summary.population_label.values), ['a', 'b', 'c'])
+        self.assertAlmostEqual(summary.cluster_size.values[0], 0.3)
+
+    def test_mean(self):
+        data, labels = self._build()
+        summary = main.summarise_clusters(data, labels, ['c0', 'c1', 'c2'], summary_method='mean')
+        self.assertListEqual(list(summary.y.values), [2., 8., 16.])
+
+
+class TestStability(unittest.TestCase):
+    def test(self):
+        x = np.array([0, 0, 1, 1, 2, 2])
+        self.assertAlmostEqual(main.stability([x, x, x]), 1.0)
+        self.assertAlmostEqual(main.stability([x, np.array([2, 2, 0, 0, 1, 1])]), 1.0)
+        self.assertTrue(np.isnan(main.stability([x])))
+
+
 if __name__ == '__main__':
     unittest.main()
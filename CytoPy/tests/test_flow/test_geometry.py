@@ -0,0 +1,46 @@
+import sys
+sys.path.append('/home/ross/CytoPy')
+
+from CytoPy.flow.gating import geometry
+from CytoPy.tests import make_example_date
+import numpy as np
+import unittest
+
+
+class TestThreshold2DMask(unittest.TestCase):
+    def test(self):
+        data = make_example_date(n_samples=100, centers=3, n_features=2)
+        x, y = data.feature0.values, data.feature1.values
+        pos = geometry.threshold_2d_mask(x, y, threshold_x=-2.5, threshold_y=5, definition='++')
+        neg = geometry.threshold_2d_mask(x, y, threshold_x=-2.5, threshold_y=5, definition=['--', '+-', '-+'])
+        y_ = ((data.feature0.round(2) >= -2.5) & (data.feature1.round(2) >= 5)).values
+        self.assertListEqual(list(pos), list(y_))
+        self.assertListEqual(list(neg), list(~y_))
+
+
+class TestGeomMasks(unittest.TestCase):
+    def test(self):
+        data = make_example_date(n_samples=100, centers=3, n_features=2)
+        geom = dict(x='feature0', y='feature1', transform_x=None, transform_y=None)
+        geoms = {'rect': dict(shape='rect', definition='+', x_min=-12, x_max=-2.5, y_min=-12, y_max=0, **geom),
+                 'ellipse': dict(shape='ellipse', definition='+', centroid=(-7., -7), width=5, height=8, angle=0,
+                                 **geom),
+                 'poly': dict(shape='poly', cords=dict(x=[-12, -2.5, -2.5, -12], y=[-12, -12, 0, 0]), **geom),
+                 'threshold': dict(shape='threshold', definition='-', threshold=0, **geom)}
+        masks = geometry.geom_masks(geoms, data)
+        y = (data.blobID == 2).values
+        for shape in ['rect', 'ellipse', 'poly']:
+            self.assertListEqual(list(masks[shape]), list(y))
+        self.assertListEqual(list(masks['threshold']), list((data.feature0.round(2) < 0).values))
+        self.assertTrue(np.array_equal(geometry.geom_mask(dict(geoms['rect'], definition='-'),
+                                                          data.feature0.values, data.feature1.values), ~y))
+
+
+class TestValidGeom(unittest.TestCase):
+    def test(self):
+        self.assertTrue(geometry.valid_geom(dict(shape='threshold', x='feature0', threshold=0, definition='+',
+                                                 transform_x=None)))
+        self.assertFalse(geometry.valid_geom(None))
+        self.assertFalse(geometry.valid_geom(dict(shape='sml', x='feature0', y='feature1')))
+        self.assertFalse(geometry.valid_geom(dict(shape='poly', x='feature0', y='feature1',
+                                                  cords=dict(x=[0, 1, 1], y=[0, 0, 1]))))
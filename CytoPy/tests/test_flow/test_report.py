@@ -0,0 +1,68 @@
+import sys
+sys.path.append('/home/ross/CytoPy')
+
+# Data imports
+from CytoPy.data.mongo_setup import global_init
+from CytoPy.data.project import Project
+from CytoPy.flow.gating import ChildPopulationCollection
+from CytoPy.flow.gating.actions import Template
+from CytoPy.flow.gating import report
+from CytoPy.tests import setup_with_dummy_data
+from mongoengine.connection import connect
+import unittest
+import re
+
+
+class TestGateSample(unittest.TestCase):
+    @staticmethod
+    def _build():
+        db = connect('test')
+        db.drop_database('test')
+        global_init('test')
+        setup_with_dummy_data()
+        project = Project.objects(project_id='test').get()
+        experiment = project.load_experiment('test_experiment_dummy')
+        g = Template(experiment=experiment, sample_id='dummy_test', include_controls=False)
+        populations = ChildPopulationCollection(gate_type='geom')
+        populations.add_population('positive', definition='+')
+        populations.add_population('negative', definition='-')
+        g.create_gate(gate_name='test',
+                      parent='root',
+                      class_='Static',
+                      method='rect_gate',
+                      kwargs=dict(x='feature0',
+                                  y='feature1',
+                                  transform_x=None,
+                                  transform_y=None,
+                                  x_min=1.5,
+                                  x_max=8.0,
+                                  y_min=-5,
+                                  y_max=5.5),
+                      child_populations=populations)
+        g.save_new_template('test_template')
+        return experiment, g
+
+    def test_template_sampled(self):
+        experiment, _ = self._build()
+        g = report._gate_sample(experiment, 'dummy_test', 'test_template', sample_size=50)
+        self.assertEqual(g.data.shape[0], 50)
+        self.assertTrue(all([x in g.populations.keys() for x in ['positive', 'negative']]))
+
+    def test_existing_not_sampled(self):
+        experiment, g = self._build()
+        g.apply('test', plot_output=False, feedback=False)
+        g.save(feedback=False)
+        for template in [None, 'test_template']:
+            gated = report._gate_sample(experiment, 'dummy_test', template, sample_size=50)
+            self.assertEqual(gated.data.shape[0], 100)
+            self.assertListEqual(list(gated.populations.get('positive').index),
+                                 list(g.populations.get('positive').index))
+            self.assertTrue(all([gated.populations.get(p).index.max() < gated.data.shape[0]
+                                 for p in ['positive', 'negative']]))
+
+
+class TestFilename(unittest.TestCase):
+    def test_unique(self):
+        names = ['CD4+', 'CD4-', 'pt 1', 'pt_1', 'pt/1']
+        self.assertEqual(len(set([report._filename(n) for n in names])), len(names))
+        self.assertTrue(all([re.fullmatch(r'[A-Za-z0-9_.-]+', report._filename(n)) for n in names]))
@@ -7,6 +7,7 @@ from CytoPy.tests import make_example_date
 from sklearn.neighbors import KernelDensity
 from scipy.signal import find_peaks
 from itertools import combinations
+from anytree import Node
 import numpy as np
 import pandas as pd
 import unittest
@@ -110,5 +111,21 @@ class TestGetParams(unittest.TestCase):
                              ['a', 'b', 'c'])
 
 
+class TestPopulationLabels(unittest.TestCase):
+    def test(self):
+        data = make_example_date(n_samples=100)
+        root = Node('root', index=data.index.values)
+        a = Node('a', parent=root, index=data[data.blobID == 0].index.values)
+        Node('b', parent=root, index=data[data.blobID == 1].index.values)
+        Node('c', parent=a, index=data[(data.blobID == 0) & (data.feature0 > 0)].index.values)
+        labels = utilities.population_labels(data.index, root, default='root')
+        y = np.where(data.blobID == 1, 'b', np.where(data.blobID == 0,
+                                                      np.where(data.feature0 > 0, 'c', 'a'), 'root'))
+        self.assertListEqual(list(labels), list(y))
+        subset = data[data.blobID == 0]
+        self.assertListEqual(list(utilities.population_labels(subset.index, a)),
+                             [('c' if x > 0 else None) for x in subset.feature0.values])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file